@@ -0,0 +1,82 @@
+import hashlib
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+
+def object_validator(queryset, field='updated_at'):
+    """`field` of the single row `queryset` selects, without loading the row; None if there is none."""
+    return queryset.order_by().values_list(field, flat=True).first()
+
+
+def latest_validator(queryset, field='updated_at'):
+    """
+    The newest `field` in `queryset`, read from the top of an index on it.
+    For whole tables whose removals are soft deletes that stamp `field`;
+    a hard delete does not move it.
+    """
+    return queryset.order_by(f'-{field}').values_list(field, flat=True).first()
+
+
+def collection_validator(queryset, field='updated_at'):
+    """
+    (max(`field`), row count) over `queryset`, computed in one aggregate
+    query. The count catches hard deletes but scans every matching row, so
+    keep it to index-bounded sets such as one lead's tasks.
+    """
+    aggregate = queryset.order_by().aggregate(last=Max(field), rows=Count('pk'))
+    return aggregate['last'], aggregate['rows']
+
+
+def rows_validator(rows, field='updated_at'):
+    """collection_validator() for rows already in memory, e.g. a reference_data snapshot."""
+    stamps = [getattr(row, field) for row in rows]
+    return max(stamps, default=None), len(stamps)
+
+
+class Validators:
+    def __init__(self, etag, last_modified=None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def apply(self, response):
+        """Sets the validators on a 200 response so the client can revalidate next time."""
+        response.headers['ETag'] = self.etag
+        if self.last_modified is not None:
+            response.headers['Last-Modified'] = http_date(self.last_modified.timestamp())
+        # Clients may keep the body but must revalidate it on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+
+def check_conditional(request, *parts, last_modified=None):
+    """
+    Evaluates If-None-Match / If-Modified-Since for a read endpoint before
+    anything is serialized. `parts` are the cheap validators the response
+    body is a function of (see the *_validator helpers above); they are
+    hashed with the path, the sorted query string and the requesting user
+    into the ETag. Returns (validators, response): when `response` is not
+    None the view returns it as-is (304), otherwise it builds the body and
+    passes it through validators.apply().
+
+    Pass `last_modified` only for a single row's updated_at. A collection's
+    max(updated_at) does not move when a row is deleted, so collections are
+    validated by ETag alone.
+    """
+    query = sorted(request.query_params.lists())
+    user_id = getattr(request.user, 'pk', None)
+    digest = hashlib.sha1(repr((request.path, query, user_id, parts)).encode()).hexdigest()
+    validators = Validators(quote_etag(digest), last_modified)
+
+    response = get_conditional_response(
+        request,
+        etag=validators.etag,
+        last_modified=int(last_modified.timestamp()) if last_modified is not None else None,
+    )
+    if response is None:
+        return validators, None
+    if isinstance(response, HttpResponseNotModified):
+        validators.apply(response)
+    return validators, response
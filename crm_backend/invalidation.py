@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CHANNEL': 'crm_cache_invalidation',
+    'FALLBACK_TTL': 30,       # max cache lifetime while the listener is disconnected
+    'RECONNECT_DELAY': 5.0,   # seconds between listener reconnect attempts
+}
+
+
+def bus_setting(name):
+    return getattr(settings, 'INVALIDATION_BUS', {}).get(name, DEFAULTS[name])
+
+
+class InvalidationBus:
+    """
+    Cross-process cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+    publish(namespace, key) sends a NOTIFY on the shared channel (delivered
+    when the surrounding transaction commits). Every worker process runs
+    one listener thread on its own connection that calls the handlers
+    subscribed to the namespace with the key, or with None to mean "drop
+    everything" after a reconnect, since notifications sent while
+    disconnected are lost.
+
+    Caches ask ttl(seconds) how long an entry may live: their own TTL while
+    the listener is connected, at most FALLBACK_TTL while it is not.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._thread = None
+        self._pid = None
+        self._listening = threading.Event()
+        self._origin = None
+        self._counters = {'published': 0, 'received': 0, 'reconnects': 0}
+
+    def _enabled(self, using=DEFAULT_DB_ALIAS):
+        return bus_setting('ENABLED') and connections[using].vendor == 'postgresql'
+
+    def subscribe(self, namespace, handler):
+        with self._lock:
+            self._handlers.setdefault(namespace, []).append(handler)
+
+    def publish(self, namespace, key=None, using=DEFAULT_DB_ALIAS):
+        if not self._enabled(using):
+            return
+        self.ensure_started()
+        payload = json.dumps({'ns': namespace, 'key': None if key is None else str(key), 'origin': self._origin})
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [bus_setting('CHANNEL'), payload])
+        self._counters['published'] += 1
+
+    def is_listening(self):
+        return self._pid == os.getpid() and self._listening.is_set()
+
+    def ttl(self, seconds):
+        if not bus_setting('ENABLED') or self.is_listening():
+            return seconds
+        return min(seconds, bus_setting('FALLBACK_TTL'))
+
+    def stats(self):
+        return dict(self._counters, listening=self.is_listening())
+
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        if not self._enabled():
+            return
+        with self._lock:
+            # A forked worker inherits neither the thread nor its connection.
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._origin = f"{socket.gethostname()}:{self._pid}"
+                self._listening.clear()
+                self._thread = threading.Thread(target=self._run, name='cache-invalidation', daemon=True)
+                self._thread.start()
+
+    def _dispatch(self, namespace, key):
+        for handler in list(self._handlers.get(namespace, ())):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Cache invalidation handler for %s failed", namespace)
+
+    def _dispatch_all(self):
+        for namespace in list(self._handlers):
+            self._dispatch(namespace, None)
+
+    def _connect(self):
+        wrapper = connections[DEFAULT_DB_ALIAS]
+        raw = wrapper.get_new_connection(wrapper.get_connection_params())
+        raw.autocommit = True
+        with raw.cursor() as cursor:
+            cursor.execute(f'LISTEN "{bus_setting("CHANNEL")}"')
+        return raw
+
+    def _run(self):
+        first = True
+        while True:
+            raw = None
+            try:
+                raw = self._connect()
+                self._listening.set()
+                if not first:
+                    self._counters['reconnects'] += 1
+                    self._dispatch_all()
+                first = False
+                self._listen(raw)
+            except Exception:
+                logger.warning("Cache invalidation listener disconnected", exc_info=True)
+            finally:
+                self._listening.clear()
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+            # Entries cached while disconnected may have missed invalidations.
+            self._dispatch_all()
+            time.sleep(bus_setting('RECONNECT_DELAY'))
+
+    def _listen(self, raw):
+        while True:
+            if select.select([raw], [], [], 60) == ([], [], []):
+                # Idle: make sure the connection is still alive.
+                with raw.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                continue
+            raw.poll()
+            while raw.notifies:
+                notify = raw.notifies.pop(0)
+                try:
+                    message = json.loads(notify.payload)
+                except ValueError:
+                    continue
+                self._counters['received'] += 1
+                if message.get('origin') == self._origin:
+                    continue  # this process already invalidated locally
+                self._dispatch(message.get('ns'), message.get('key'))
+
+
+invalidation_bus = InvalidationBus()
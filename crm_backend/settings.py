@@ -39,9 +39,11 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'tasks',
     'leads',
+    'jobs',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -146,7 +148,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     )
 }
 
@@ -156,6 +158,89 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Users resolved from access tokens are reused in-process for TTL seconds.
+AUTH_USER_CACHE = {
+    'ENABLED': True,
+    'TTL': 60,
+}
+
+# Retention for `manage.py purge_auth_history`: expired sessions are kept
+# SESSION_GRACE_HOURS past their refresh token's lifetime.
+AUTH_HISTORY_RETENTION = {
+    'LOGIN_LOG_DAYS': 90,
+    'SESSION_GRACE_HOURS': 0,
+}
+
+# UserSession.last_seen_at updates from token refreshes are coalesced in
+# memory and written in batches (see users.last_seen). Use 'MODE': 'sync' in tests.
+SESSION_LAST_SEEN = {
+    'MODE': 'buffered',
+    'FLUSH_INTERVAL': 30.0,
+    'BATCH_SIZE': 500,
+    'MAX_PENDING': 50000,
+}
+
+# Search/filter audit rows are buffered in-process and bulk inserted.
+# Use 'MODE': 'sync' in tests to write each row immediately.
+LEAD_AUDIT_SINK = {
+    'MODE': 'buffered',
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_BUFFER': 10000,
+}
+
+# Per-process cache of lead sources/statuses/stages/tags (see leads.reference).
+LEAD_REFERENCE_CACHE = {
+    'ENABLED': True,
+    'TTL': 3600,
+}
+
+# LISTEN/NOTIFY channel that evicts in-process caches on every worker
+# (see crm_backend.invalidation).
+INVALIDATION_BUS = {
+    'ENABLED': True,
+    'CHANNEL': 'crm_cache_invalidation',
+    'FALLBACK_TTL': 30,
+    'RECONNECT_DELAY': 5.0,
+}
+
+# Per-process prefix index behind /leads/typeahead/ (see leads.typeahead).
+# Opt-in: every worker builds its own copy at startup, about 150 bytes per
+# live lead. While disabled or building the endpoint queries the database.
+LEAD_TYPEAHEAD = {
+    'ENABLED': False,
+    'MIN_PREFIX': 2,
+    'MAX_RESULTS': 20,
+}
+
+# Background jobs run by `manage.py run_workers` (see jobs.worker).
+JOB_WORKERS = {
+    'POOL': 'thread',
+    'CONCURRENCY': 4,
+    'POLL_INTERVAL': 2.0,
+    'STALE_AFTER': 3600,
+    'RETRY_DELAY': 30,
+}
+
 # These are provided by Google:
 RECAPTCHA_PUBLIC_KEY = '6LdI8F0rAAAAADMKQxfmbLqxeSENpPcIlPP1abxf'
-RECAPTCHA_PRIVATE_KEY = '6LdI8F0rAAAAAIAgS-gEU2UTvzKS4SySeeiZzeUT'
\ No newline at end of file
+RECAPTCHA_PRIVATE_KEY = '6LdI8F0rAAAAAIAgS-gEU2UTvzKS4SySeeiZzeUT'
+
+# Login reCAPTCHA check (see users.recaptcha). Point BACKEND at
+# 'users.recaptcha.StubRecaptchaVerifier' for tests and offline load runs.
+RECAPTCHA_VERIFIER = {
+    'BACKEND': 'users.recaptcha.GoogleRecaptchaVerifier',
+    'CONNECT_TIMEOUT': 1.0,
+    'READ_TIMEOUT': 2.0,
+    'POOL_SIZE': 10,
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 30.0,
+    'FAIL_OPEN': False,
+}
+
+# Per-user TaskDashboardSummaryView counts (see tasks.summary), dropped on
+# every task write to the assignee.
+TASK_SUMMARY_CACHE = {
+    'ENABLED': True,
+    'TTL': 60,
+}
@@ -0,0 +1,5 @@
+from django.test import override_settings
+
+# Model signals publish on the invalidation bus, whose listener thread would
+# keep a session open on the test database.
+without_bus = override_settings(INVALIDATION_BUS={'ENABLED': False})
@@ -0,0 +1,97 @@
+import json
+import os
+import socket
+import threading
+from types import SimpleNamespace
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from crm_backend.invalidation import InvalidationBus
+
+
+class StubListenConnection:
+    """Stands in for the listener's raw connection: always readable, delivering `payloads` on the first poll()."""
+
+    def __init__(self, payloads):
+        self.reader, self.writer = socket.socketpair()
+        self.writer.send(b'!')
+        self.pending = [SimpleNamespace(payload=payload) for payload in payloads]
+        self.notifies = []
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def poll(self):
+        if not self.pending:
+            raise ConnectionError("listener connection closed")
+        self.notifies, self.pending = self.pending, []
+
+    def close(self):
+        self.reader.close()
+        self.writer.close()
+
+
+def started_bus():
+    """A bus that behaves as if its listener thread were running in this process, without starting one."""
+    bus = InvalidationBus()
+    bus._thread = threading.current_thread()
+    bus._pid = os.getpid()
+    bus._origin = 'test:1'
+    return bus
+
+
+class InvalidationBusTests(TestCase):
+    def setUp(self):
+        self.bus = started_bus()
+        self.received = []
+        self.bus.subscribe('leads.reference', lambda key: self.received.append(('reference', key)))
+        self.bus.subscribe('tasks.summary', lambda key: self.received.append(('summary', key)))
+
+    def _listen(self, *messages):
+        raw = StubListenConnection([message if isinstance(message, str) else json.dumps(message) for message in messages])
+        self.addCleanup(raw.close)
+        with self.assertRaises(ConnectionError):
+            self.bus._listen(raw)
+
+    def test_notifications_reach_the_namespaces_handlers(self):
+        self._listen(
+            {'ns': 'tasks.summary', 'key': '42', 'origin': 'worker:2'},
+            {'ns': 'leads.reference', 'key': None, 'origin': 'worker:2'},
+            {'ns': 'leads.unknown', 'key': '1', 'origin': 'worker:2'},
+        )
+        self.assertEqual(self.received, [('summary', '42'), ('reference', None)])
+        self.assertEqual(self.bus.stats()['received'], 3)
+
+    def test_own_and_malformed_notifications_are_skipped(self):
+        self._listen({'ns': 'tasks.summary', 'key': '42', 'origin': 'test:1'}, 'not json')
+        self.assertEqual(self.received, [])
+
+    def test_a_failing_handler_does_not_stop_the_others(self):
+        self.bus.subscribe('tasks.summary', lambda key: 1 / 0)
+        self.bus.subscribe('tasks.summary', lambda key: self.received.append(('second', key)))
+        with self.assertLogs('crm_backend.invalidation', 'ERROR'):
+            self._listen({'ns': 'tasks.summary', 'key': '7', 'origin': 'worker:2'})
+        self.assertEqual(self.received, [('summary', '7'), ('second', '7')])
+
+    def test_dispatch_all_drops_everything_in_every_namespace(self):
+        self.bus._dispatch_all()
+        self.assertCountEqual(self.received, [('reference', None), ('summary', None)])
+
+    @override_settings(INVALIDATION_BUS={'FALLBACK_TTL': 5})
+    def test_ttl_falls_back_while_the_listener_is_disconnected(self):
+        self.assertEqual(self.bus.ttl(60), 5)
+        self.bus._listening.set()
+        self.assertEqual(self.bus.ttl(60), 60)
+
+    def test_publish_notifies_the_channel_with_this_process_as_origin(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.bus.publish('tasks.summary', 42)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('pg_notify', queries[0]['sql'])
+        self.assertIn(json.dumps({'ns': 'tasks.summary', 'key': '42', 'origin': 'test:1'}), queries[0]['sql'])
+
+    @override_settings(INVALIDATION_BUS={'ENABLED': False})
+    def test_disabled_bus_publishes_nothing(self):
+        with self.assertNumQueries(0):
+            self.bus.publish('tasks.summary', 42)
+        self.assertEqual(self.bus.ttl(60), 60)
@@ -20,4 +20,7 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/", include("users.urls")),
+    path("api/", include("leads.urls")),
+    path("api/", include("tasks.urls")),
+    path("api/", include("jobs.urls")),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm_backend.settings')
 
 application = get_wsgi_application()
+
+# Start building the per-process lead typeahead index (no-op unless LEAD_TYPEAHEAD is enabled).
+from leads.typeahead import lead_typeahead  # noqa: E402
+
+lead_typeahead.warm()
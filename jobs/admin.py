@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    # Jobs are queued with jobs.utils.enqueue_job and updated by workers;
+    # the admin is for inspecting them.
+    list_display = ('job_id', 'kind', 'status', 'attempts', 'progress_current', 'progress_total', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('job_id', 'kind')
+    ordering = ('-created_at',)
+    list_select_related = ('created_by',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from jobs.registry import registered_kinds
+from jobs.worker import claim_jobs, init_worker_process, requeue_stale_jobs, run_job, worker_setting
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs, claiming them with SELECT ... FOR UPDATE SKIP LOCKED."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pool', choices=['thread', 'process'], default=None)
+        parser.add_argument('--concurrency', type=int, default=None, help="Jobs run at once.")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        pool = options['pool'] or worker_setting('POOL')
+        concurrency = options['concurrency'] or worker_setting('CONCURRENCY')
+        poll_interval = options['poll_interval'] if options['poll_interval'] is not None else worker_setting('POLL_INTERVAL')
+        stale_after = worker_setting('STALE_AFTER')
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping after running jobs finish...")
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        if pool == 'process':
+            # Children must not inherit open connections from the parent.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=init_worker_process,
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job-worker')
+
+        self.stdout.write(
+            f"Worker {worker_id} running {concurrency} {pool} worker(s) for: {', '.join(registered_kinds()) or 'no registered kinds'}"
+        )
+        running = set()
+        completed = 0
+        last_reclaim = 0.0
+        try:
+            while not stopping.is_set():
+                if time.monotonic() - last_reclaim > min(stale_after, 60):
+                    retried, failed = requeue_stale_jobs(stale_after)
+                    if retried or failed:
+                        self.stdout.write(f"Reclaimed stale jobs: {retried} requeued, {failed} failed.")
+                    last_reclaim = time.monotonic()
+
+                job_ids = claim_jobs(worker_id, concurrency - len(running))
+                if pool == 'process':
+                    connections.close_all()
+                else:
+                    close_old_connections()
+                running.update(executor.submit(run_job, job_id) for job_id in job_ids)
+
+                if running:
+                    done, running = wait(running, timeout=poll_interval if not job_ids else 0, return_when=FIRST_COMPLETED)
+                    running = set(running)
+                    completed += len(done)
+                    for future in done:
+                        if future.exception() is not None:
+                            self.stderr.write(f"Job runner error: {future.exception()}")
+                elif options['once']:
+                    break
+                else:
+                    stopping.wait(poll_interval)
+        finally:
+            executor.shutdown(wait=True)
+            completed += len(running)
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped after {completed} job(s)."))
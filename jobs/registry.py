@@ -0,0 +1,26 @@
+_handlers = {}
+
+
+def job_handler(kind):
+    """
+    Registers the decorated function as the handler for jobs of `kind`. It is
+    called with the Job and its return value is stored as the job's result.
+
+        @job_handler('leads.bulk_action')
+        def run_bulk_action(job):
+            ...
+    """
+    def decorator(func):
+        if kind in _handlers and _handlers[kind] is not func:
+            raise ValueError(f"A handler is already registered for job kind '{kind}'.")
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind):
+    return _handlers.get(kind)
+
+
+def registered_kinds():
+    return sorted(_handlers)
@@ -0,0 +1,21 @@
+from rest_framework import serializers
+from jobs.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    progress_percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'job_id', 'kind', 'status', 'progress_current', 'progress_total', 'progress_percent',
+            'result', 'error', 'attempts', 'max_attempts', 'created_by', 'created_at',
+            'started_at', 'finished_at', 'updated_at'
+        ]
+
+    def get_progress_percent(self, obj):
+        if obj.status == Job.STATUS_SUCCEEDED:
+            return 100
+        if not obj.progress_total:
+            return None
+        return min(100, round(obj.progress_current * 100 / obj.progress_total))
@@ -0,0 +1,143 @@
+import threading
+from datetime import timedelta
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from jobs.models import Job
+from jobs.registry import job_handler
+from jobs.utils import enqueue_job
+from jobs.worker import claim_jobs, requeue_stale_jobs, run_job
+
+
+@job_handler('tests.succeed')
+def succeed(job):
+    return {'echo': job.payload.get('value')}
+
+
+@job_handler('tests.fail')
+def fail(job):
+    raise RuntimeError("boom")
+
+
+class ClaimJobsTests(TestCase):
+    def test_claims_oldest_runnable_queued_jobs_up_to_limit(self):
+        now = timezone.now()
+        first = enqueue_job('tests.succeed', run_after=now - timedelta(minutes=2))
+        second = enqueue_job('tests.succeed', run_after=now - timedelta(minutes=1))
+        enqueue_job('tests.succeed', run_after=now - timedelta(seconds=30))
+        enqueue_job('tests.succeed', run_after=now + timedelta(hours=1))
+
+        self.assertEqual(claim_jobs('worker-1', 2), [first.pk, second.pk])
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.STATUS_RUNNING)
+        self.assertEqual(first.locked_by, 'worker-1')
+        self.assertEqual(first.attempts, 1)
+        self.assertIsNotNone(first.started_at)
+
+    def test_skips_future_and_non_queued_jobs(self):
+        enqueue_job('tests.succeed', run_after=timezone.now() + timedelta(hours=1))
+        done = enqueue_job('tests.succeed')
+        Job.objects.filter(pk=done.pk).update(status=Job.STATUS_SUCCEEDED)
+
+        self.assertEqual(claim_jobs('worker-1', 10), [])
+        self.assertEqual(claim_jobs('worker-1', 0), [])
+
+    def test_enqueue_rejects_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            enqueue_job('tests.unregistered')
+
+
+class ClaimJobsConcurrencyTests(TransactionTestCase):
+    def test_rows_locked_by_another_worker_are_skipped_without_blocking(self):
+        now = timezone.now()
+        locked = enqueue_job('tests.succeed', run_after=now - timedelta(minutes=1))
+        free = enqueue_job('tests.succeed', run_after=now)
+        holding, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    Job.objects.select_for_update().get(pk=locked.pk)
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        try:
+            self.assertTrue(holding.wait(10))
+            self.assertEqual(claim_jobs('worker-2', 10), [free.pk])
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual(claim_jobs('worker-2', 10), [locked.pk])
+
+
+class RequeueStaleJobsTests(TestCase):
+    def _running(self, attempts, max_attempts, locked_at):
+        job = enqueue_job('tests.succeed', max_attempts=max_attempts)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_RUNNING, attempts=attempts, locked_by='worker-1', locked_at=locked_at
+        )
+        return job
+
+    def test_stale_jobs_are_retried_or_failed_by_remaining_attempts(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        retry = self._running(attempts=1, max_attempts=3, locked_at=long_ago)
+        exhausted = self._running(attempts=3, max_attempts=3, locked_at=long_ago)
+        alive = self._running(attempts=1, max_attempts=3, locked_at=timezone.now())
+
+        self.assertEqual(requeue_stale_jobs(3600), (1, 1))
+
+        retry.refresh_from_db()
+        exhausted.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_by), (Job.STATUS_QUEUED, None))
+        self.assertEqual(exhausted.status, Job.STATUS_FAILED)
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertEqual((alive.status, alive.locked_by), (Job.STATUS_RUNNING, 'worker-1'))
+
+
+class RunJobTests(TransactionTestCase):
+    # run_job closes the thread's connections, so these cannot run inside a test transaction.
+
+    def _claimed(self, kind, **fields):
+        job = enqueue_job(kind, **fields)
+        self.assertEqual(claim_jobs('worker-1', 1), [job.pk])
+        return job
+
+    def test_success_stores_the_handler_result(self):
+        job = self._claimed('tests.succeed', payload={'value': 7})
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'echo': 7})
+        self.assertIsNone(job.locked_by)
+
+    def test_failure_is_retried_later_while_attempts_remain(self):
+        job = self._claimed('tests.fail', max_attempts=2)
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertEqual(job.error, "RuntimeError: boom")
+        self.assertGreater(job.run_after, timezone.now())
+
+    def test_last_failed_attempt_fails_the_job(self):
+        job = self._claimed('tests.fail')
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_kind_without_handler_fails(self):
+        job = self._claimed('tests.succeed')
+        Job.objects.filter(pk=job.pk).update(kind='tests.unregistered')
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn("tests.unregistered", job.error)
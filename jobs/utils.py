@@ -0,0 +1,12 @@
+from jobs.models import Job
+from jobs.registry import get_handler
+
+
+def enqueue_job(kind, payload=None, created_by=None, max_attempts=1, run_after=None):
+    """Queues a job for `manage.py run_workers` and returns it."""
+    if get_handler(kind) is None:
+        raise ValueError(f"No handler is registered for job kind '{kind}'.")
+    fields = {'kind': kind, 'payload': payload or {}, 'created_by': created_by, 'max_attempts': max_attempts}
+    if run_after is not None:
+        fields['run_after'] = run_after
+    return Job.objects.create(**fields)
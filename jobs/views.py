@@ -0,0 +1,28 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import permissions, status
+from jobs.models import Job
+from jobs.serializers import JobSerializer
+
+
+class JobDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, job_id):
+        jobs = Job.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(created_by=request.user)
+        try:
+            job = jobs.get(job_id=job_id)
+        except Job.DoesNotExist:
+            return Response({
+                "status": "failure",
+                "data": {},
+                "message": "Job not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "status": "success",
+            "data": JobSerializer(job).data,
+            "message": "Job status retrieved successfully."
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,110 @@
+import logging
+from datetime import timedelta
+import django
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from jobs.models import Job
+from jobs.registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'POOL': 'thread',          # 'thread' or 'process'
+    'CONCURRENCY': 4,          # jobs run at once per run_workers process
+    'POLL_INTERVAL': 2.0,      # seconds to wait when the queue is empty
+    'STALE_AFTER': 3600,       # seconds without a heartbeat before a running job is reclaimed
+    'RETRY_DELAY': 30,         # seconds, multiplied by the attempt number
+}
+
+
+def worker_setting(name):
+    return getattr(settings, 'JOB_WORKERS', {}).get(name, DEFAULTS[name])
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Marks up to `limit` runnable queued jobs as running for `worker_id` and
+    returns their ids. SKIP LOCKED lets any number of workers claim
+    concurrently without blocking on, or double-claiming, the same rows.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        job_ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED, run_after__lte=now)
+            .order_by('run_after', 'created_at')
+            .values_list('job_id', flat=True)[:limit]
+        )
+        if job_ids:
+            Job.objects.filter(job_id__in=job_ids).update(
+                status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now,
+                started_at=now, attempts=F('attempts') + 1, updated_at=now
+            )
+    return job_ids
+
+
+def _finish(job, status, **fields):
+    now = timezone.now()
+    Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING).update(
+        status=status, locked_by=None, locked_at=None, updated_at=now, **fields
+    )
+
+
+def _fail(job, error):
+    if job.attempts < job.max_attempts:
+        retry_at = timezone.now() + timedelta(seconds=worker_setting('RETRY_DELAY') * job.attempts)
+        _finish(job, Job.STATUS_QUEUED, error=error, run_after=retry_at)
+    else:
+        _finish(job, Job.STATUS_FAILED, error=error, finished_at=timezone.now())
+
+
+def run_job(job_id):
+    """Runs one claimed job and records its outcome. Safe to call from pool threads and processes."""
+    try:
+        job = Job.objects.get(pk=job_id)
+        handler = get_handler(job.kind)
+        if handler is None:
+            _finish(job, Job.STATUS_FAILED, error=f"No handler is registered for job kind '{job.kind}'.", finished_at=timezone.now())
+            return
+        try:
+            result = handler(job)
+        except Exception as exc:
+            # The full traceback goes to the log; the job keeps a summary for the status endpoint.
+            logger.exception("Job %s (%s) failed", job.pk, job.kind)
+            _fail(job, f"{type(exc).__name__}: {exc}")
+            return
+        _finish(job, Job.STATUS_SUCCEEDED, result=result, finished_at=timezone.now())
+    finally:
+        close_old_connections()
+        connections.close_all()
+
+
+def requeue_stale_jobs(stale_after):
+    """
+    Reclaims running jobs whose worker stopped sending heartbeats (crashed or
+    killed mid-job): they are retried if attempts remain, otherwise failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=cutoff)
+    error = "Worker stopped responding."
+    now = timezone.now()
+    retried = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.STATUS_QUEUED, locked_by=None, locked_at=None, error=error, updated_at=now
+    )
+    failed = stale.update(
+        status=Job.STATUS_FAILED, locked_by=None, locked_at=None, error=error, finished_at=now, updated_at=now
+    )
+    return retried, failed
+
+
+def init_worker_process():
+    """ProcessPoolExecutor initializer for the 'process' pool."""
+    django.setup()
+    # A forked child inherits the parent's database sockets; drop them without
+    # closing so the parent's sessions are left intact.
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LeadsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'leads'
+
+    def ready(self):
+        # Connects the signals that keep the reference data cache current.
+        from leads import reference  # noqa: F401
+        # ...and the lead typeahead index.
+        from leads import typeahead  # noqa: F401
@@ -0,0 +1,124 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections
+from leads.models import LeadAuditLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'buffered',       # 'buffered' or 'sync'
+    'BATCH_SIZE': 200,        # flush as soon as this many rows are waiting
+    'FLUSH_INTERVAL': 2.0,    # ...or after this many seconds
+    'MAX_BUFFER': 10000,      # rows beyond this are dropped and counted
+}
+
+
+def sink_setting(name):
+    return getattr(settings, 'LEAD_AUDIT_SINK', {}).get(name, DEFAULTS[name])
+
+
+class BufferedAuditSink:
+    """
+    In-process sink for high-volume LeadAuditLog rows (search/filter reads).
+
+    Rows are queued in memory and written with bulk_create by a background
+    thread once BATCH_SIZE rows are waiting or FLUSH_INTERVAL seconds have
+    passed, and once more when the worker process exits. Because
+    `timestamp` is auto_now_add it records flush time, which trails the
+    request by at most FLUSH_INTERVAL. In 'sync' mode each row is saved
+    immediately, which is what tests should use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._counters = {'enqueued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0}
+        atexit.register(self.shutdown)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['pending'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def record(self, **fields):
+        entry = LeadAuditLog(**fields)
+        if sink_setting('MODE') == 'sync':
+            entry.save()
+            self._count('flushed')
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._count('dropped')
+            return
+        self._count('enqueued')
+        if self._queue.qsize() >= sink_setting('BATCH_SIZE'):
+            self._wake.set()
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            # A forked worker inherits neither the thread nor a usable queue.
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=sink_setting('MAX_BUFFER'))
+                self._pid = os.getpid()
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='lead-audit-sink', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(sink_setting('FLUSH_INTERVAL'))
+            self._wake.clear()
+            self.flush()
+            close_old_connections()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def flush(self):
+        if self._queue is None:
+            return 0
+        with self._flush_lock:
+            batch = self._drain()
+            if not batch:
+                return 0
+            try:
+                LeadAuditLog.objects.bulk_create(batch, batch_size=sink_setting('BATCH_SIZE'))
+            except Exception:
+                logger.exception("Failed to flush %d lead audit rows", len(batch))
+                self._count('failed', len(batch))
+                return 0
+            self._count('flushed', len(batch))
+            return len(batch)
+
+    def shutdown(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._pid == os.getpid():
+            self.flush()
+
+
+audit_sink = BufferedAuditSink()
@@ -0,0 +1,223 @@
+import json
+import uuid
+from django.db import connection, transaction
+from django.utils import timezone
+from leads.models import Lead, LeadAssignment, LeadAssignmentLog, LeadAuditLog
+from leads.typeahead import lead_typeahead
+
+BULK_CHUNK_SIZE = 1000
+
+# action -> (lead column the audit row records, value lookup for its old value)
+AUDITED_COLUMNS = {
+    'assign': ('assigned_to', 'assigned_to__email'),
+    'change_stage': ('status', 'status__name'),
+    'delete': ('is_deleted', 'is_deleted'),
+    'archive': ('archived', 'archived'),
+}
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _audit_value(action, value):
+    # Relations are recorded as str(related), matching the per-lead audit rows.
+    return str(value) if action in ('assign', 'change_stage') else value
+
+
+def bulk_action_changes(action, assigned_user=None, status_obj=None):
+    """Returns (column updates, audited new value) for a bulk action."""
+    if action == 'assign':
+        return {'assigned_to': assigned_user}, str(assigned_user)
+    if action == 'change_stage':
+        return {'status': status_obj}, str(status_obj)
+    if action == 'delete':
+        return {'is_deleted': True}, True
+    if action == 'archive':
+        return {'archived': True}, True
+    raise ValueError(f"Unsupported bulk action: {action}")
+
+
+def _apply_chunk(lead_ids, action, user, changes, new_value, assigned_user, now):
+    column, old_lookup = AUDITED_COLUMNS[action]
+    rows = list(
+        Lead.objects.filter(lead_id__in=lead_ids, is_deleted=False)
+        .select_for_update(of=('self',))
+        .values_list('lead_id', old_lookup)
+    )
+    if not rows:
+        return 0
+
+    LeadAuditLog.objects.bulk_create([
+        LeadAuditLog(
+            lead_id=lead_id,
+            user=user,
+            action=action,
+            old_values={column: _audit_value(action, old_value)},
+            new_values={column: new_value}
+        )
+        for lead_id, old_value in rows
+    ])
+    if action == 'assign':
+        LeadAssignment.objects.bulk_create([
+            LeadAssignment(
+                lead_id=lead_id,
+                assigned_to=assigned_user,
+                assigned_by=user,
+                assignment_method='manual',
+                is_active=True
+            )
+            for lead_id, _ in rows
+        ])
+    Lead.objects.filter(lead_id__in=[lead_id for lead_id, _ in rows]).update(updated_at=now, **changes)
+    return len(rows)
+
+
+def apply_bulk_action(lead_ids, action, user, assigned_user=None, status_obj=None, progress=None):
+    """
+    Applies a LeadBulkActionView action to the given live leads with a fixed
+    number of statements per chunk of BULK_CHUNK_SIZE ids: one locking
+    SELECT of the audited old values, one bulk INSERT of audit rows, one
+    bulk INSERT of assignments (assign only) and one UPDATE. All chunks run
+    in a single transaction. Returns the number of leads changed.
+
+    `progress`, if given, is called with (ids done, ids total) after each chunk.
+    """
+    changes, new_value = bulk_action_changes(action, assigned_user, status_obj)
+    lead_ids = list(dict.fromkeys(lead_ids))
+    now = timezone.now()
+    processed = 0
+    with transaction.atomic():
+        for done, chunk in enumerate(_chunks(lead_ids, BULK_CHUNK_SIZE), start=1):
+            processed += _apply_chunk(chunk, action, user, changes, new_value, assigned_user, now)
+            if progress is not None:
+                progress(min(done * BULK_CHUNK_SIZE, len(lead_ids)), len(lead_ids))
+        if action == 'delete':
+            # Queryset updates send no signals.
+            lead_typeahead.leads_removed(lead_ids)
+    return processed
+
+
+def _set_clause(changes):
+    columns, params = [], []
+    for name, value in changes.items():
+        field = Lead._meta.get_field(name)
+        if field.is_relation:
+            value = value.pk if value is not None else None
+        columns.append(f'{connection.ops.quote_name(field.column)} = %s')
+        params.append(field.get_db_prep_save(value, connection))
+    return ', '.join(columns), params
+
+
+def apply_bulk_action_to_queryset(queryset, action, user, assigned_user=None, status_obj=None):
+    """
+    Applies a bulk action to every live lead `queryset` selects, resolved and
+    written server-side in one statement: a CTE locks the matching rows and
+    captures their audited old values, then the UPDATE, the audit INSERT and
+    (for assign) the assignment INSERT all run off that CTE. Returns the
+    number of leads changed.
+    """
+    column, old_lookup = AUDITED_COLUMNS[action]
+    changes, new_value = bulk_action_changes(action, assigned_user, status_obj)
+    set_sql, set_params = _set_clause(changes)
+    user_id = Lead._meta.get_field('assigned_by').get_db_prep_save(user.pk, connection)
+    old_value = "COALESCE(target.old_value, 'None')" if action in ('assign', 'change_stage') else 'target.old_value'
+
+    lead_table = Lead._meta.db_table
+    assignment_sql, assignment_params = '', []
+    if action == 'assign':
+        assignment_sql = f"""
+            , assignment AS (
+                INSERT INTO {LeadAssignment._meta.db_table}
+                    (lead_id, assigned_to_id, assigned_by_id, assigned_at, assignment_method, is_active)
+                SELECT target.lead_id, %s, %s, now(), 'manual', true FROM target
+            )"""
+        assignment_params = [set_params[0], user_id]
+
+    with transaction.atomic():
+        target = (
+            Lead.objects.filter(lead_id__in=queryset.values('lead_id'), is_deleted=False)
+            .select_for_update(of=('self',))
+            .values_list('lead_id', old_lookup)
+        )
+        target_sql, target_params = target.query.get_compiler(connection=connection).as_sql()
+        sql = f"""
+            WITH target(lead_id, old_value) AS ({target_sql}),
+            updated AS (
+                UPDATE {lead_table} SET {set_sql}, updated_at = now()
+                FROM target WHERE {lead_table}.lead_id = target.lead_id
+                RETURNING {lead_table}.lead_id
+            ),
+            audit AS (
+                INSERT INTO {LeadAuditLog._meta.db_table}
+                    (audit_id, lead_id, user_id, action, old_values, new_values, timestamp)
+                SELECT gen_random_uuid(), target.lead_id, %s, %s,
+                       jsonb_build_object(%s::text, {old_value}), %s::jsonb, now()
+                FROM target
+            ){assignment_sql}
+            SELECT count(*) FROM updated
+        """
+        params = [
+            *target_params, *set_params,
+            user_id, action, column, json.dumps({column: new_value}),
+            *assignment_params,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            processed = cursor.fetchone()[0]
+        if action == 'delete' and processed:
+            lead_typeahead.leads_changed_in_bulk()
+        return processed
+
+
+def _parse_lead_ids(lead_ids):
+    """Splits raw ids into (unique UUIDs in request order, ids to skip)."""
+    parsed, skipped, seen = [], [], set()
+    for raw in lead_ids:
+        try:
+            lead_id = uuid.UUID(str(raw))
+        except ValueError:
+            skipped.append(str(raw))
+            continue
+        if lead_id in seen:
+            skipped.append(str(raw))
+            continue
+        seen.add(lead_id)
+        parsed.append((raw, lead_id))
+    return parsed, skipped
+
+
+def assign_unassigned_leads(lead_ids, assignee, assigned_by):
+    """
+    ManualLeadAssignView's batch path: assigns every live, unassigned lead in
+    `lead_ids` to `assignee` and returns (assigned_count, skipped ids).
+
+    Candidates are locked with one SELECT ... FOR UPDATE, so a concurrent
+    assignment of the same leads waits and then sees them as assigned. Unknown,
+    malformed, duplicate, deleted and already-assigned ids are skipped.
+    """
+    parsed, skipped = _parse_lead_ids(lead_ids)
+    now = timezone.now()
+    with transaction.atomic():
+        current = dict(
+            Lead.objects.filter(lead_id__in=[lead_id for _, lead_id in parsed], is_deleted=False)
+            .select_for_update(of=('self',))
+            .values_list('lead_id', 'assigned_to_id')
+        )
+        to_assign = []
+        for raw, lead_id in parsed:
+            if lead_id in current and current[lead_id] is None:
+                to_assign.append(lead_id)
+            else:
+                skipped.append(str(raw))
+
+        if to_assign:
+            Lead.objects.filter(lead_id__in=to_assign).update(
+                assigned_to=assignee, assigned_at=now, assigned_by=assigned_by, updated_at=now
+            )
+            LeadAssignmentLog.objects.bulk_create([
+                LeadAssignmentLog(lead_id=lead_id, assigned_to=assignee, assigned_by=assigned_by, method='manual')
+                for lead_id in to_assign
+            ])
+    return len(to_assign), skipped
@@ -0,0 +1,26 @@
+from jobs.registry import job_handler
+from leads.bulk import apply_bulk_action, apply_bulk_action_to_queryset
+from leads.models import Lead, LeadStatus
+from leads.reference import reference_data
+from leads.utils import filter_leads
+from users.models import User
+
+
+@job_handler('leads.bulk_action')
+def run_bulk_action(job):
+    """Background form of LeadBulkActionView; the payload is its validated data."""
+    payload = job.payload
+    action = payload['action']
+    user = User.objects.get(id=payload['user_id'])
+    assigned_user = User.objects.get(id=payload['assigned_to']) if action == 'assign' else None
+    status_obj = reference_data.get(LeadStatus, payload['status_id']) if action == 'change_stage' else None
+
+    if payload.get('filters'):
+        leads = filter_leads(Lead.objects.filter(is_deleted=False), **payload['filters'])
+        processed = apply_bulk_action_to_queryset(leads, action, user, assigned_user=assigned_user, status_obj=status_obj)
+    else:
+        processed = apply_bulk_action(
+            payload['lead_ids'], action, user, assigned_user=assigned_user, status_obj=status_obj,
+            progress=job.report_progress
+        )
+    return {'processed': processed}
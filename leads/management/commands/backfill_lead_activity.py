@@ -0,0 +1,55 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from leads.models import LeadActivity
+from leads.timeline import activity_rows, activity_sources
+
+
+class Command(BaseCommand):
+    help = "Rebuilds LeadActivity from the audit, note, task, call, email and follow-up tables in primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--sleep', type=float, default=0.0, help="Seconds to pause between batches.")
+        parser.add_argument('--type', action='append', dest='types', help="Only this entry type (repeatable).")
+        parser.add_argument('--rebuild', action='store_true', help="Delete existing activity of the selected types first.")
+
+    def handle(self, *args, **options):
+        sources = activity_sources()
+        types = options['types'] or list(sources)
+        unknown = set(types) - set(sources)
+        if unknown:
+            raise CommandError(f"Unknown entry type(s): {', '.join(sorted(unknown))}")
+
+        started = time.monotonic()
+        if options['rebuild']:
+            deleted, _ = LeadActivity.objects.filter(entry_type__in=types).delete()
+            self.stdout.write(f"Deleted {deleted} activity rows.")
+
+        inserted = 0
+        for entry_type in types:
+            queryset = sources[entry_type].order_by('pk')
+            last_pk = None
+            scanned = 0
+            while True:
+                batch = queryset.filter(pk__gt=last_pk) if last_pk else queryset
+                pks = list(batch.values_list('pk', flat=True)[:options['batch_size']])
+                if not pks:
+                    break
+                last_pk = pks[-1]
+                scanned += len(pks)
+                with transaction.atomic():
+                    # Rows the triggers already wrote are skipped by the unique constraint.
+                    created = LeadActivity.objects.bulk_create(
+                        activity_rows(queryset.filter(pk__in=pks)), ignore_conflicts=True
+                    )
+                inserted += len(created)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{entry_type}: scanned {scanned} rows.")
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled lead activity for {', '.join(types)}: {inserted} rows written in {elapsed:.1f}s."
+        ))
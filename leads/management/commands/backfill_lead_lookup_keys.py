@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand
+from leads.models import Lead, normalize_email, normalize_phone
+
+
+class Command(BaseCommand):
+    help = "Fills Lead.phone_digits and Lead.email_normalized for existing rows in primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--sleep', type=float, default=0.0, help="Seconds to pause between batches.")
+        parser.add_argument('--all', action='store_true', help="Recompute every row, not only rows missing keys.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Lead.objects.only('lead_id', 'phone', 'email', 'phone_digits', 'email_normalized').order_by('lead_id')
+        last_id = None
+        scanned = updated = 0
+        started = time.monotonic()
+
+        while True:
+            batch = queryset.filter(lead_id__gt=last_id) if last_id else queryset
+            leads = list(batch[:batch_size])
+            if not leads:
+                break
+            last_id = leads[-1].lead_id
+            scanned += len(leads)
+
+            changed = []
+            for lead in leads:
+                phone_digits = normalize_phone(lead.phone)
+                email_normalized = normalize_email(lead.email)
+                if options['all'] or (lead.phone_digits, lead.email_normalized) != (phone_digits, email_normalized):
+                    lead.phone_digits = phone_digits
+                    lead.email_normalized = email_normalized
+                    changed.append(lead)
+
+            if changed:
+                # bulk_update skips save(), so updated_at is left untouched.
+                Lead.objects.bulk_update(changed, ['phone_digits', 'email_normalized'])
+                updated += len(changed)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Scanned {scanned} leads, updated {updated}.")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled lookup keys on {updated} of {scanned} leads in {elapsed:.1f}s."
+        ))
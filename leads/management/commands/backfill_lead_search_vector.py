@@ -0,0 +1,55 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from leads.models import Lead
+
+# Touching name fires the leads_lead_search_vector trigger, so the vector
+# comes from the same expression as for new rows. A raw UPDATE leaves
+# updated_at untouched.
+BACKFILL_BATCH_SQL = """
+UPDATE {table} SET name = name
+WHERE lead_id IN (
+    SELECT lead_id FROM {table}
+    WHERE lead_id > %s {missing}
+    ORDER BY lead_id
+    LIMIT %s
+)
+RETURNING lead_id
+"""
+
+
+class Command(BaseCommand):
+    help = "Fills Lead.search_vector for rows that predate its trigger, in primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--sleep', type=float, default=0.0, help="Seconds to pause between batches.")
+        parser.add_argument('--all', action='store_true', help="Recompute every row, not only rows missing a vector.")
+
+    def handle(self, *args, **options):
+        sql = BACKFILL_BATCH_SQL.format(
+            table=Lead._meta.db_table,
+            missing='' if options['all'] else 'AND search_vector IS NULL',
+        )
+        last_id = '00000000-0000-0000-0000-000000000000'
+        updated = 0
+        started = time.monotonic()
+
+        while True:
+            # Each batch commits on its own, so row locks are held for one batch only.
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [last_id, options['batch_size']])
+                lead_ids = [row[0] for row in cursor.fetchall()]
+            if not lead_ids:
+                break
+            last_id = max(lead_ids)
+            updated += len(lead_ids)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Updated {updated} leads.")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled search vectors on {updated} leads in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,64 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from leads.bulk import AUDITED_COLUMNS, apply_bulk_action, apply_bulk_action_to_queryset
+from leads.models import Lead, LeadStatus
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Times lead bulk actions over growing selections of throwaway leads and counts "
+        "their statements. Every run is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help="Comma-separated selection sizes.")
+        parser.add_argument('--action', choices=sorted(AUDITED_COLUMNS), default='assign')
+        parser.add_argument('--path', choices=['ids', 'filter'], default='ids',
+                            help="apply_bulk_action over lead ids, or apply_bulk_action_to_queryset over a filter.")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the fastest is reported.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers.")
+        user = User.objects.filter(is_active=True).first()
+        if user is None:
+            raise CommandError("At least one active user is needed to act as the assigner.")
+
+        self.stdout.write(f"{options['action']} via {options['path']}")
+        for size in sizes:
+            timings = []
+            for _ in range(max(options['repeat'], 1)):
+                elapsed, statements, processed = self._run(size, options['action'], options['path'], user)
+                timings.append(elapsed)
+            best = min(timings)
+            self.stdout.write(
+                f"{size:>8} leads  {processed:>8} changed  {statements:>4} statements  "
+                f"{best * 1000:>9.1f} ms  {best / size * 1e6:>7.1f} us/lead"
+            )
+
+    def _run(self, size, action, path, user):
+        tag = f"bulk-benchmark-{uuid.uuid4().hex[:8]}"
+        with transaction.atomic():
+            status_obj = LeadStatus.objects.create(name=tag) if action == 'change_stage' else None
+            leads = Lead.objects.bulk_create(
+                [Lead(name=f"{tag} {number}") for number in range(size)], batch_size=2000
+            )
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                if path == 'ids':
+                    processed = apply_bulk_action(
+                        [lead.lead_id for lead in leads], action, user, assigned_user=user, status_obj=status_obj
+                    )
+                else:
+                    processed = apply_bulk_action_to_queryset(
+                        Lead.objects.filter(name__startswith=tag), action, user, assigned_user=user, status_obj=status_obj
+                    )
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed, len(queries), processed
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+from leads.models import LeadActivity
+from leads.timeline import activity_rows, activity_sources
+
+
+class Command(BaseCommand):
+    help = "Compares LeadActivity with its source tables and reports missing and orphaned rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Insert missing rows and delete orphaned ones.")
+        parser.add_argument('--sample', type=int, default=5, help="Source ids to print per problem.")
+
+    def handle(self, *args, **options):
+        problems = 0
+        for entry_type, source in activity_sources().items():
+            activity = LeadActivity.objects.filter(entry_type=entry_type)
+            missing = source.filter(~Exists(activity.filter(source_id=OuterRef('pk'))))
+            orphaned = activity.filter(~Exists(source.model._default_manager.filter(pk=OuterRef('source_id'))))
+            missing_count = missing.count()
+            orphaned_count = orphaned.count()
+            problems += missing_count + orphaned_count
+
+            line = f"{entry_type}: {missing_count} missing, {orphaned_count} orphaned"
+            if missing_count or orphaned_count:
+                self.stdout.write(self.style.WARNING(line))
+                for pk in missing.values_list('pk', flat=True)[:options['sample']]:
+                    self.stdout.write(f"  missing {pk}")
+                for pk in orphaned.values_list('source_id', flat=True)[:options['sample']]:
+                    self.stdout.write(f"  orphaned {pk}")
+            else:
+                self.stdout.write(line)
+
+            if options['fix'] and (missing_count or orphaned_count):
+                LeadActivity.objects.bulk_create(activity_rows(missing), batch_size=2000, ignore_conflicts=True)
+                orphaned.delete()
+
+        if problems and not options['fix']:
+            raise CommandError(f"LeadActivity is out of sync with its sources ({problems} rows).")
+        self.stdout.write(self.style.SUCCESS("LeadActivity checked."))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['created_at', 'lead_id'], name='lead_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['updated_at', 'lead_id'], name='lead_live_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name', 'lead_id'], name='lead_live_name_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# Existing rows keep a NULL search_vector until `manage.py
+# backfill_lead_search_vector` fills them in batches; rewriting the whole
+# table here would hold every lead's row lock until the migration commits.
+LEAD_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION leads_lead_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        -- The address whole, then split into local part/domain and into words.
+        setweight(to_tsvector('simple', coalesce(NEW.email, '') || ' ' ||
+            replace(coalesce(NEW.email, ''), '@', ' ') || ' ' ||
+            translate(coalesce(NEW.email, ''), '@.', '  ')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.company, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER leads_lead_search_vector
+    BEFORE INSERT OR UPDATE OF name, email, company ON leads_lead
+    FOR EACH ROW EXECUTE FUNCTION leads_lead_search_vector_update();
+"""
+
+DROP_LEAD_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS leads_lead_search_vector ON leads_lead;
+DROP FUNCTION IF EXISTS leads_lead_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0002_lead_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(LEAD_SEARCH_VECTOR_SQL, DROP_LEAD_SEARCH_VECTOR_SQL),
+        migrations.AddIndex(
+            model_name='lead',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lead_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:54
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0003_lead_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150, null=True),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='phone_digits',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(django.contrib.postgres.indexes.OpClass('phone_digits', name='varchar_pattern_ops'), name='lead_phone_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Reverse('phone_digits'), name='text_pattern_ops'), name='lead_phone_digits_rev_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0004_lead_lookup_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leadauditlog',
+            name='action',
+            field=models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('assign', 'Assign'), ('change_stage', 'Change Stage'), ('archive', 'Archive'), ('delete', 'Delete'), ('search', 'Search'), ('filter', 'Filter')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='leadauditlog',
+            name='lead',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='leads.lead'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0005_leadauditlog_read_actions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leadauditlog',
+            index=models.Index(fields=['lead', '-timestamp'], name='lead_audit_lead_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadcalllog',
+            index=models.Index(fields=['lead', '-created_at'], name='lead_call_lead_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leademaillog',
+            index=models.Index(fields=['lead', '-sent_at'], name='lead_email_lead_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadnote',
+            index=models.Index(fields=['lead', '-created_at'], name='lead_note_lead_ts_idx'),
+        ),
+    ]
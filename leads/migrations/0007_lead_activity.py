@@ -0,0 +1,167 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# One insert trigger per source table, each projecting the row the same way
+# leads.timeline.activity_sources() does for the backfill; one shared delete
+# trigger removes the activity of a deleted source row.
+LEAD_ACTIVITY_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION leads_activity_delete() RETURNS trigger AS $$
+BEGIN
+    -- TG_ARGV: entry type, primary key column of the source table.
+    DELETE FROM leads_leadactivity
+    WHERE entry_type = TG_ARGV[0] AND source_id = (to_jsonb(OLD) ->> TG_ARGV[1])::uuid;
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leads_activity_from_audit() RETURNS trigger AS $$
+BEGIN
+    -- Search/filter audit rows have no lead.
+    IF NEW.lead_id IS NOT NULL THEN
+        INSERT INTO leads_leadactivity (lead_id, actor_id, entry_type, source_id, occurred_at, description, metadata)
+        VALUES (NEW.lead_id, NEW.user_id, 'audit', NEW.audit_id, NEW.timestamp,
+                coalesce(NEW.action, '') || ' performed',
+                jsonb_build_object('old_values', NEW.old_values, 'new_values', NEW.new_values))
+        ON CONFLICT (entry_type, source_id) DO NOTHING;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leads_activity_from_note() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO leads_leadactivity (lead_id, actor_id, entry_type, source_id, occurred_at, description, metadata)
+    VALUES (NEW.lead_id, NEW.user_id, 'note', NEW.note_id, NEW.created_at,
+            'Note added',
+            jsonb_build_object('content', NEW.content))
+    ON CONFLICT (entry_type, source_id) DO NOTHING;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leads_activity_from_task() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO leads_leadactivity (lead_id, actor_id, entry_type, source_id, occurred_at, description, metadata)
+    VALUES (NEW.lead_id, NEW.created_by_id, 'task', NEW.task_id, NEW.created_at,
+            'Task created: ' || coalesce(NEW.title, ''),
+            jsonb_build_object('status', CASE WHEN NEW.completed THEN 'completed' ELSE 'pending' END,
+                               'due_date', NEW.due_date))
+    ON CONFLICT (entry_type, source_id) DO NOTHING;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leads_activity_from_call() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO leads_leadactivity (lead_id, actor_id, entry_type, source_id, occurred_at, description, metadata)
+    VALUES (NEW.lead_id, NEW.user_id, 'call', NEW.call_id, NEW.created_at,
+            'Call logged (' || coalesce(NEW.duration::varchar, '') || ' mins)',
+            jsonb_build_object('call_type', NEW.call_type, 'notes', NEW.notes))
+    ON CONFLICT (entry_type, source_id) DO NOTHING;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leads_activity_from_email() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO leads_leadactivity (lead_id, actor_id, entry_type, source_id, occurred_at, description, metadata)
+    VALUES (NEW.lead_id, NEW.user_id, 'email', NEW.email_id, NEW.sent_at,
+            'Email sent: ' || coalesce(NEW.subject, ''),
+            jsonb_build_object('subject', NEW.subject, 'body', NEW.body))
+    ON CONFLICT (entry_type, source_id) DO NOTHING;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leads_activity_from_followup() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO leads_leadactivity (lead_id, actor_id, entry_type, source_id, occurred_at, description, metadata)
+    VALUES (NEW.lead_id, NEW.created_by_id, 'followup', NEW.id, NEW.created_at,
+            'Follow-up scheduled: ' || coalesce(NEW.type, ''),
+            jsonb_build_object('type', NEW.type, 'status', NEW.status,
+                               'date_time', NEW.date_time, 'notes', NEW.notes))
+    ON CONFLICT (entry_type, source_id) DO NOTHING;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER leads_activity_audit AFTER INSERT ON leads_leadauditlog
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_from_audit();
+CREATE TRIGGER leads_activity_audit_delete AFTER DELETE ON leads_leadauditlog
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_delete('audit', 'audit_id');
+CREATE TRIGGER leads_activity_note AFTER INSERT ON leads_leadnote
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_from_note();
+CREATE TRIGGER leads_activity_note_delete AFTER DELETE ON leads_leadnote
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_delete('note', 'note_id');
+CREATE TRIGGER leads_activity_task AFTER INSERT ON tasks_tasks
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_from_task();
+CREATE TRIGGER leads_activity_task_delete AFTER DELETE ON tasks_tasks
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_delete('task', 'task_id');
+CREATE TRIGGER leads_activity_call AFTER INSERT ON leads_leadcalllog
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_from_call();
+CREATE TRIGGER leads_activity_call_delete AFTER DELETE ON leads_leadcalllog
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_delete('call', 'call_id');
+CREATE TRIGGER leads_activity_email AFTER INSERT ON leads_leademaillog
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_from_email();
+CREATE TRIGGER leads_activity_email_delete AFTER DELETE ON leads_leademaillog
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_delete('email', 'email_id');
+CREATE TRIGGER leads_activity_followup AFTER INSERT ON tasks_followup
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_from_followup();
+CREATE TRIGGER leads_activity_followup_delete AFTER DELETE ON tasks_followup
+    FOR EACH ROW EXECUTE FUNCTION leads_activity_delete('followup', 'id');
+"""
+
+DROP_LEAD_ACTIVITY_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS leads_activity_audit ON leads_leadauditlog;
+DROP TRIGGER IF EXISTS leads_activity_audit_delete ON leads_leadauditlog;
+DROP TRIGGER IF EXISTS leads_activity_note ON leads_leadnote;
+DROP TRIGGER IF EXISTS leads_activity_note_delete ON leads_leadnote;
+DROP TRIGGER IF EXISTS leads_activity_task ON tasks_tasks;
+DROP TRIGGER IF EXISTS leads_activity_task_delete ON tasks_tasks;
+DROP TRIGGER IF EXISTS leads_activity_call ON leads_leadcalllog;
+DROP TRIGGER IF EXISTS leads_activity_call_delete ON leads_leadcalllog;
+DROP TRIGGER IF EXISTS leads_activity_email ON leads_leademaillog;
+DROP TRIGGER IF EXISTS leads_activity_email_delete ON leads_leademaillog;
+DROP TRIGGER IF EXISTS leads_activity_followup ON tasks_followup;
+DROP TRIGGER IF EXISTS leads_activity_followup_delete ON tasks_followup;
+DROP FUNCTION IF EXISTS leads_activity_from_audit();
+DROP FUNCTION IF EXISTS leads_activity_from_note();
+DROP FUNCTION IF EXISTS leads_activity_from_task();
+DROP FUNCTION IF EXISTS leads_activity_from_call();
+DROP FUNCTION IF EXISTS leads_activity_from_email();
+DROP FUNCTION IF EXISTS leads_activity_from_followup();
+DROP FUNCTION IF EXISTS leads_activity_delete();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0006_lead_timeline_indexes'),
+        ('tasks', '0002_task_timeline_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadActivity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entry_type', models.CharField(choices=[('audit', 'Audit'), ('note', 'Note'), ('task', 'Task'), ('call', 'Call'), ('email', 'Email'), ('followup', 'Follow-up')], max_length=20)),
+                ('source_id', models.UUIDField()),
+                ('occurred_at', models.DateTimeField()),
+                ('description', models.TextField()),
+                ('metadata', models.JSONField(blank=True, null=True)),
+                ('actor', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lead_activities', to=settings.AUTH_USER_MODEL)),
+                ('lead', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='leads.lead')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['lead', '-occurred_at', '-id'], name='lead_activity_lead_idx'), models.Index(fields=['actor', '-occurred_at', '-id'], name='lead_activity_actor_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entry_type', 'source_id'), name='lead_activity_source_uniq')],
+            },
+        ),
+        migrations.RunSQL(LEAD_ACTIVITY_TRIGGERS_SQL, DROP_LEAD_ACTIVITY_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:44
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0008_lead_updated_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), condition=models.Q(('is_deleted', False)), name='lead_live_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('company'), name='text_pattern_ops'), condition=models.Q(('is_deleted', False)), name='lead_live_company_prefix_idx'),
+        ),
+    ]
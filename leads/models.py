@@ -1,6 +1,20 @@
+import re
 import uuid
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Lower, Reverse
+
+NON_DIGITS_RE = re.compile(r'\D')
+
+def normalize_phone(value):
+    digits = NON_DIGITS_RE.sub('', value or '')
+    return digits or None
+
+def normalize_email(value):
+    value = (value or '').strip().lower()
+    return value or None
 
 class LeadTag(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -85,10 +99,48 @@ class Lead(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='created_leads')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by the leads_lead_search_vector trigger (name, email, company);
+    # rows older than the trigger are filled by backfill_lead_search_vector.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Lookup keys derived from phone/email on save; see backfill_lead_lookup_keys.
+    phone_digits = models.CharField(max_length=20, blank=True, null=True, editable=False)
+    email_normalized = models.CharField(max_length=150, blank=True, null=True, editable=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Full-text matches on search_vector (LeadSearchView).
+            GinIndex(fields=['search_vector'], name='lead_search_vector_idx'),
+            # Exact and leading-digit matches on the normalized number.
+            models.Index(OpClass('phone_digits', name='varchar_pattern_ops'), name='lead_phone_digits_idx'),
+            # Trailing-digit matches (numbers dialled without a country code).
+            models.Index(OpClass(Reverse('phone_digits'), name='text_pattern_ops'), name='lead_phone_digits_rev_idx'),
+            # Keyset pagination walks (sort column, lead_id) over live leads.
+            models.Index(fields=['created_at', 'lead_id'], name='lead_live_created_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['updated_at', 'lead_id'], name='lead_live_updated_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['name', 'lead_id'], name='lead_live_name_idx', condition=models.Q(is_deleted=False)),
+            # Newest change to any lead, live or soft-deleted (LeadListView's ETag).
+            models.Index(fields=['updated_at'], name='lead_updated_idx'),
+            # Leading-word prefix matches (LeadTypeaheadView without its in-process index).
+            models.Index(OpClass(Lower('name'), name='text_pattern_ops'), name='lead_live_name_prefix_idx', condition=models.Q(is_deleted=False)),
+            models.Index(OpClass(Lower('company'), name='text_pattern_ops'), name='lead_live_company_prefix_idx', condition=models.Q(is_deleted=False)),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone)
+        self.email_normalized = normalize_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'phone' in update_fields:
+                update_fields.add('phone_digits')
+            if 'email' in update_fields:
+                update_fields.add('email_normalized')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class LeadAssignment(models.Model):
     lead = models.ForeignKey(Lead, on_delete=models.CASCADE)
@@ -110,18 +162,27 @@ class LeadAuditLog(models.Model):
         ('change_stage', 'Change Stage'),
         ('archive', 'Archive'),
         ('delete', 'Delete'),
+        ('search', 'Search'),
+        ('filter', 'Filter'),
     ]
 
     audit_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    lead = models.ForeignKey(Lead, on_delete=models.CASCADE)
+    lead = models.ForeignKey(Lead, on_delete=models.CASCADE, null=True, blank=True)  # null for search/filter reads
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     old_values = models.JSONField(blank=True, null=True)
     new_values = models.JSONField(blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # One lead's log, newest first (LeadAuditLogListView).
+            models.Index(fields=['lead', '-timestamp'], name='lead_audit_lead_ts_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.lead.name} - {self.action} by {self.user}"
+        target = self.lead.name if self.lead_id else "leads"
+        return f"{target} - {self.action} by {self.user}"
 
 class LeadNote(models.Model):
     note_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -130,6 +191,10 @@ class LeadNote(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # One lead's notes, newest first (LeadNotesListView).
+        indexes = [models.Index(fields=['lead', '-created_at'], name='lead_note_lead_ts_idx')]
+
     def __str__(self):
         return f"Note by {self.user} on {self.lead.name}"
 
@@ -150,6 +215,10 @@ class LeadCallLog(models.Model):
     external_id = models.CharField(max_length=150, blank=True, null=True)  # For Twilio/Exotel SID
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # One lead's calls, newest first (LeadCallLogView).
+        indexes = [models.Index(fields=['lead', '-created_at'], name='lead_call_lead_ts_idx')]
+
     def __str__(self):
         return f"{self.call_type.title()} call for {self.lead.name}"
 
@@ -161,9 +230,52 @@ class LeadEmailLog(models.Model):
     body = models.TextField()
     sent_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # One lead's emails, newest first (LeadEmailLogListView).
+        indexes = [models.Index(fields=['lead', '-sent_at'], name='lead_email_lead_ts_idx')]
+
     def __str__(self):
         return f"Email to {self.lead.name} - {self.subject}"
     
+class LeadActivity(models.Model):
+    """
+    Append-only feed of lead events, one row per audit log, note, task, call
+    log, email log and follow-up. Rows are written by database triggers on
+    those tables (migration 0007), so bulk and raw SQL inserts are covered
+    too, and only go away when their source row is deleted. See the
+    backfill_lead_activity and check_lead_activity commands.
+    """
+    ENTRY_TYPE_CHOICES = [
+        ('audit', 'Audit'),
+        ('note', 'Note'),
+        ('task', 'Task'),
+        ('call', 'Call'),
+        ('email', 'Email'),
+        ('followup', 'Follow-up'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # Indexed together with occurred_at below rather than on their own.
+    lead = models.ForeignKey(Lead, on_delete=models.CASCADE, related_name='activities', db_index=False)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='lead_activities', db_index=False)
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPE_CHOICES)
+    source_id = models.UUIDField()  # primary key of the row in the entry_type's table
+    occurred_at = models.DateTimeField()
+    description = models.TextField()
+    metadata = models.JSONField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entry_type', 'source_id'], name='lead_activity_source_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['lead', '-occurred_at', '-id'], name='lead_activity_lead_idx'),
+            models.Index(fields=['actor', '-occurred_at', '-id'], name='lead_activity_actor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entry_type} on {self.lead_id} at {self.occurred_at}"
+
 class LeadStage(models.Model):
     STAGE_TYPE_CHOICES = [
         ('Open', 'Open'),
@@ -0,0 +1,162 @@
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from crm_backend.invalidation import invalidation_bus
+from leads.models import LeadSource, LeadStage, LeadStatus, LeadTag
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 3600,  # seconds a snapshot is trusted without a version bump
+}
+
+BUS_NAMESPACE = 'leads.reference'
+
+# Reference models and the order their cached lists are kept in.
+REFERENCE_MODELS = {
+    LeadSource: ('order_no', 'name'),
+    LeadStatus: ('name',),
+    LeadStage: ('order_no',),
+    LeadTag: ('name',),
+}
+
+
+def reference_setting(name):
+    return getattr(settings, 'LEAD_REFERENCE_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class _Snapshot:
+    def __init__(self, version, rows, pk_name):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.rows = rows
+        self.by_pk = {str(getattr(row, pk_name)): row for row in rows}
+        self.serialized = {}
+
+
+class ReferenceDataCache:
+    """
+    Per-process copy of the lead reference tables (sources, statuses,
+    stages, tags), which change a few times a month but are read on nearly
+    every request.
+
+    Each model has a version counter. Write paths call bump() (the model
+    signals below cover save() and delete(); queryset updates and the log
+    helpers bump explicitly), which invalidates that model's snapshot when
+    the transaction commits; the next read reloads it with one query. Bumps are broadcast on the
+    invalidation bus so other workers drop their snapshot too; snapshots
+    also expire after TTL seconds, or the bus's FALLBACK_TTL while its
+    listener is disconnected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {model: 0 for model in REFERENCE_MODELS}
+        self._snapshots = {}
+        self._counters = {model._meta.label: {'hits': 0, 'misses': 0, 'bumps': 0} for model in REFERENCE_MODELS}
+
+    def _load(self, model):
+        related = [field.name for field in model._meta.concrete_fields if field.many_to_one]
+        return list(model._default_manager.select_related(*related).order_by(*REFERENCE_MODELS[model]))
+
+    def _snapshot(self, model):
+        invalidation_bus.ensure_started()
+        snapshot = self._snapshots.get(model)
+        version = self._versions[model]
+        counters = self._counters[model._meta.label]
+        if (snapshot is not None and snapshot.version == version
+                and time.monotonic() - snapshot.loaded_at < invalidation_bus.ttl(reference_setting('TTL'))):
+            counters['hits'] += 1
+            return snapshot
+
+        counters['misses'] += 1
+        rows = self._load(model)
+        with self._lock:
+            # A bump during the load leaves the older version in place, so the next read reloads.
+            snapshot = _Snapshot(version, rows, model._meta.pk.attname)
+            if self._versions[model] == version:
+                self._snapshots[model] = snapshot
+        return snapshot
+
+    def all(self, model):
+        """Every row of `model`, in REFERENCE_MODELS order."""
+        if not reference_setting('ENABLED'):
+            return list(model._default_manager.order_by(*REFERENCE_MODELS[model]))
+        return list(self._snapshot(model).rows)
+
+    def get(self, model, pk):
+        """The row of `model` with primary key `pk`, or None."""
+        if pk is None:
+            return None
+        if not reference_setting('ENABLED'):
+            return model._default_manager.filter(pk=pk).first()
+        return self._snapshot(model).by_pk.get(str(pk))
+
+    def serialized(self, model, pk, serializer_class):
+        """serializer_class(row).data for the row, computed once per snapshot."""
+        if not reference_setting('ENABLED'):
+            row = self.get(model, pk)
+            return serializer_class(row).data if row is not None else None
+        snapshot = self._snapshot(model)
+        key = (serializer_class, str(pk))
+        if key not in snapshot.serialized:
+            row = snapshot.by_pk.get(str(pk))
+            snapshot.serialized[key] = serializer_class(row).data if row is not None else None
+        return snapshot.serialized[key]
+
+    def _bump(self, models):
+        with self._lock:
+            for model in models:
+                self._versions[model] += 1
+                self._snapshots.pop(model, None)
+                self._counters[model._meta.label]['bumps'] += 1
+
+    def bump(self, *models, publish=True):
+        """
+        Invalidates the snapshots of `models` (all of them by default) here
+        and in every worker once the current transaction commits, so no read
+        can cache rows the write has not committed (or rolled back) under the
+        new version. `publish=False` is for bumps received from the bus,
+        which arrive after the commit and apply at once.
+        """
+        models = models or tuple(REFERENCE_MODELS)
+        if not publish:
+            self._bump(models)
+            return
+        transaction.on_commit(lambda: self._bump(models))
+        for model in models:
+            invalidation_bus.publish(BUS_NAMESPACE, model._meta.label)
+
+    def stats(self):
+        stats = {}
+        for model in REFERENCE_MODELS:
+            label = model._meta.label
+            snapshot = self._snapshots.get(model)
+            stats[label] = dict(
+                self._counters[label],
+                version=self._versions[model],
+                rows=len(snapshot.rows) if snapshot else None,
+            )
+        return stats
+
+
+reference_data = ReferenceDataCache()
+
+
+def _bump_on_write(sender, **kwargs):
+    reference_data.bump(sender)
+
+
+def _bump_from_bus(label):
+    models = [model for model in REFERENCE_MODELS if label in (None, model._meta.label)]
+    if models:
+        reference_data.bump(*models, publish=False)
+
+
+invalidation_bus.subscribe(BUS_NAMESPACE, _bump_from_bus)
+
+
+for _model in REFERENCE_MODELS:
+    post_save.connect(_bump_on_write, sender=_model, dispatch_uid=f'reference_data_{_model._meta.label_lower}_save')
+    post_delete.connect(_bump_on_write, sender=_model, dispatch_uid=f'reference_data_{_model._meta.label_lower}_delete')
@@ -3,8 +3,12 @@ from .models import Lead, LeadAssignmentLog, LeadCallLog, LeadEmailLog, LeadSour
 from .models import LeadStage, LeadStageLog
 from django.contrib.auth import get_user_model
 from users.models import User
+from .reference import reference_data
 User = get_user_model()
 
+# Lead columns maintained for search/lookup only; never part of the API.
+LEAD_INTERNAL_FIELDS = ['search_vector', 'phone_digits', 'email_normalized']
+
 class LeadSourceAuditLogSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()
 
@@ -23,35 +27,80 @@ class LeadStatusSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class CachedReferenceField(serializers.Field):
+    """
+    Read-only nested representation of a reference row (source, status,
+    stage, tag) served from the in-process reference cache, so serializing
+    a page of leads costs no query for it. Point `source` at the foreign
+    key column, e.g. source='status_id'.
+    """
+
+    def __init__(self, model, serializer_class, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.model = model
+        self.serializer_class = serializer_class
+
+    def to_representation(self, value):
+        return reference_data.serialized(self.model, value, self.serializer_class)
+
 class UserMinimalSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'first_name', 'last_name', 'email']
+        fields = ['id', 'name', 'email']
 
 class LeadListSerializer(serializers.ModelSerializer):
-    source = LeadSourceSerializer(read_only=True)
-    status = LeadStatusSerializer(read_only=True)
+    source = CachedReferenceField(LeadSource, LeadSourceSerializer, source='source_id')
+    status = CachedReferenceField(LeadStatus, LeadStatusSerializer, source='status_id')
     assigned_to = UserMinimalSerializer(read_only=True)
     created_by = UserMinimalSerializer(read_only=True)
 
     class Meta:
         model = Lead
-        fields = '__all__'
+        exclude = LEAD_INTERNAL_FIELDS
 
 class LeadAssignmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = LeadAssignment
         fields = '__all__'
 
+class LeadBulkFilterSerializer(serializers.Serializer):
+    # Same criteria as LeadFilterView, validated into filter_leads() keywords.
+    sourceIds = serializers.ListField(child=serializers.UUIDField(), required=False, source='source_ids')
+    statusIds = serializers.ListField(child=serializers.UUIDField(), required=False, source='status_ids')
+    assignedToIds = serializers.ListField(child=serializers.UUIDField(), required=False, source='assigned_to_ids')
+    tagIds = serializers.ListField(child=serializers.UUIDField(), required=False, source='tag_ids')
+    dateFrom = serializers.DateField(required=False, source='date_from')
+    dateTo = serializers.DateField(required=False, source='date_to')
+
+    def validate(self, attrs):
+        if ('date_from' in attrs) != ('date_to' in attrs):
+            raise serializers.ValidationError("dateFrom and dateTo must be given together.")
+        if not any(attrs.values()):
+            raise serializers.ValidationError("At least one filter is required.")
+        return attrs
+
 class LeadBulkActionSerializer(serializers.Serializer):
     lead_ids = serializers.ListField(
         child=serializers.UUIDField(),
-        allow_empty=False
+        allow_empty=False,
+        required=False
     )
+    # Alternative to lead_ids: act on every live lead matching these filters.
+    filters = LeadBulkFilterSerializer(required=False)
     action = serializers.ChoiceField(choices=['assign', 'change_stage', 'delete', 'archive'])
     # Optional fields based on action type
     assigned_to = serializers.UUIDField(required=False)
     status_id = serializers.UUIDField(required=False)
+    # Report how many leads would be affected without changing anything.
+    dry_run = serializers.BooleanField(default=False)
+    # Run as a background job (see /jobs/<id>/) instead of inside the request.
+    background = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if ('lead_ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError("Provide either lead_ids or filters.")
+        return attrs
 
 class LeadAuditLogSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()
@@ -64,7 +113,7 @@ class LeadAuditLogSerializer(serializers.ModelSerializer):
 class LeadDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lead
-        fields = '__all__'
+        exclude = LEAD_INTERNAL_FIELDS
         read_only_fields = ['lead_id', 'created_by', 'created_at', 'updated_at']
 
 class LeadTagSerializer(serializers.ModelSerializer):
@@ -92,7 +141,7 @@ class LeadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lead
         fields = [
-            'id', 'name', 'email', 'phone', 'company',
+            'lead_id', 'name', 'email', 'phone', 'company',
             'source', 'status', 'assigned_to', 'priority',
             'tags', 'notes', 'created_by', 'created_at', 'updated_at'
         ]
@@ -1,3 +1,597 @@
-from django.test import TestCase
+import itertools
+import random
+import threading
+import time
+import uuid
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from crm_backend.testing import without_bus
+from leads.audit import BufferedAuditSink
+from leads.bulk import apply_bulk_action, apply_bulk_action_to_queryset, assign_unassigned_leads
+from leads.models import Lead, LeadActivity, LeadAssignment, LeadAssignmentLog, LeadAuditLog, LeadNote, LeadSource, LeadStatus, LeadTag
+from leads.reference import ReferenceDataCache, reference_data
+from leads.serializers import LeadListSerializer, LeadSerializer
+from leads.typeahead import LeadTypeahead, _PackedIndex, normalize as typeahead_normalize, typeahead_setting
+from leads.utils import build_lead_search_query, encode_cursor, paginate_by_cursor
+from tasks.models import Tasks
+from users.models import User
+from users.querysets import eager_load
 
-# Create your tests here.
+
+def make_leads(count, prefix='Lead', **fields):
+    return Lead.objects.bulk_create([Lead(name=f"{prefix} {number}", **fields) for number in range(count)])
+
+
+
+def cursor_request(**params):
+    return Request(APIRequestFactory().get('/', params))
+
+
+@without_bus
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for priority in ('high', 'low', None, 'high', None, 'low', 'high'):
+            Lead.objects.create(name='Lead', priority=priority)
+
+    def _walk(self, ordering):
+        seen, params = [], {'page_size': 2}
+        while True:
+            data, error = paginate_by_cursor(Lead.objects.all(), cursor_request(**params), ordering)
+            self.assertIsNone(error)
+            seen += [(lead.priority, lead.lead_id) for lead in data['Details']]
+            if not data['has_more']:
+                return seen
+            params['cursor'] = data['next_cursor']
+
+    def test_pages_cover_every_row_once_across_ties_and_nulls(self):
+        rows = list(Lead.objects.values_list('priority', 'lead_id'))
+        # NULLs sort last ascending and first descending; lead_id breaks ties.
+        ascending = sorted(rows, key=lambda row: (row[0] is None, row[0] or '', row[1].bytes))
+
+        self.assertEqual(self._walk('priority'), ascending)
+        self.assertEqual(self._walk('-priority'), ascending[::-1])
+
+    def test_tampered_cursors_are_rejected(self):
+        for position in (['x', 'y'], ['2024-01-01T00:00:00Z', 'not-a-uuid'], [{'a': 1}, 5], ['2024-01-01T00:00:00Z', None], [1]):
+            data, error = paginate_by_cursor(Lead.objects.all(), cursor_request(cursor=encode_cursor(position)), '-created_at')
+            self.assertEqual((data, error), (None, "Invalid cursor."), position)
+        data, error = paginate_by_cursor(Lead.objects.all(), cursor_request(cursor='%%%'), '-created_at')
+        self.assertEqual(error, "Invalid cursor.")
+
+    def test_lead_list_answers_a_bad_cursor_with_400(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('agent@example.com', 'secret'))
+
+        response = client.get('/api/leads/', {'cursor': encode_cursor(['x', 'y'])})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['status'], 'failure')
+
+
+@without_bus
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'secret', name='Admin')
+        cls.agent = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+
+    def _statements(self, count, action='assign'):
+        lead_ids = [lead.lead_id for lead in make_leads(count)]
+        with CaptureQueriesContext(connection) as queries:
+            processed = apply_bulk_action(lead_ids, action, self.admin, assigned_user=self.agent)
+        self.assertEqual(processed, count)
+        return len(queries)
+
+    def test_statement_count_does_not_grow_with_the_selection(self):
+        self.assertEqual(self._statements(5), self._statements(500))
+        self.assertEqual(self._statements(5, 'archive'), self._statements(500, 'archive'))
+
+    def test_assign_writes_leads_audit_rows_and_assignments(self):
+        leads = make_leads(3)
+        processed = apply_bulk_action([lead.lead_id for lead in leads], 'assign', self.admin, assigned_user=self.agent)
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(Lead.objects.filter(assigned_to=self.agent).count(), 3)
+        audit = LeadAuditLog.objects.filter(action='assign')
+        self.assertEqual(audit.count(), 3)
+        self.assertEqual(audit.first().old_values, {'assigned_to': 'None'})
+        self.assertEqual(audit.first().new_values, {'assigned_to': str(self.agent)})
+        self.assertEqual(LeadAssignment.objects.filter(assigned_to=self.agent, assigned_by=self.admin).count(), 3)
+
+    def test_deleted_and_duplicate_ids_are_skipped(self):
+        live, deleted = make_leads(2)
+        Lead.objects.filter(pk=deleted.pk).update(is_deleted=True)
+
+        processed = apply_bulk_action([live.lead_id, live.lead_id, deleted.lead_id], 'archive', self.admin)
+
+        self.assertEqual(processed, 1)
+        self.assertEqual(LeadAuditLog.objects.filter(action='archive').count(), 1)
+        self.assertFalse(Lead.objects.get(pk=deleted.pk).archived)
+
+    def test_delete_stamps_updated_at(self):
+        lead, = make_leads(1)
+        before = Lead.objects.get(pk=lead.pk).updated_at
+
+        apply_bulk_action([lead.lead_id], 'delete', self.admin)
+
+        lead.refresh_from_db()
+        self.assertTrue(lead.is_deleted)
+        self.assertGreater(lead.updated_at, before)
+
+    def test_progress_is_reported_per_chunk(self):
+        lead_ids = [lead.lead_id for lead in make_leads(3)]
+        calls = []
+        apply_bulk_action(lead_ids, 'archive', self.admin, progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(calls, [(3, 3)])
+
+
+@without_bus
+class FilteredBulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'secret', name='Admin')
+        cls.agent = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+        cls.web = LeadSource.objects.create(name='Web', order_no=1)
+        cls.fair = LeadSource.objects.create(name='Fair', order_no=2)
+
+    def setUp(self):
+        self.matching = make_leads(3, 'Web', source=self.web)
+        self.other = make_leads(2, 'Fair', source=self.fair)
+
+    def test_runs_as_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            processed = apply_bulk_action_to_queryset(
+                Lead.objects.filter(source=self.web), 'assign', self.admin, assigned_user=self.agent
+            )
+        statements = [query for query in queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(processed, 3)
+        self.assertEqual(len(statements), 1)
+
+    def test_assign_writes_leads_audit_rows_and_assignments_for_matches_only(self):
+        Lead.objects.filter(pk=self.matching[0].pk).update(is_deleted=True)
+
+        processed = apply_bulk_action_to_queryset(
+            Lead.objects.filter(source=self.web), 'assign', self.admin, assigned_user=self.agent
+        )
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(Lead.objects.filter(assigned_to=self.agent).count(), 2)
+        self.assertFalse(Lead.objects.filter(source=self.fair, assigned_to__isnull=False).exists())
+        audit = LeadAuditLog.objects.filter(action='assign', user=self.admin)
+        self.assertEqual(audit.count(), 2)
+        self.assertEqual(audit.first().old_values, {'assigned_to': 'None'})
+        self.assertEqual(audit.first().new_values, {'assigned_to': str(self.agent)})
+        self.assertEqual(LeadAssignment.objects.filter(assigned_to=self.agent, assignment_method='manual').count(), 2)
+
+    def test_change_stage_records_the_old_status_name(self):
+        new, won = LeadStatus.objects.create(name='New'), LeadStatus.objects.create(name='Won')
+        Lead.objects.filter(source=self.web).update(status=new)
+
+        apply_bulk_action_to_queryset(Lead.objects.filter(source=self.web), 'change_stage', self.admin, status_obj=won)
+
+        self.assertEqual(Lead.objects.filter(status=won).count(), 3)
+        audit = LeadAuditLog.objects.get(action='change_stage', lead=self.matching[0])
+        self.assertEqual((audit.old_values, audit.new_values), ({'status': 'New'}, {'status': 'Won'}))
+
+    def test_dry_run_counts_without_changing_anything(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post('/api/leads/bulk-action/', {
+            'action': 'archive',
+            'filters': {'sourceIds': [str(self.web.pk)]},
+            'dry_run': True,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'count': 3, 'dry_run': True})
+        self.assertFalse(Lead.objects.filter(archived=True).exists())
+        self.assertFalse(LeadAuditLog.objects.exists())
+
+
+@without_bus
+@override_settings(LEAD_AUDIT_SINK={'MODE': 'sync'})
+class LeadSearchVectorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+
+    def setUp(self):
+        self.lead = Lead.objects.create(name='Ada Lovelace', email='ada.l@analytical.io', company='Difference Engines')
+
+    def _matches(self, term):
+        return list(Lead.objects.filter(search_vector=build_lead_search_query(term)).values_list('name', flat=True))
+
+    def test_trigger_indexes_name_email_parts_and_company(self):
+        for term in ('lovel', 'ada lov', 'analytical', 'ada.l@analytical.io', 'engine'):
+            self.assertEqual(self._matches(term), ['Ada Lovelace'], term)
+        self.assertEqual(self._matches('babbage'), [])
+
+    def test_trigger_follows_updates(self):
+        self.lead.company = 'Analytical Society'
+        self.lead.save()
+        self.assertEqual(self._matches('society'), ['Ada Lovelace'])
+        self.assertEqual(self._matches('engine'), [])
+
+    def test_search_view_ranks_matches_and_logs_the_search(self):
+        Lead.objects.create(name='Charles Babbage', company='Ada Works')
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/leads/search/', {'search': 'ada'})
+
+        names = [lead['name'] for lead in response.json()['data']['Details']]
+        self.assertEqual(names, ['Ada Lovelace', 'Charles Babbage'])
+        self.assertTrue(LeadAuditLog.objects.filter(action='search', new_values={'term': 'ada'}).exists())
+
+    def test_backfill_fills_missing_vectors_without_touching_updated_at(self):
+        Lead.objects.filter(pk=self.lead.pk).update(search_vector=None)
+        updated_at = Lead.objects.get(pk=self.lead.pk).updated_at
+
+        call_command('backfill_lead_search_vector', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(self._matches('lovel'), ['Ada Lovelace'])
+        self.assertEqual(Lead.objects.get(pk=self.lead.pk).updated_at, updated_at)
+
+
+@without_bus
+class LeadActivityTriggerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+        cls.lead = Lead.objects.create(name='Ada Lovelace')
+
+    def _activity(self, entry_type):
+        return LeadActivity.objects.filter(lead=self.lead, entry_type=entry_type)
+
+    def test_inserts_add_activity_and_deletes_remove_it(self):
+        note = LeadNote.objects.create(lead=self.lead, user=self.user, content='Called back')
+        task = Tasks.objects.create(lead=self.lead, title='Send quote', created_by=self.user)
+
+        note_activity = self._activity('note').get()
+        self.assertEqual((note_activity.source_id, note_activity.actor_id), (note.pk, self.user.pk))
+        self.assertEqual(note_activity.metadata, {'content': 'Called back'})
+        self.assertEqual(self._activity('task').get().description, 'Task created: Send quote')
+
+        note.delete()
+        task.delete()
+        self.assertFalse(LeadActivity.objects.exists())
+
+    def test_only_lead_audit_rows_become_activity(self):
+        LeadAuditLog.objects.create(lead=self.lead, user=self.user, action='archive', new_values={'archived': True})
+        LeadAuditLog.objects.create(lead=None, user=self.user, action='search', new_values={'term': 'ada'})
+
+        self.assertEqual(list(LeadActivity.objects.values_list('entry_type', 'description')), [('audit', 'archive performed')])
+
+    def test_check_command_finds_and_fixes_drift(self):
+        LeadNote.objects.create(lead=self.lead, user=self.user, content='Called back')
+        call_command('check_lead_activity', stdout=StringIO())
+
+        LeadActivity.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('check_lead_activity', stdout=StringIO())
+        call_command('check_lead_activity', fix=True, stdout=StringIO())
+        self.assertEqual(self._activity('note').count(), 1)
+
+    def test_recent_activity_lists_the_users_actions(self):
+        LeadNote.objects.create(lead=self.lead, user=self.user, content='Called back')
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/activity/recent/')
+
+        entry, = response.json()['data']['Details']
+        self.assertEqual((entry['type'], entry['lead_id']), ('note', str(self.lead.pk)))
+
+    def test_recent_activity_rejects_a_malformed_user_id(self):
+        self.user.is_staff = True
+        self.user.save()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/activity/recent/', {'user_id': 'abc'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['status'], 'failure')
+
+
+@without_bus
+class BufferedAuditSinkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+
+    def setUp(self):
+        self.sink = BufferedAuditSink()
+        self.addCleanup(self.sink.shutdown)
+
+    def _record(self, term):
+        self.sink.record(user_id=self.user.pk, lead=None, action='search', old_values=None, new_values={'term': term})
+
+    @override_settings(LEAD_AUDIT_SINK={'MODE': 'sync'})
+    def test_sync_mode_writes_each_row_at_once(self):
+        self._record('ada')
+        self.assertEqual(LeadAuditLog.objects.get().new_values, {'term': 'ada'})
+        self.assertEqual(self.sink.stats()['flushed'], 1)
+
+    @override_settings(LEAD_AUDIT_SINK={'MODE': 'buffered', 'FLUSH_INTERVAL': 60, 'BATCH_SIZE': 100, 'MAX_BUFFER': 2})
+    def test_buffered_mode_writes_on_flush_and_drops_past_the_buffer(self):
+        for term in ('ada', 'bob', 'cy'):
+            self._record(term)
+        self.assertFalse(LeadAuditLog.objects.exists())
+
+        self.assertEqual(self.sink.flush(), 2)
+        self.assertEqual(sorted(row['term'] for row in LeadAuditLog.objects.values_list('new_values', flat=True)), ['ada', 'bob'])
+        self.assertEqual(self.sink.stats(), {'enqueued': 2, 'flushed': 2, 'dropped': 1, 'failed': 0, 'pending': 0})
+
+
+def typeahead_keys(text):
+    words = typeahead_normalize(text).split(' ')
+    return [' '.join(words[start:]) for start in range(min(len(words), typeahead_setting('MAX_WORDS')))]
+
+
+def brute_force_typeahead(leads, prefix, limit):
+    """The lead ids _PackedIndex.search should return for `leads`, a dict of lead_id -> (name, company, stamp)."""
+    matches = [
+        (stamp, lead_id) for lead_id, (name, company, stamp) in leads.items()
+        if any(key.startswith(prefix) for key in typeahead_keys(name) + typeahead_keys(company))
+    ]
+    return [lead_id for _, lead_id in sorted(matches, reverse=True)[:limit]]
+
+
+class PackedTypeaheadIndexTests(SimpleTestCase):
+    WORDS = ['ada', 'adams', 'adler', 'bob', 'bobby', 'élodie', 'engines', 'analytical', 'works', 'co']
+    PREFIXES = ['a', 'ad', 'ada', 'adam', 'b', 'bobb', 'él', 'e', 'eng', 'works', 'co', 'ada l', 'x']
+
+    def setUp(self):
+        self.random = random.Random(7)
+        self.stamps = itertools.count(1)
+        self.leads = {}
+        for _ in range(300):
+            self.leads[str(uuid.uuid4())] = self._fields()
+
+    def _fields(self):
+        name = ' '.join(self.random.choice(self.WORDS).title() for _ in range(self.random.randint(1, 5)))
+        company = self.random.choice([None, '', ' '.join(self.random.sample(self.WORDS, 2))])
+        return name, company, float(next(self.stamps))
+
+    def _build(self, leads):
+        rows = sorted(leads.items(), key=lambda item: uuid.UUID(item[0]).bytes)
+        return _PackedIndex.build((lead_id, name, company, stamp) for lead_id, (name, company, stamp) in rows)
+
+    def assertMatchesBruteForce(self, index, leads):
+        for prefix in self.PREFIXES:
+            found = [row['lead_id'] for row in index.search(prefix, 10)]
+            self.assertEqual(found, brute_force_typeahead(leads, prefix, 10), prefix)
+        self.assertEqual(len(index), len(leads))
+
+    def test_search_matches_a_brute_force_scan(self):
+        index = self._build(self.leads)
+        self.assertMatchesBruteForce(index, self.leads)
+
+        lead_id, (name, company, _) = next(iter(self.leads.items()))
+        row, = [row for row in index.search(typeahead_normalize(name), 300) if row['lead_id'] == lead_id]
+        self.assertEqual(row, {'lead_id': lead_id, 'name': name, 'company': company})
+
+    def test_upserts_and_removes_match_a_brute_force_scan_before_and_after_a_rebuild(self):
+        index = self._build(self.leads)
+        for _ in range(400):
+            lead_id = self.random.choice(list(self.leads))
+            if self.random.random() < 0.2:
+                del self.leads[lead_id]
+                index.remove(lead_id)
+            else:
+                if self.random.random() < 0.3:
+                    lead_id = str(uuid.uuid4())
+                self.leads[lead_id] = self._fields()
+                index.upsert(lead_id, *self.leads[lead_id])
+        index.remove(uuid.uuid4())
+
+        self.assertMatchesBruteForce(index, self.leads)
+        self.assertMatchesBruteForce(self._build(self.leads), self.leads)
+
+    def test_build_rejects_rows_out_of_lead_id_order(self):
+        rows = [(lead_id, name, company, stamp) for lead_id, (name, company, stamp) in self.leads.items()]
+        rows.sort(key=lambda row: uuid.UUID(row[0]).bytes, reverse=True)
+        with self.assertRaises(ValueError):
+            _PackedIndex.build(rows)
+
+    @override_settings(LEAD_TYPEAHEAD={'MAX_PENDING_KEYS': 10})
+    def test_pending_keys_past_the_limit_ask_for_compaction(self):
+        index = self._build(self.leads)
+        self.assertFalse(index.needs_compaction())
+        for lead_id in list(self.leads)[:10]:
+            index.upsert(lead_id, 'Ada Lovelace', 'Analytical Engines', float(next(self.stamps)))
+        self.assertTrue(index.needs_compaction())
+
+
+@without_bus
+@override_settings(LEAD_TYPEAHEAD={'ENABLED': True})
+class LeadTypeaheadBuildTests(TransactionTestCase):
+    def test_changes_made_during_a_build_are_merged_into_the_new_index(self):
+        kept, removed = Lead.objects.create(name='Ada Lovelace'), Lead.objects.create(name='Ada Byron')
+        typeahead = LeadTypeahead()
+        typeahead._building, typeahead._replay = True, [
+            (str(removed.pk), None, None, 0.0, False),
+            (str(kept.pk), 'Adalyn Kept', None, time.time(), True),
+        ]
+        rebuilds = []
+        typeahead.rebuild = lambda: rebuilds.append(True)
+
+        typeahead._build()
+
+        self.assertEqual([row['name'] for row in typeahead._index.search('ada', 10)], ['Adalyn Kept'])
+        self.assertEqual((typeahead._building, typeahead._replay), (False, None))
+        with self.settings(LEAD_TYPEAHEAD={'ENABLED': True, 'MAX_PENDING_KEYS': 0}):
+            typeahead._change((str(kept.pk), 'Ada Again', None, time.time(), True))
+        self.assertEqual(rebuilds, [True])
+
+
+@without_bus
+class LeadTypeaheadViewTests(TestCase):
+    def test_database_fallback_matches_leading_words_newest_first(self):
+        Lead.objects.create(name='Ada Lovelace', company='Analytical Engines')
+        Lead.objects.create(name='Charles Babbage', company='ADA Works')
+        Lead.objects.create(name='Lovelace Ada')
+        Lead.objects.create(name='Ada Deleted', is_deleted=True)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('agent@example.com', 'secret'))
+
+        response = client.get('/api/leads/typeahead/', {'q': ' ADA '})
+
+        self.assertEqual([lead['name'] for lead in response.json()['data']], ['Charles Babbage', 'Ada Lovelace'])
+        self.assertEqual(client.get('/api/leads/typeahead/', {'q': 'a'}).status_code, 400)
+
+
+@without_bus
+class EagerLoadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+        cls.source = LeadSource.objects.create(name='Web', order_no=1)
+        cls.status = LeadStatus.objects.create(name='New')
+        cls.tag = LeadTag.objects.create(name='vip')
+
+    def setUp(self):
+        # The rows above were created in a transaction that never commits, so their bumps never ran.
+        reference_data.bump(publish=False)
+
+    def _serialize(self, count, serializer_class):
+        for lead in make_leads(count, source=self.source, status=self.status, assigned_to=self.user, created_by=self.user):
+            lead.tags.add(self.tag)
+            LeadNote.objects.create(lead=lead, user=self.user, content='Called back')
+        reference_data.all(LeadSource), reference_data.all(LeadStatus)
+        with CaptureQueriesContext(connection) as queries:
+            data = serializer_class(eager_load(Lead.objects.all(), serializer_class), many=True).data
+        Lead.objects.all().delete()
+        return data, len(queries)
+
+    def test_list_serializer_joins_users_and_prefetches_tag_ids(self):
+        _, few_queries = self._serialize(2, LeadListSerializer)
+        data, queries = self._serialize(10, LeadListSerializer)
+        self.assertEqual((few_queries, queries), (2, 2))
+        self.assertEqual(data[0]['tags'], [self.tag.pk])
+        self.assertEqual(data[0]['assigned_to']['name'], 'Agent')
+        self.assertEqual(data[0]['source']['name'], 'Web')
+
+    def test_detail_serializer_prefetches_tags_and_notes_once(self):
+        few, few_queries = self._serialize(2, LeadSerializer)
+        many, many_queries = self._serialize(10, LeadSerializer)
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(many_queries, 3)
+        self.assertEqual(many[0]['tags'], [{'id': str(self.tag.pk), 'name': 'vip'}])
+        self.assertEqual(len(many[0]['notes']), 1)
+
+
+@without_bus
+class AssignUnassignedLeadsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'secret', name='Admin')
+        cls.agent = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+
+    def test_assigns_live_unassigned_leads_and_skips_the_rest(self):
+        free, deleted, taken = make_leads(3)
+        Lead.objects.filter(pk=deleted.pk).update(is_deleted=True)
+        Lead.objects.filter(pk=taken.pk).update(assigned_to=self.admin)
+        unknown = uuid.uuid4()
+
+        assigned, skipped = assign_unassigned_leads(
+            [free.pk, 'not-a-uuid', str(free.pk), deleted.pk, taken.pk, unknown], self.agent, self.admin
+        )
+
+        self.assertEqual(assigned, 1)
+        self.assertEqual(skipped, ['not-a-uuid', str(free.pk), str(deleted.pk), str(taken.pk), str(unknown)])
+        self.assertEqual(Lead.objects.get(pk=free.pk).assigned_to, self.agent)
+        self.assertEqual(Lead.objects.get(pk=taken.pk).assigned_to, self.admin)
+        self.assertEqual(LeadAssignmentLog.objects.get().lead_id, free.pk)
+
+
+@without_bus
+class AssignUnassignedLeadsConcurrencyTests(TransactionTestCase):
+    def test_waits_for_a_concurrent_assignment_and_then_skips_the_lead(self):
+        admin = User.objects.create_user('admin@example.com', 'secret', name='Admin')
+        agent = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+        lead, = make_leads(1)
+        holding, release = threading.Event(), threading.Event()
+        results = []
+
+        def assign_elsewhere():
+            try:
+                with transaction.atomic():
+                    Lead.objects.select_for_update().get(pk=lead.pk)
+                    holding.set()
+                    release.wait(10)
+                    Lead.objects.filter(pk=lead.pk).update(assigned_to=admin)
+            finally:
+                connection.close()
+
+        def assign_in_batch():
+            try:
+                results.append(assign_unassigned_leads([lead.pk], agent, admin))
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=assign_elsewhere)
+        holder.start()
+        try:
+            self.assertTrue(holding.wait(10))
+            batch = threading.Thread(target=assign_in_batch)
+            batch.start()
+            batch.join(0.5)
+            self.assertTrue(batch.is_alive())
+        finally:
+            release.set()
+            holder.join()
+        batch.join(10)
+
+        self.assertEqual(results, [(0, [str(lead.pk)])])
+        self.assertEqual(Lead.objects.get(pk=lead.pk).assigned_to, admin)
+
+
+@without_bus
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        self.cache = ReferenceDataCache()
+        LeadStatus.objects.create(name='New')
+
+    def _names(self):
+        return [status.name for status in self.cache.all(LeadStatus)]
+
+    def test_snapshot_is_reused_until_a_write_commits(self):
+        self.assertEqual(self._names(), ['New'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._names(), ['New'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cache.bump(LeadStatus)
+            LeadStatus.objects.create(name='Won')
+            # Not applied before the commit, so a read cannot cache uncommitted rows under the new version.
+            self.assertEqual(self.cache.stats()['leads.LeadStatus']['version'], 0)
+
+        self.assertEqual(self.cache.stats()['leads.LeadStatus']['version'], 1)
+        self.assertEqual(self._names(), ['New', 'Won'])
+
+    def test_a_rolled_back_write_leaves_the_version(self):
+        self._names()
+        with self.captureOnCommitCallbacks(execute=False):
+            self.cache.bump(LeadStatus)
+        self.assertEqual(self.cache.stats()['leads.LeadStatus']['version'], 0)
+        with self.assertNumQueries(0):
+            self._names()
+
+    def test_bumps_from_the_bus_apply_at_once(self):
+        self._names()
+        self.cache.bump(LeadStatus, publish=False)
+        self.assertEqual(self.cache.stats()['leads.LeadStatus'], {'hits': 0, 'misses': 1, 'bumps': 1, 'version': 1, 'rows': None})
+
+    def test_model_signals_bump_the_shared_cache(self):
+        version = reference_data.stats()['leads.LeadStatus']['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            LeadStatus.objects.create(name='Lost')
+        self.assertEqual(reference_data.stats()['leads.LeadStatus']['version'], version + 1)
@@ -0,0 +1,124 @@
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Cast, Concat, JSONObject
+from django.utils import timezone
+from leads.models import LeadActivity, LeadAuditLog, LeadCallLog, LeadEmailLog, LeadNote
+from leads.utils import paginate_by_cursor
+from tasks.models import FollowUp, Tasks
+from users.models import User
+
+# Projection column -> LeadActivity field. Prefixed so the annotations cannot
+# clash with columns of the source models.
+ACTIVITY_COLUMNS = {
+    'entry_lead': 'lead_id',
+    'entry_actor': 'actor_id',
+    'entry_type': 'entry_type',
+    'entry_source': 'source_id',
+    'entry_at': 'occurred_at',
+    'entry_text': 'description',
+    'entry_meta': 'metadata',
+}
+
+
+def _source(queryset, entry_type, occurred_at, actor, description, metadata):
+    """Projects one source table onto the LeadActivity row shape."""
+    return queryset.annotate(
+        entry_lead=F('lead_id'),
+        entry_actor=F(actor),
+        entry_type=Value(entry_type, output_field=CharField()),
+        entry_source=F('pk'),
+        entry_at=F(occurred_at),
+        entry_text=description,
+        entry_meta=JSONObject(**metadata),
+    )
+
+
+def activity_sources():
+    """
+    Every LeadActivity source as {entry_type: projected queryset}. These
+    mirror the insert triggers in migration 0007 and are what the backfill
+    and consistency commands rebuild and compare against.
+    """
+    return {
+        'audit': _source(
+            LeadAuditLog.objects.filter(lead__isnull=False), 'audit', 'timestamp', 'user_id',
+            Concat(F('action'), Value(' performed'), output_field=CharField()),
+            {'old_values': 'old_values', 'new_values': 'new_values'},
+        ),
+        'note': _source(
+            LeadNote.objects.all(), 'note', 'created_at', 'user_id',
+            Value('Note added', output_field=CharField()),
+            {'content': 'content'},
+        ),
+        'task': _source(
+            Tasks.objects.all(), 'task', 'created_at', 'created_by_id',
+            Concat(Value('Task created: '), F('title'), output_field=CharField()),
+            {
+                'status': Case(When(completed=True, then=Value('completed')), default=Value('pending')),
+                'due_date': 'due_date',
+            },
+        ),
+        'call': _source(
+            LeadCallLog.objects.all(), 'call', 'created_at', 'user_id',
+            Concat(Value('Call logged ('), Cast('duration', CharField()), Value(' mins)'), output_field=CharField()),
+            {'call_type': 'call_type', 'notes': 'notes'},
+        ),
+        'email': _source(
+            LeadEmailLog.objects.all(), 'email', 'sent_at', 'user_id',
+            Concat(Value('Email sent: '), F('subject'), output_field=CharField()),
+            {'subject': 'subject', 'body': 'body'},
+        ),
+        'followup': _source(
+            FollowUp.objects.all(), 'followup', 'created_at', 'created_by_id',
+            Concat(Value('Follow-up scheduled: '), F('type'), output_field=CharField()),
+            {'type': 'type', 'status': 'status', 'date_time': 'date_time', 'notes': 'notes'},
+        ),
+    }
+
+
+def activity_rows(queryset):
+    """Unsaved LeadActivity instances for the rows of a projected source queryset."""
+    return [
+        LeadActivity(**{field: row[column] for column, field in ACTIVITY_COLUMNS.items()})
+        for row in queryset.values(*ACTIVITY_COLUMNS)
+    ]
+
+
+UNKNOWN_ACTOR = {'audit': 'System'}
+
+
+def _activity_page(queryset, request, include_lead=False):
+    """
+    Cursor-paginates LeadActivity rows newest first, one index range scan
+    per page, and resolves their actors with a single query.
+    """
+    data, error = paginate_by_cursor(queryset, request, '-occurred_at')
+    if error:
+        return None, error
+
+    rows = data['Details']
+    actor_ids = {row.actor_id for row in rows if row.actor_id}
+    actors = {user.pk: str(user) for user in User.objects.filter(id__in=actor_ids).only('id', 'email')}
+    details = []
+    for row in rows:
+        entry = {
+            "type": row.entry_type,
+            "timestamp": timezone.localtime(row.occurred_at),
+            "user": actors.get(row.actor_id) or UNKNOWN_ACTOR.get(row.entry_type, "Unknown"),
+            "description": row.description,
+            "metadata": row.metadata,
+        }
+        if include_lead:
+            entry["lead_id"] = row.lead_id
+        details.append(entry)
+    data['Details'] = details
+    return data, None
+
+
+def lead_timeline_page(lead_id, request):
+    """One page of a lead's timeline. Returns (data, error) like paginate_by_cursor."""
+    return _activity_page(LeadActivity.objects.filter(lead_id=lead_id), request)
+
+
+def user_activity_page(user, request):
+    """One page of the activity `user` performed, across all leads."""
+    return _activity_page(LeadActivity.objects.filter(actor=user), request, include_lead=True)
@@ -0,0 +1,414 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import uuid
+from array import array
+from bisect import bisect_left, insort
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from crm_backend.invalidation import invalidation_bus
+from leads.models import Lead
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MIN_PREFIX': 2,        # shorter queries would rank most of the table
+    'MAX_RESULTS': 20,
+    'MAX_WORDS': 4,         # words of a name/company that can start a match
+    'BUILD_CHUNK_SIZE': 5000,
+    'MAX_PENDING_KEYS': 20000,  # keys of leads changed since the build before it is rebuilt
+}
+
+BUS_NAMESPACE = 'leads.typeahead'
+
+# Above this many changed leads, workers rebuild instead of applying one
+# notification per lead.
+BULK_REBUILD_THRESHOLD = 200
+
+# Slot flags.
+LIVE = 1
+NO_COMPANY = 2
+
+# Sorts after every byte of UTF-8 text, so prefix + END ends a prefix's run.
+END = b'\xff'
+
+
+def typeahead_setting(name):
+    return getattr(settings, 'LEAD_TYPEAHEAD', {}).get(name, DEFAULTS[name])
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+class _Keys:
+    """The packed index's key offsets viewed as the sorted sequence of keys they point at."""
+
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, position):
+        start = self.offsets[position]
+        return self.text[start:self.text.index(0, start)]
+
+
+class _Ids:
+    """The 16-byte lead ids of an index's first `count` slots, which build() lays out in id order."""
+
+    def __init__(self, ids, count):
+        self.ids = ids
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, slot):
+        return self.ids[slot * 16:slot * 16 + 16]
+
+
+class _PackedIndex:
+    """
+    Prefix index over leads packed into flat buffers, with no Python
+    object per lead or per key.
+
+    Each lead has a slot: its 16-byte id in `ids`, its updated_at in
+    `stamps`, flags in `flags`, its name and company as they are shown in
+    `display` and their normalized form (each field NUL-terminated) in
+    `text`; `display_ends` and `text_ends` hold where each slot's bytes end.
+    A key is not stored as a string: it is the offset in `text` of a word
+    that starts one of the lead's first MAX_WORDS words, and runs to the
+    field's NUL. `key_offsets` holds the keys in lexical order (UTF-8 bytes
+    sort like the text) with the owning slot in `key_slots`, so the keys
+    sharing a prefix form one contiguous run, found with two binary
+    searches, which is what walking a trie to the prefix node would yield.
+
+    The built arrays are never reordered afterwards. A changed lead gets a
+    new slot and its keys go to `pending`, a small sorted side list searched
+    alongside them; removing a lead clears its slot's LIVE flag.
+    needs_compaction() tells the owner when `pending` or the dead slots
+    have grown enough to rebuild, which merges them back in.
+    """
+
+    def __init__(self):
+        self.ids = bytearray()
+        self.stamps = array('d')
+        self.flags = bytearray()
+        self.display = bytearray()
+        self.display_ends = array('I')
+        self.text = bytearray()
+        self.text_ends = array('I')
+        self.key_offsets = array('I')
+        self.key_slots = array('I')
+        self.built_slots = 0
+        self.recent = {}
+        self.pending = []
+        self.live = 0
+        self.dead = 0
+
+    @classmethod
+    def build(cls, rows):
+        """An index over (lead_id, name, company, updated_at timestamp) rows, which must come in lead_id order."""
+        index = cls()
+        buckets = {}
+        for lead_id, name, company, stamp in rows:
+            slot = index._new_slot(lead_id, name, company, stamp)
+            if slot and index.ids[slot * 16 - 16:slot * 16] >= index.ids[slot * 16:]:
+                raise ValueError("Typeahead rows must be ordered by lead_id")
+            for offset in index._key_starts(slot):
+                bucket = bytes(index.text[offset:offset + 2])
+                if bucket not in buckets:
+                    buckets[bucket] = (array('I'), array('I'))
+                buckets[bucket][0].append(offset)
+                buckets[bucket][1].append(slot)
+        index.built_slots = len(index.flags)
+
+        # Keys sorted one two-byte bucket at a time, so only the largest
+        # bucket's keys are materialized at once.
+        keys = _Keys(index.text, None)
+        for bucket in sorted(buckets):
+            offsets, slots = buckets.pop(bucket)
+            keys.offsets = offsets
+            for position in sorted(range(len(offsets)), key=keys.__getitem__):
+                index.key_offsets.append(offsets[position])
+                index.key_slots.append(slots[position])
+        return index
+
+    def __len__(self):
+        return self.live
+
+    @property
+    def nbytes(self):
+        buffers = (self.ids, self.stamps, self.flags, self.display, self.display_ends,
+                   self.text, self.text_ends, self.key_offsets, self.key_slots)
+        return sum(len(buffer) * getattr(buffer, 'itemsize', 1) for buffer in buffers)
+
+    def _new_slot(self, lead_id, name, company, stamp):
+        slot = len(self.flags)
+        self.ids += uuid.UUID(str(lead_id)).bytes
+        self.stamps.append(stamp)
+        self.flags.append(LIVE | (NO_COMPANY if company is None else 0))
+        self.display += f"{name or ''}\0{company or ''}".encode()
+        self.display_ends.append(len(self.display))
+        for field in (name, company):
+            self.text += normalize(field).encode() + b'\0'
+        self.text_ends.append(len(self.text))
+        self.live += 1
+        return slot
+
+    def _key_starts(self, slot):
+        """Offsets in `text` of the slot's keys: each field from each of its first MAX_WORDS words on."""
+        position = self.text_ends[slot - 1] if slot else 0
+        end = self.text_ends[slot]
+        max_words = typeahead_setting('MAX_WORDS')
+        seen = set()
+        while position < end:
+            field_end = self.text.index(0, position)
+            words = 0
+            start = position
+            while start < field_end and words < max_words:
+                key = bytes(self.text[start:field_end])
+                if key not in seen:
+                    seen.add(key)
+                    yield start
+                words += 1
+                space = self.text.find(b' ', start, field_end)
+                start = field_end if space < 0 else space + 1
+            position = field_end + 1
+
+    def _find(self, lead_id):
+        slot = self.recent.get(lead_id)
+        if slot is None:
+            ids = _Ids(self.ids, self.built_slots)
+            slot = bisect_left(ids, lead_id)
+            if slot == self.built_slots or ids[slot] != lead_id:
+                return None
+        return slot if self.flags[slot] & LIVE else None
+
+    def upsert(self, lead_id, name, company, stamp):
+        self.remove(lead_id)
+        slot = self._new_slot(lead_id, name, company, stamp)
+        self.recent[uuid.UUID(str(lead_id)).bytes] = slot
+        for offset in self._key_starts(slot):
+            insort(self.pending, (bytes(self.text[offset:self.text.index(0, offset)]), slot))
+
+    def remove(self, lead_id):
+        slot = self._find(uuid.UUID(str(lead_id)).bytes)
+        if slot is None:
+            return
+        self.flags[slot] ^= LIVE
+        self.live -= 1
+        self.dead += 1
+
+    def needs_compaction(self):
+        return (
+            len(self.pending) > typeahead_setting('MAX_PENDING_KEYS')
+            or (self.dead > 1000 and self.dead * 4 > len(self.flags))
+        )
+
+    def _row(self, slot):
+        start = self.display_ends[slot - 1] if slot else 0
+        name, company = self.display[start:self.display_ends[slot]].decode().split('\0')
+        return {
+            "lead_id": str(uuid.UUID(bytes=bytes(self.ids[slot * 16:slot * 16 + 16]))),
+            "name": name,
+            "company": None if self.flags[slot] & NO_COMPANY else company,
+        }
+
+    def search(self, prefix, limit):
+        """The `limit` most recently updated live leads with a key starting with `prefix`."""
+        needle = prefix.encode()
+        keys = _Keys(self.text, self.key_offsets)
+        lo = bisect_left(keys, needle)
+        hi = bisect_left(keys, needle + END, lo)
+        slots = {slot for slot in self.key_slots[lo:hi] if self.flags[slot] & LIVE}
+
+        lo = bisect_left(self.pending, (needle,))
+        hi = bisect_left(self.pending, (needle + END,), lo)
+        slots.update(slot for _, slot in self.pending[lo:hi] if self.flags[slot] & LIVE)
+
+        best = heapq.nlargest(limit, slots, key=self.stamps.__getitem__)
+        return [self._row(slot) for slot in best]
+
+
+class LeadTypeahead:
+    """
+    Per-process prefix index over live leads' names and companies for
+    /leads/typeahead/, ranked by updated_at.
+
+    warm() builds it in a background thread from a streamed values_list;
+    until it is ready search() returns None and the view queries the
+    database. Lead saves and deletes update the index of the writing
+    process through the signals below and are broadcast on the invalidation
+    bus with the lead's indexed fields, so other workers apply them without
+    a query. Bulk changes, listener reconnects and an index that needs
+    compaction rebuild it; the current index keeps serving until the new
+    one is ready.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._index = None
+        self._building = False
+        self._replay = None
+        self._pid = None
+        self._counters = {'builds': 0, 'updates': 0, 'searches': 0}
+
+    def enabled(self):
+        return typeahead_setting('ENABLED')
+
+    def warm(self):
+        """Starts building the index in the background, once per process."""
+        if not self.enabled():
+            return
+        invalidation_bus.ensure_started()
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # A forked worker rebuilds rather than trust an index copied mid-update.
+            self._pid = os.getpid()
+            self._index = None
+            self._building = False
+        self.rebuild()
+
+    def rebuild(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self._replay = []
+        threading.Thread(target=self._build, name='lead-typeahead-build', daemon=True).start()
+
+    def _build(self):
+        try:
+            rows = (
+                Lead.objects.filter(is_deleted=False)
+                .order_by('lead_id')
+                .values_list('lead_id', 'name', 'company', 'updated_at')
+                .iterator(chunk_size=typeahead_setting('BUILD_CHUNK_SIZE'))
+            )
+            index = _PackedIndex.build(
+                (lead_id, name, company, updated_at.timestamp()) for lead_id, name, company, updated_at in rows
+            )
+        except Exception:
+            logger.exception("Building the lead typeahead index failed")
+            with self._lock:
+                self._building = False
+                self._replay = None
+            return
+        finally:
+            # The build thread's connection is not needed again.
+            connection.close()
+
+        with self._lock:
+            # Changes that arrived while the rows were streaming.
+            for change in self._replay:
+                self._apply(index, change)
+            self._index = index
+            self._building = False
+            self._replay = None
+            self._counters['builds'] += 1
+
+    @staticmethod
+    def _apply(index, change):
+        lead_id, name, company, stamp, live = change
+        if live:
+            index.upsert(lead_id, name, company, stamp)
+        else:
+            index.remove(lead_id)
+
+    def _change(self, change):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(change)
+            if self._index is not None:
+                self._apply(self._index, change)
+                if self._index.needs_compaction():
+                    self.rebuild()
+            self._counters['updates'] += 1
+
+    def lead_changed(self, lead):
+        live = not lead.is_deleted
+        change = (str(lead.pk), lead.name, lead.company, lead.updated_at.timestamp() if lead.updated_at else 0.0, live)
+        transaction.on_commit(lambda: self._change(change))
+        invalidation_bus.publish(BUS_NAMESPACE, json.dumps(change))
+
+    def leads_removed(self, lead_ids):
+        """
+        For queryset-level soft deletes (which send no signals): drops the
+        leads here and in every worker once the transaction commits.
+        """
+        if not self.enabled():
+            return
+        lead_ids = [str(lead_id) for lead_id in lead_ids]
+        if len(lead_ids) > BULK_REBUILD_THRESHOLD:
+            self.leads_changed_in_bulk()
+            return
+        for lead_id in lead_ids:
+            change = (lead_id, None, None, 0.0, False)
+            transaction.on_commit(lambda change=change: self._change(change))
+            invalidation_bus.publish(BUS_NAMESPACE, json.dumps(change))
+
+    def leads_changed_in_bulk(self):
+        """Rebuilds every worker's index after the current transaction commits."""
+        if not self.enabled():
+            return
+        transaction.on_commit(self.rebuild)
+        invalidation_bus.publish(BUS_NAMESPACE, None)
+
+    def _from_bus(self, payload):
+        if not self.enabled() or self._pid != os.getpid():
+            return
+        if payload is None:
+            self.rebuild()
+            return
+        try:
+            self._change(tuple(json.loads(payload)))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed lead typeahead notification %r", payload)
+
+    def search(self, term, limit):
+        """Matches for a normalized `term`, or None while the index is not built."""
+        self.warm()
+        with self._lock:
+            if self._index is None:
+                return None
+            self._counters['searches'] += 1
+            return self._index.search(term, limit)
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._counters,
+                ready=self._index is not None,
+                leads=len(self._index) if self._index is not None else None,
+                keys=len(self._index.key_offsets) if self._index is not None else None,
+                pending_keys=len(self._index.pending) if self._index is not None else None,
+                bytes=self._index.nbytes if self._index is not None else None,
+            )
+
+
+lead_typeahead = LeadTypeahead()
+
+
+def _lead_saved(sender, instance, **kwargs):
+    if lead_typeahead.enabled():
+        lead_typeahead.lead_changed(instance)
+
+
+def _lead_deleted(sender, instance, **kwargs):
+    if lead_typeahead.enabled():
+        instance.is_deleted = True
+        lead_typeahead.lead_changed(instance)
+
+
+invalidation_bus.subscribe(BUS_NAMESPACE, lead_typeahead._from_bus)
+post_save.connect(_lead_saved, sender=Lead, dispatch_uid='lead_typeahead_save')
+post_delete.connect(_lead_deleted, sender=Lead, dispatch_uid='lead_typeahead_delete')
@@ -4,6 +4,7 @@ from .views import LeadNotesListView, LeadRetrieveView, LeadSearchView, LeadFilt
 from .views import LeadNoteUpdateView
 from .views import LeadStageListView,LeadStageCreateView,LeadStageUpdateView,LeadStageStatusToggleView,LeadStageReorderView
 from .views import LeadEmailLogListView, LeadFullTimelineView, LeadListView, LeadNoteCreateView, LeadNoteDeleteView
+from .views import LeadLookupView, LeadTypeaheadView, ReferenceCacheStatsView, UserRecentActivityView
 from .views import LeadSourceListCreateView, LeadSourceReorderView, LeadSourceUpdateToggleView, ManualLeadAssignView, SalesUserListView, UnassignedLeadsListView
 
 
@@ -11,6 +12,8 @@ urlpatterns = [
     path('leads/', LeadListView.as_view(), name='lead-list-all'),
     path('leads/search/', LeadSearchView.as_view(), name='lead-search'),
     path('leads/filter/', LeadFilterView.as_view(), name='lead-filter'),
+    path('leads/lookup/', LeadLookupView.as_view(), name='lead-lookup'),
+    path('leads/typeahead/', LeadTypeaheadView.as_view(), name='lead-typeahead'),
     path('leads/unassigned/', UnassignedLeadsListView.as_view(), name='unassigned-leads'),
     path('leads/bulk-action/', LeadBulkActionView.as_view(), name='lead-bulk-action'),
     path('leads/<uuid:lead_id>/', LeadRetrieveView.as_view(), name='lead-detail'),
@@ -25,10 +28,12 @@ urlpatterns = [
     path('leads/<uuid:lead_id>/call-logs/', LeadCallLogView.as_view(), name='lead-call-logs'),
     path('leads/<uuid:lead_id>/email-logs/', LeadEmailLogListView.as_view(), name='lead-email-logs'),
     path('leads/<uuid:lead_id>/full-timeline/', LeadFullTimelineView.as_view()),
+    path('activity/recent/', UserRecentActivityView.as_view(), name='user-recent-activity'),
     path('lead-sources/', LeadSourceListCreateView.as_view()),
     path('lead-sources/<uuid:pk>/', LeadSourceUpdateToggleView.as_view()),
     path('lead-sources/reorder/', LeadSourceReorderView.as_view()),
     path('lead-stages/', LeadStageListView.as_view(), name='lead-stage-list'),
+    path('lead-reference/cache-stats/', ReferenceCacheStatsView.as_view(), name='lead-reference-cache-stats'),
     path('lead-stages/create/', LeadStageCreateView.as_view(), name='lead-stage-create'),
     path('lead-stages/<uuid:stage_id>/update/', LeadStageUpdateView.as_view(), name='lead-stage-update'),
     path('lead-stages/<uuid:stage_id>/toggle/', LeadStageStatusToggleView.as_view(), name='lead-stage-toggle'),
@@ -1,44 +1,213 @@
-from rest_framework.pagination import PageNumberPagination
-from leads.models import LeadAuditLog, LeadStageLog
-
-class CustomUserPagination(PageNumberPagination):
-    page_size = None
-    page_size_query_param = 'page_size'
-
-    def get_next_page_number(self, page):
-        return page.next_page_number() if page.has_next() else None
-
-    def get_previous_page_number(self, page):
-        return page.previous_page_number() if page.has_previous() else None
-
-def paginate_and_format_response(paginated_data, request, pagination_class):
-    paginator = pagination_class()
-    page = paginator.paginate_queryset(paginated_data, request)
-
-    if page is not None:
-        page_size = int(request.query_params.get('page_size', paginator.page_size))
-        return {
-            'total': paginator.page.paginator.count,
-            'page': paginator.page.number,
-            'page_size': page_size,
-            'next_page': paginator.get_next_page_number(paginator.page),
-            'previous_page': paginator.get_previous_page_number(paginator.page),
-            'Details': page
-        }, None
+import base64
+import binascii
+import json
+import re
+from django.contrib.postgres.search import SearchQuery
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.db.models.functions import Reverse
+from leads.audit import audit_sink
+from leads.models import Lead, LeadSource, LeadSourceAuditLog, LeadStage, LeadStageLog, normalize_phone
+from leads.reference import reference_data
+from users.pagination import COUNT_CACHED, COUNT_ESTIMATED, COUNT_EXACT, COUNT_NONE, CustomUserPagination, count_rows, paginate_and_format_response
+
+
+CURSOR_PAGE_SIZE = 50
+CURSOR_MAX_PAGE_SIZE = 500
+
+SEARCH_CONFIG = 'simple'
+PHONE_LIKE_RE = re.compile(r'^[\d\s()+.-]+$')
+
+
+def wants_cursor_pagination(request):
+    return 'cursor' in request.query_params or request.query_params.get('pagination') == 'cursor'
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _cursor_page_size(request):
+    try:
+        page_size = int(request.query_params.get('page_size', CURSOR_PAGE_SIZE))
+    except (TypeError, ValueError):
+        page_size = CURSOR_PAGE_SIZE
+    return max(1, min(page_size, CURSOR_MAX_PAGE_SIZE))
+
+
+def _keyset_after(field, pk_name, value, pk, descending, nullable):
+    """
+    Builds the filter selecting rows strictly after (value, pk) in the
+    order used by paginate_by_cursor. NULLs sort last ascending and first
+    descending, matching PostgreSQL's defaults so plain b-tree indexes apply.
+    """
+    after_pk = Q(**{f'{pk_name}__lt' if descending else f'{pk_name}__gt': pk})
+    if value is None:
+        condition = Q(**{f'{field}__isnull': True}) & after_pk
+        if descending:
+            condition |= Q(**{f'{field}__isnull': False})
+        return condition
+
+    op = 'lt' if descending else 'gt'
+    bound = 'lte' if descending else 'gte'
+    condition = Q(**{f'{field}__{bound}': value}) & (Q(**{f'{field}__{op}': value}) | after_pk)
+    if nullable and not descending:
+        condition |= Q(**{f'{field}__isnull': True})
+    return condition
+
+
+def paginate_by_cursor(queryset, request, ordering, count_mode=COUNT_NONE):
+    """
+    Keyset pagination over `ordering` (e.g. '-created_at') with the primary
+    key as tie-breaker. Each page is a single index range scan regardless of
+    depth; `total` is only produced when count_mode asks for one.
+
+    Returns (data, error) like paginate_and_format_response; error is set
+    when the supplied cursor cannot be decoded into the sort field's and
+    the primary key's types.
+    """
+    descending = ordering.startswith('-')
+    model_field = queryset.model._meta.get_field(ordering.lstrip('-'))
+    field = model_field.attname
+    pk_name = queryset.model._meta.pk.attname
+    page_size = _cursor_page_size(request)
+    base_queryset = queryset
+
+    if descending:
+        queryset = queryset.order_by(F(field).desc(nulls_first=True), f'-{pk_name}')
+    else:
+        queryset = queryset.order_by(F(field).asc(nulls_last=True), pk_name)
+
+    token = request.query_params.get('cursor')
+    if token:
+        position = decode_cursor(token)
+        if not position or len(position) != 2:
+            return None, "Invalid cursor."
+        try:
+            value = model_field.to_python(position[0])
+            pk = queryset.model._meta.pk.to_python(position[1])
+        except (ValidationError, TypeError, ValueError):
+            return None, "Invalid cursor."
+        if pk is None:
+            return None, "Invalid cursor."
+        queryset = queryset.filter(_keyset_after(field, pk_name, value, pk, descending, model_field.null))
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, field), getattr(last, pk_name)])
 
     return {
-        'total': len(paginated_data),
-        'page': 1,
-        'page_size': len(paginated_data),
-        'next_page': None,
-        'previous_page': None,
-        'Details': paginated_data
+        'total': count_rows(base_queryset, count_mode),
+        'total_mode': count_mode,
+        'page_size': page_size,
+        'cursor': token or None,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'Details': rows
     }, None
 
 
+def paginate_lead_queryset(queryset, request, ordering, count_mode=COUNT_EXACT):
+    """
+    Paginates a Lead queryset with keyset cursors when the client asks for
+    them (`?cursor=` or `?pagination=cursor`), page numbers otherwise.
+    Cursor pages never count unless count_mode is estimated or cached.
+    """
+    if wants_cursor_pagination(request):
+        cursor_count_mode = COUNT_NONE if count_mode == COUNT_EXACT else count_mode
+        return paginate_by_cursor(queryset, request, ordering, cursor_count_mode)
+    tie_breaker = '-lead_id' if ordering.startswith('-') else 'lead_id'
+    return paginate_and_format_response(
+        queryset.order_by(ordering, tie_breaker), request, CustomUserPagination, count_mode
+    )
+
+
+def is_phone_like(term):
+    return bool(PHONE_LIKE_RE.match(term)) and sum(ch.isdigit() for ch in term) >= 3
+
+
+def filter_by_phone_digits(queryset, term, match='affix'):
+    """
+    Matches leads on the normalized phone_digits column. 'exact' is a single
+    index probe; 'suffix' matches trailing digits through the reversed-number
+    index (numbers stored with a country code the caller didn't dial);
+    'affix' matches either leading or trailing digits.
+    """
+    digits = normalize_phone(term)
+    if not digits:
+        return queryset.none()
+    if match == 'exact':
+        return queryset.filter(phone_digits=digits)
+
+    suffix = Q(phone_digits_reversed__startswith=digits[::-1])
+    condition = suffix if match == 'suffix' else Q(phone_digits__startswith=digits) | suffix
+    return queryset.annotate(phone_digits_reversed=Reverse('phone_digits')).filter(condition)
+
+
+def lead_filters_from_params(query_params):
+    """Reads LeadFilterView's query parameters into filter_leads() keywords."""
+    return {
+        'source_ids': query_params.getlist('sourceIds[]'),
+        'status_ids': query_params.getlist('statusIds[]'),
+        'assigned_to_ids': query_params.getlist('assignedToIds[]'),
+        'date_from': query_params.get('dateFrom'),
+        'date_to': query_params.get('dateTo'),
+        'tag_ids': query_params.getlist('tagIds[]'),
+    }
+
+
+def filter_leads(queryset, source_ids=None, status_ids=None, assigned_to_ids=None, date_from=None, date_to=None, tag_ids=None):
+    """
+    The LeadFilterView criteria, shared with filter-based bulk actions. Tags
+    match through a subquery rather than a join so the result needs no
+    DISTINCT and can be used as the target of an UPDATE.
+    """
+    if tag_ids:
+        tagged = Lead.tags.through.objects.filter(leadtag_id__in=tag_ids).values('lead_id')
+        queryset = queryset.filter(lead_id__in=tagged)
+    if source_ids:
+        queryset = queryset.filter(source_id__in=source_ids)
+    if status_ids:
+        queryset = queryset.filter(status_id__in=status_ids)
+    if assigned_to_ids:
+        queryset = queryset.filter(assigned_to__in=assigned_to_ids)
+    if date_from and date_to:
+        queryset = queryset.filter(created_at__date__range=[date_from, date_to])
+    return queryset
+
+
+def build_lead_search_query(term):
+    """
+    Turns free text into a prefix-matching tsquery against Lead.search_vector:
+    every whitespace-separated word must match the start of some lexeme in
+    name, email or company. Returns None when the term has no usable words.
+    """
+    words = [word.replace("'", "''").replace('\\', '') for word in term.split()]
+    words = [word for word in words if word]
+    if not words:
+        return None
+    raw = ' & '.join(f"'{word}':*" for word in words)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
 def log_read_action(user, action_type, metadata):
-    LeadAuditLog.objects.create(
-        user=user,
+    """Queues a search/filter audit row on the buffered sink (see leads.audit)."""
+    audit_sink.record(
+        user_id=user.pk,
         lead=None,  # No specific lead associated with search/filter
         action=action_type,
         old_values=None,
@@ -67,3 +236,20 @@ def log_lead_stage_action(user, stage, action_type, old_values=None, new_values=
         old_values=old_values or {},
         new_values=new_values or {}
     )
+    # Stage writes include queryset updates (is_default) that skip signals.
+    reference_data.bump(LeadStage)
+
+
+def log_lead_source_action(user, source, action_type, old_value=None, new_value=None):
+    """
+    Logs create, update, toggle, or reorder actions on a LeadSource and
+    invalidates the cached sources.
+    """
+    LeadSourceAuditLog.objects.create(
+        source=source,
+        user=user,
+        action_type=action_type,
+        old_value=old_value,
+        new_value=new_value
+    )
+    reference_data.bump(LeadSource)
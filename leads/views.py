@@ -1,18 +1,29 @@
-from time import localtime
+import uuid
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import permissions, status
-from django.db.models import Q
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F, Q
+from django.db.models.functions import Lower
 from .serializers import LeadAssignmentLogSerializer, LeadAuditLogSerializer, LeadCallLogSerializer, LeadEmailLogSerializer, LeadListSerializer,LeadBulkActionSerializer, LeadSerializer, LeadSourceSerializer, LeadStageCreateUpdateSerializer, LeadStageSerializer
-from .utils import CustomUserPagination, log_lead_stage_action, paginate_and_format_response, log_read_action
-from django.utils import timezone
+from .timeline import lead_timeline_page, user_activity_page
+from .bulk import apply_bulk_action, apply_bulk_action_to_queryset, assign_unassigned_leads
+from .utils import COUNT_CACHED, COUNT_ESTIMATED, CustomUserPagination, log_lead_stage_action, paginate_and_format_response, log_read_action, paginate_lead_queryset
+from .reference import reference_data
+from .typeahead import lead_typeahead, normalize as typeahead_normalize, typeahead_setting
+from crm_backend.invalidation import invalidation_bus
+from crm_backend.conditional import check_conditional, latest_validator, object_validator, rows_validator
+from .utils import log_lead_source_action
+from .utils import build_lead_search_query, filter_by_phone_digits, filter_leads, is_phone_like, lead_filters_from_params
 from django.contrib.auth import get_user_model
 from users.models import User
-from tasks.models import Tasks
 
+from users.querysets import eager_load
+from jobs.utils import enqueue_job
 from users.serializers import SimpleUserSerializer
-from .models import Lead, LeadAssignment, LeadAssignmentLog, LeadCallLog, LeadEmailLog, LeadSource, LeadSourceAuditLog, LeadStage, LeadStatus, LeadAuditLog, LeadNote
+from .models import normalize_email, Lead, LeadAssignmentLog, LeadCallLog, LeadEmailLog, LeadSource, LeadStage, LeadStatus, LeadAuditLog, LeadNote
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from .serializers import LeadDetailSerializer, LeadNoteSerializer, LeadNoteUpdateSerializer
 User = get_user_model()
@@ -28,12 +39,29 @@ ALLOWED_SORT_FIELDS = {
     'assigned_to': 'assigned_to'
 }
 
+def get_lead_ordering(request):
+    sort_by = request.query_params.get('sortBy')
+    sort_order = request.query_params.get('sortOrder', 'asc')
+    if sort_by in ALLOWED_SORT_FIELDS:
+        sort_field = ALLOWED_SORT_FIELDS[sort_by]
+        return f'-{sort_field}' if sort_order == 'desc' else sort_field
+    return '-created_at'
+
+def invalid_cursor_response(message):
+    return Response({
+        "status": "failure",
+        "data": {},
+        "message": message
+    }, status=status.HTTP_400_BAD_REQUEST)
+
 class UnassignedLeadsListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        leads = Lead.objects.filter(assigned_to__isnull=True, is_deleted=False).order_by('-created_at')
-        paginated, _ = paginate_and_format_response(leads, request, CustomUserPagination)
+        leads = eager_load(Lead.objects.filter(assigned_to__isnull=True, is_deleted=False), LeadSerializer)
+        paginated, error = paginate_lead_queryset(leads, request, '-created_at', COUNT_ESTIMATED)
+        if error:
+            return invalid_cursor_response(error)
         serializer = LeadSerializer(paginated["Details"], many=True)
         paginated["Details"] = serializer.data
 
@@ -47,62 +75,42 @@ class LeadListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        queryset = Lead.objects.filter(is_deleted=False)
-        sort_by = request.query_params.get('sortBy')
-        sort_order = request.query_params.get('sortOrder', 'asc')
-        if sort_by in ALLOWED_SORT_FIELDS:
-            sort_field = ALLOWED_SORT_FIELDS[sort_by]
-            if sort_order == 'desc':
-                sort_field = f'-{sort_field}'
-            queryset = queryset.order_by(sort_field)
-        else:
-            queryset = queryset.order_by('-created_at')
+        # Soft deletes stamp updated_at, so the newest stamp over every lead
+        # (live or not) moves whenever the live set changes.
+        validators, not_modified = check_conditional(
+            request,
+            latest_validator(Lead.objects.all()),
+            latest_validator(User.objects.all()),
+            rows_validator(reference_data.all(LeadSource)),
+            rows_validator(reference_data.all(LeadStatus)),
+        )
+        if not_modified:
+            return not_modified
 
-        paginated_data, _ = paginate_and_format_response(queryset, request, CustomUserPagination)
+        queryset = eager_load(Lead.objects.filter(is_deleted=False), LeadListSerializer)
+        paginated_data, error = paginate_lead_queryset(queryset, request, get_lead_ordering(request), COUNT_ESTIMATED)
+        if error:
+            return invalid_cursor_response(error)
         serializer = LeadListSerializer(paginated_data['Details'], many=True)
         paginated_data['Details'] = serializer.data
         
-        return Response({
+        return validators.apply(Response({
             "status": "success",
             "data": paginated_data,
             "message": "Lead list retrieved successfully."
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK))
 
 
 class LeadFilterView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        queryset = Lead.objects.filter(is_deleted=False)
-        source_ids = request.query_params.getlist('sourceIds[]')
-        status_ids = request.query_params.getlist('statusIds[]')
-        assigned_to_ids = request.query_params.getlist('assignedToIds[]')
-        date_from = request.query_params.get('dateFrom')
-        date_to = request.query_params.get('dateTo')
-        tag_ids = request.query_params.getlist('tagIds[]')
-        if tag_ids:
-            leads = leads.filter(tags__id__in=tag_ids).distinct()
-        if source_ids:
-            queryset = queryset.filter(source_id__in=source_ids)
-        if status_ids:
-            queryset = queryset.filter(status_id__in=status_ids)
-        if assigned_to_ids:
-            queryset = queryset.filter(assigned_to__in=assigned_to_ids)
-        if date_from and date_to:
-            queryset = queryset.filter(created_at__date__range=[date_from, date_to])
-
-        # Sort
-        sort_by = request.query_params.get('sortBy')
-        sort_order = request.query_params.get('sortOrder', 'asc')
-        if sort_by in ALLOWED_SORT_FIELDS:
-            sort_field = ALLOWED_SORT_FIELDS[sort_by]
-            if sort_order == 'desc':
-                sort_field = f'-{sort_field}'
-            queryset = queryset.order_by(sort_field)
-        else:
-            queryset = queryset.order_by('-created_at')
+        queryset = eager_load(Lead.objects.filter(is_deleted=False), LeadListSerializer)
+        queryset = filter_leads(queryset, **lead_filters_from_params(request.query_params))
 
-        paginated_data, _ = paginate_and_format_response(queryset, request, CustomUserPagination)
+        paginated_data, error = paginate_lead_queryset(queryset, request, get_lead_ordering(request), COUNT_CACHED)
+        if error:
+            return invalid_cursor_response(error)
         serializer = LeadListSerializer(paginated_data['Details'], many=True)
         paginated_data['Details'] = serializer.data
         log_read_action(
@@ -128,20 +136,21 @@ class LeadSearchView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        search = request.query_params.get('search', '')
-        queryset = Lead.objects.select_related('source', 'status', 'assigned_to', 'created_by')
-
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(phone__icontains=search)
-            ).order_by('-created_at')
+        search = request.query_params.get('search', '').strip()
+        queryset = eager_load(Lead.objects.filter(is_deleted=False), LeadListSerializer)
+        search_query = build_lead_search_query(search)
+
+        if search and is_phone_like(search):
+            queryset = filter_by_phone_digits(queryset, search).order_by('-created_at', '-lead_id')
+        elif search_query is not None:
+            queryset = queryset.filter(search_vector=search_query).annotate(
+                rank=SearchRank(F('search_vector'), search_query)
+            ).order_by('-rank', '-created_at', '-lead_id')
         else:
             queryset = queryset.none()
 
         paginated_data, _ = paginate_and_format_response(
-            queryset, request, CustomUserPagination
+            queryset, request, CustomUserPagination, COUNT_CACHED
         )
         serializer = LeadListSerializer(paginated_data['Details'], many=True)
         paginated_data['Details'] = serializer.data
@@ -156,6 +165,89 @@ class LeadSearchView(APIView):
             "message": "Search results retrieved successfully"
         })
 
+class LeadLookupView(APIView):
+    """
+    Exact caller lookup on the normalized phone/email columns, e.g. for
+    incoming calls. `match=suffix` also accepts numbers dialled without the
+    stored country code.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_RESULTS = 20
+
+    def get(self, request):
+        phone = request.query_params.get('phone', '').strip()
+        email = request.query_params.get('email', '').strip()
+        match = request.query_params.get('match', 'exact')
+
+        if not phone and not email:
+            return Response({
+                "status": "failure",
+                "data": {},
+                "message": "Provide a phone or email to look up."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if match not in ('exact', 'suffix'):
+            return Response({
+                "status": "failure",
+                "data": {},
+                "message": "match must be 'exact' or 'suffix'."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Lead.objects.filter(is_deleted=False)
+        if phone:
+            queryset = filter_by_phone_digits(queryset, phone, match)
+        if email:
+            queryset = queryset.filter(email_normalized=normalize_email(email))
+
+        leads = eager_load(queryset, LeadListSerializer).order_by('-updated_at')[:self.MAX_RESULTS]
+        serializer = LeadListSerializer(leads, many=True)
+
+        return Response({
+            "status": "success",
+            "data": serializer.data,
+            "message": "Lead lookup completed."
+        }, status=status.HTTP_200_OK)
+
+class LeadTypeaheadView(APIView):
+    """
+    Name/company prefix matches for live leads while an agent types, most
+    recently updated first, served from the per-process index in
+    leads.typeahead. Until that index is built (or when it is disabled)
+    the database answers instead, matching only the leading word through
+    the Lower(...) text_pattern_ops indexes on Lead.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        term = typeahead_normalize(request.query_params.get('q', ''))
+        if len(term) < typeahead_setting('MIN_PREFIX'):
+            return Response({
+                "status": "failure",
+                "data": {},
+                "message": f"Type at least {typeahead_setting('MIN_PREFIX')} characters."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        max_results = typeahead_setting('MAX_RESULTS')
+        try:
+            limit = min(max(int(request.query_params.get('limit', max_results)), 1), max_results)
+        except ValueError:
+            limit = max_results
+
+        results = lead_typeahead.search(term, limit) if lead_typeahead.enabled() else None
+        if results is None:
+            results = list(
+                Lead.objects.filter(is_deleted=False)
+                .annotate(name_key=Lower('name'), company_key=Lower('company'))
+                .filter(Q(name_key__startswith=term) | Q(company_key__startswith=term))
+                .order_by('-updated_at')
+                .values('lead_id', 'name', 'company')[:limit]
+            )
+
+        return Response({
+            "status": "success",
+            "data": results,
+            "message": "Typeahead matches fetched successfully"
+        }, status=status.HTTP_200_OK)
+
 class LeadBulkActionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -169,18 +261,11 @@ class LeadBulkActionView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         data = serializer.validated_data
-        lead_ids = data['lead_ids']
         action = data['action']
         user = request.user
 
-        leads = Lead.objects.filter(lead_id__in=lead_ids, is_deleted=False)
-
-        if not leads.exists():
-            return Response({
-                "status": "failure",
-                "data": {},
-                "message": "No matching leads found."
-            }, status=status.HTTP_404_NOT_FOUND)
+        assigned_user = None
+        status_obj = None
 
         if action == 'assign':
             assigned_to_id = data.get('assigned_to')
@@ -193,92 +278,79 @@ class LeadBulkActionView(APIView):
                     "message": "Assigned user not found."
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            for lead in leads:
-                LeadAuditLog.objects.create(
-                    lead=lead,
-                    user=user,
-                    action='assign',
-                    old_values={'assigned_to': str(lead.assigned_to)},
-                    new_values={'assigned_to': str(assigned_user)}
-                )
-                LeadAssignment.objects.create(
-                    lead=lead,
-                    assigned_to=assigned_user,
-                    assigned_by=user,
-                    assigned_at=timezone.now(),
-                    assignment_method='manual',
-                    is_active=True
-                )
-                lead.assigned_to = assigned_user
-                lead.save()
-
         elif action == 'change_stage':
-            status_id = data.get('status_id')
-            try:
-                status_obj = LeadStatus.objects.get(status_id=status_id)
-            except LeadStatus.DoesNotExist:
+            status_obj = reference_data.get(LeadStatus, data.get('status_id'))
+            if status_obj is None:
                 return Response({
                     "status": "failure",
                     "data": {},
                     "message": "Status not found."
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            for lead in leads:
-                LeadAuditLog.objects.create(
-                    lead=lead,
-                    user=user,
-                    action='change_stage',
-                    old_values={'status': str(lead.status)},
-                    new_values={'status': str(status_obj)}
-                )
-            leads.update(status=status_obj)
-
-        elif action == 'delete':
-            for lead in leads:
-                LeadAuditLog.objects.create(
-                    lead=lead,
-                    user=user,
-                    action='delete',
-                    old_values={'is_deleted': lead.is_deleted},
-                    new_values={'is_deleted': True}
-                )
-            leads.update(is_deleted=True)
-
-        elif action == 'archive':
-            for lead in leads:
-                LeadAuditLog.objects.create(
-                    lead=lead,
-                    user=user,
-                    action='archive',
-                    old_values={'archived': lead.archived},
-                    new_values={'archived': True}
-                )
-            leads.update(archived=True)
-
-        else:
+        elif action not in ('delete', 'archive'):
             return Response({
                 "status": "failure",
                 "data": {},
                 "message": "Unsupported action."
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        if 'filters' in data:
+            leads = filter_leads(Lead.objects.filter(is_deleted=False), **data['filters'])
+        else:
+            leads = Lead.objects.filter(lead_id__in=data['lead_ids'], is_deleted=False)
+
+        if data['dry_run']:
+            count = leads.count()
+            return Response({
+                "status": "success",
+                "data": {"count": count, "dry_run": True},
+                "message": f"{count} leads would be processed for '{action}' action."
+            }, status=status.HTTP_200_OK)
+
+        if data['background']:
+            job = enqueue_job('leads.bulk_action', payload={**data, 'user_id': user.pk}, created_by=user)
+            return Response({
+                "status": "success",
+                "data": {"job_id": job.job_id},
+                "message": f"Bulk '{action}' action queued."
+            }, status=status.HTTP_202_ACCEPTED)
+
+        if 'filters' in data:
+            processed = apply_bulk_action_to_queryset(leads, action, user, assigned_user=assigned_user, status_obj=status_obj)
+        else:
+            processed = apply_bulk_action(data['lead_ids'], action, user, assigned_user=assigned_user, status_obj=status_obj)
+        if not processed:
+            return Response({
+                "status": "failure",
+                "data": {},
+                "message": "No matching leads found."
+            }, status=status.HTTP_404_NOT_FOUND)
+
         return Response({
             "status": "success",
             "data": {},
-            "message": f"{len(leads)} leads processed for '{action}' action."
+            "message": f"{processed} leads processed for '{action}' action."
         }, status=status.HTTP_200_OK)
     
 class LeadRetrieveView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, lead_id):
-        lead = get_object_or_404(Lead, lead_id=lead_id, is_deleted=False)
+        leads = Lead.objects.filter(lead_id=lead_id, is_deleted=False)
+        updated_at = object_validator(leads)
+        if updated_at is None:
+            raise Http404("No Lead matches the given query.")
+        validators, not_modified = check_conditional(request, updated_at, last_modified=updated_at)
+        if not_modified:
+            return not_modified
+
+        lead = get_object_or_404(leads)
         serializer = LeadDetailSerializer(lead)
-        return Response({
+        return validators.apply(Response({
             "status": "success",
             "data": serializer.data,
             "message": "Lead details retrieved successfully."
-        })
+        }))
 
 class LeadUpdateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -340,7 +412,7 @@ class LeadAuditLogListView(APIView):
     def get(self, request, lead_id):
         lead = get_object_or_404(Lead, lead_id=lead_id)
 
-        logs = LeadAuditLog.objects.filter(lead=lead).order_by('-timestamp')
+        logs = eager_load(LeadAuditLog.objects.filter(lead=lead), LeadAuditLogSerializer).order_by('-timestamp')
         serializer = LeadAuditLogSerializer(logs, many=True)
 
         return Response({
@@ -384,7 +456,7 @@ class LeadNotesListView(APIView):
 
     def get_queryset(self):
         lead_id = self.kwargs.get('lead_id')
-        return LeadNote.objects.filter(lead__lead_id=lead_id).order_by('-created_at')
+        return eager_load(LeadNote.objects.filter(lead__lead_id=lead_id), LeadNoteSerializer).order_by('-created_at')
 
     def list(self, request, *args, **kwargs):
         try:
@@ -508,7 +580,7 @@ class LeadCallLogView(APIView):
                 "message": "Lead not found"
             }, status=status.HTTP_404_NOT_FOUND)
 
-        call_logs = LeadCallLog.objects.filter(lead=lead).order_by('-created_at')
+        call_logs = eager_load(LeadCallLog.objects.filter(lead=lead), LeadCallLogSerializer).order_by('-created_at')
         paginated_data, _ = paginate_and_format_response(call_logs, request, CustomUserPagination)
         serializer = LeadCallLogSerializer(paginated_data['Details'], many=True)
 
@@ -562,7 +634,7 @@ class LeadEmailLogListView(APIView):
                 "message": "Lead not found."
             }, status=status.HTTP_404_NOT_FOUND)
 
-        email_logs = LeadEmailLog.objects.filter(lead=lead).order_by('-sent_at')
+        email_logs = eager_load(LeadEmailLog.objects.filter(lead=lead), LeadEmailLogSerializer).order_by('-sent_at')
         paginated_data, _ = paginate_and_format_response(email_logs, request, CustomUserPagination)
         serializer = LeadEmailLogSerializer(paginated_data['Details'], many=True)
 
@@ -578,97 +650,52 @@ class LeadFullTimelineView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, lead_id):
-        timeline = []
-
-        # 1. Audit Logs
-        audit_logs = LeadAuditLog.objects.filter(lead_id=lead_id)
-        for log in audit_logs:
-            timeline.append({
-                "type": "audit",
-                "timestamp": localtime(log.timestamp),
-                "user": str(log.user) if log.user else "System",
-                "description": f"{log.action} performed",
-                "metadata": {
-                    "old_values": log.old_values,
-                    "new_values": log.new_values
-                }
-            })
+        timeline, error = lead_timeline_page(lead_id, request)
+        if error:
+            return invalid_cursor_response(error)
 
-        # 2. Notes
-        from leads.models import LeadNote
-        notes = LeadNote.objects.filter(lead_id=lead_id)
-        for note in notes:
-            timeline.append({
-                "type": "note",
-                "timestamp": localtime(note.created_at),
-                "user": str(note.user) if note.user else "Unknown",
-                "description": "Note added",
-                "metadata": {
-                    "content": note.content
-                }
-            })
+        return Response({
+            "status": "success",
+            "data": timeline,
+            "message": "Full timeline fetched successfully"
+        }, status=status.HTTP_200_OK)
 
-        # 3. Tasks
-        from tasks.models import Tasks  # Assuming model is Task
-        tasks = Tasks.objects.filter(lead_id=lead_id)
-        for task in tasks:
-            timeline.append({
-                "type": "task",
-                "timestamp": localtime(task.created_at),
-                "user": str(task.created_by) if task.created_by else "Unknown",
-                "description": f"Task created: {task.title}",
-                "metadata": {
-                    "status": task.status,
-                    "due_date": task.due_date
-                }
-            })
+class UserRecentActivityView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        # 4. Call Logs
-        from leads.models import LeadCallLog
-        calls = LeadCallLog.objects.filter(lead_id=lead_id)
-        for call in calls:
-            timeline.append({
-                "type": "call",
-                "timestamp": localtime(call.timestamp),
-                "user": str(call.user) if call.user else "Unknown",
-                "description": f"Call logged ({call.duration} mins)",
-                "metadata": {
-                    "notes": call.notes
-                }
-            })
+    def get(self, request):
+        user = request.user
+        user_id = request.query_params.get('user_id')
+        if user_id and request.user.is_staff:
+            try:
+                user_id = uuid.UUID(user_id)
+            except ValueError:
+                return Response({
+                    "status": "failure",
+                    "data": {},
+                    "message": "user_id must be a valid UUID."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            user = get_object_or_404(User, id=user_id)
 
-        # 5. Email Logs (if model exists)
-        try:
-            from leads.models import LeadEmailLog
-            emails = LeadEmailLog.objects.filter(lead_id=lead_id)
-            for email in emails:
-                timeline.append({
-                    "type": "email",
-                    "timestamp": localtime(email.sent_at),
-                    "user": str(email.sent_by) if email.sent_by else "Unknown",
-                    "description": f"Email sent: {email.subject}",
-                    "metadata": {
-                        "to": email.to,
-                        "body": email.body
-                    }
-                })
-        except ImportError:
-            pass  # Handle later when implemented
-
-        # Sort all by timestamp descending
-        sorted_timeline = sorted(timeline, key=lambda x: x['timestamp'], reverse=True)
+        activity, error = user_activity_page(user, request)
+        if error:
+            return invalid_cursor_response(error)
 
         return Response({
             "status": "success",
-            "data": sorted_timeline,
-            "message": "Full timeline fetched successfully"
+            "data": activity,
+            "message": "Recent activity fetched successfully"
         }, status=status.HTTP_200_OK)
 
 class LeadSourceListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-            sources = LeadSource.objects.all().order_by('order')
+            sources = reference_data.all(LeadSource)
+            validators, not_modified = check_conditional(request, rows_validator(sources))
+            if not_modified:
+                return not_modified
+
             data, _ = paginate_and_format_response(sources, request, CustomUserPagination)
             serializer = LeadSourceSerializer(data['Details'], many=True)
 
@@ -681,11 +708,11 @@ class LeadSourceListCreateView(APIView):
                 "Details": serializer.data
             }
 
-            return Response({
+            return validators.apply(Response({
                 "status": "success",
                 "data": response_data,
                 "message": "Lead sources fetched successfully"
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK))
 
     def post(self, request):
         serializer = LeadSourceSerializer(data=request.data)
@@ -693,9 +720,9 @@ class LeadSourceListCreateView(APIView):
             source = serializer.save(created_by=request.user)
 
             # Audit log
-            LeadSourceAuditLog.objects.create(
-                source=source,
+            log_lead_source_action(
                 user=request.user,
+                source=source,
                 action_type='create',
                 old_value=None,
                 new_value=serializer.data
@@ -724,9 +751,9 @@ class LeadSourceUpdateToggleView(APIView):
         if serializer.is_valid():
             updated_source = serializer.save()
 
-            LeadSourceAuditLog.objects.create(
-                source=source,
+            log_lead_source_action(
                 user=request.user,
+                source=source,
                 action_type='update',
                 old_value=old_data,
                 new_value=serializer.data
@@ -746,22 +773,22 @@ class LeadSourceUpdateToggleView(APIView):
 
     def patch(self, request, pk):
         source = get_object_or_404(LeadSource, pk=pk)
-        old_status = source.status
-        source.status = not source.status
+        old_status = source.is_active
+        source.is_active = not source.is_active
         source.save()
 
-        LeadSourceAuditLog.objects.create(
-            source=source,
+        log_lead_source_action(
             user=request.user,
+            source=source,
             action_type='toggle',
-            old_value={"status": old_status},
-            new_value={"status": source.status}
+            old_value={"is_active": old_status},
+            new_value={"is_active": source.is_active}
         )
 
         return Response({
             "status": "success",
             "data": LeadSourceSerializer(source).data,
-            "message": f"Lead source {'activated' if source.status else 'deactivated'} successfully."
+            "message": f"Lead source {'activated' if source.is_active else 'deactivated'} successfully."
         })
 
 class LeadSourceReorderView(APIView):
@@ -772,14 +799,14 @@ class LeadSourceReorderView(APIView):
 
         for item in order_list:
             source = get_object_or_404(LeadSource, pk=item["id"])
-            old_order = source.order
-            source.order = item["order"]
+            old_order = source.order_no
+            source.order_no = item["order"]
             source.save()
 
             if old_order != item["order"]:
-                LeadSourceAuditLog.objects.create(
-                    source=source,
+                log_lead_source_action(
                     user=request.user,
+                    source=source,
                     action_type='reorder',
                     old_value={"order": old_order},
                     new_value={"order": item["order"]}
@@ -792,20 +819,41 @@ class LeadSourceReorderView(APIView):
         })
 
 
+class ReferenceCacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        # Counters are per worker process.
+        return Response({
+            "status": "success",
+            "data": {
+                "reference_data": reference_data.stats(),
+                "invalidation_bus": invalidation_bus.stats(),
+                "lead_typeahead": lead_typeahead.stats()
+            },
+            "message": "Reference cache stats fetched successfully"
+        }, status=status.HTTP_200_OK)
+
+
 class LeadStageListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        stages = LeadStage.objects.all().order_by('order_no')
+        stages = reference_data.all(LeadStage)
+        validators, not_modified = check_conditional(request, rows_validator(stages))
+        if not_modified:
+            return not_modified
+
         paginated, _ = paginate_and_format_response(stages, request, CustomUserPagination)
-        serializer = LeadStageSerializer(paginated["Details"], many=True)
-        paginated["Details"] = serializer.data
+        paginated["Details"] = [
+            reference_data.serialized(LeadStage, stage.pk, LeadStageSerializer) for stage in paginated["Details"]
+        ]
 
-        return Response({
+        return validators.apply(Response({
             "status": "success",
             "data": paginated,
             "message": "Lead stages fetched successfully"
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK))
 
 class LeadStageCreateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -946,7 +994,7 @@ class LeadAssignmentLogView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, lead_id):
-        logs = LeadAssignmentLog.objects.filter(lead_id=lead_id).order_by('-assigned_at')
+        logs = eager_load(LeadAssignmentLog.objects.filter(lead_id=lead_id), LeadAssignmentLogSerializer).order_by('-assigned_at')
         paginated, _ = paginate_and_format_response(logs, request, CustomUserPagination)
         serializer = LeadAssignmentLogSerializer(paginated["Details"], many=True)
         paginated["Details"] = serializer.data
@@ -961,14 +1009,19 @@ class SalesUserListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        sales_users = User.objects.filter(role__iexact='Sales', is_active=True).order_by('name')
+        sales_users = User.objects.filter(role__iexact='Sales', is_active=True)
+        validators, not_modified = check_conditional(request, latest_validator(User.objects.all()))
+        if not_modified:
+            return not_modified
+
+        sales_users = eager_load(sales_users, SimpleUserSerializer).order_by('name')
         serializer = SimpleUserSerializer(sales_users, many=True)
 
-        return Response({
+        return validators.apply(Response({
             "status": "success",
             "data": serializer.data,
             "message": "Sales users fetched successfully"
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK))
     
 class ManualLeadAssignView(APIView):
     permission_classes = [IsAuthenticated]
@@ -993,29 +1046,7 @@ class ManualLeadAssignView(APIView):
                 "message": "Assigned user not found."
             }, status=status.HTTP_404_NOT_FOUND)
 
-        assigned_count = 0
-        failed_ids = []
-
-        for lead_id in lead_ids:
-            try:
-                lead = Lead.objects.get(id=lead_id, is_deleted=False)
-                if lead.assigned_to is None:
-                    lead.assigned_to = assignee
-                    lead.assigned_at = timezone.now()
-                    lead.assigned_by = request.user
-                    lead.save()
-
-                    LeadAssignmentLog.objects.create(
-                        lead=lead,
-                        assigned_to=assignee,
-                        assigned_by=request.user,
-                        method='manual'
-                    )
-                    assigned_count += 1
-                else:
-                    failed_ids.append(str(lead_id))
-            except Lead.DoesNotExist:
-                failed_ids.append(str(lead_id))
+        assigned_count, failed_ids = assign_unassigned_leads(lead_ids, assignee, request.user)
 
         return Response({
             "status": "success",
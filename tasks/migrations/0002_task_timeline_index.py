@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['lead', '-created_at'], name='task_lead_created_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0007_lead_activity'),
+        ('tasks', '0002_task_timeline_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['assigned_to', 'completed', 'due_date'], name='task_assignee_due_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_dashboard_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tasks',
+            name='task_lead_created_idx',
+        ),
+    ]
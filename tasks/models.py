@@ -25,6 +25,12 @@ class Tasks(models.Model):
     )
     completion_remarks = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # A user's open tasks by due date (TaskDashboardSummaryView).
+            models.Index(fields=['assigned_to', 'completed', 'due_date'], name='task_assignee_due_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.lead.name}"
 
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Tasks
 from leads.models import Lead
+from leads.serializers import LEAD_INTERNAL_FIELDS
 from django.contrib.auth import get_user_model
 from users.models import User
 from .models import FollowUp
@@ -10,7 +11,7 @@ class LeadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Lead
-        fields = '__all__'
+        exclude = LEAD_INTERNAL_FIELDS
 
 class LeadTaskSerializer(serializers.ModelSerializer):
     assigned_to = serializers.StringRelatedField()
@@ -0,0 +1,115 @@
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_init, post_save
+from crm_backend.invalidation import invalidation_bus
+from tasks.models import Tasks
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 60,  # seconds a user's dashboard counts are reused
+}
+
+BUS_NAMESPACE = 'tasks.summary'
+
+
+def summary_setting(name):
+    return getattr(settings, 'TASK_SUMMARY_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def task_summary_counts(user_id, today):
+    """A user's open tasks due today, overdue and upcoming, in one aggregate over task_assignee_due_idx."""
+    return Tasks.objects.filter(assigned_to_id=user_id, completed=False).aggregate(
+        today=Count('pk', filter=Q(due_date=today)),
+        overdue=Count('pk', filter=Q(due_date__lt=today)),
+        upcoming=Count('pk', filter=Q(due_date__gt=today)),
+    )
+
+
+class TaskSummaryCache:
+    """
+    Per-process cache of TaskDashboardSummaryView counts, keyed by user and
+    day. Task saves and deletes drop the assignee's entry once the
+    transaction commits, here through the signals below and in other
+    workers through the invalidation bus; entries also expire after TTL
+    seconds (the bus's FALLBACK_TTL while its listener is disconnected)
+    and are evicted on the next write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get(self, user_id, today):
+        if not summary_setting('ENABLED'):
+            return task_summary_counts(user_id, today)
+
+        invalidation_bus.ensure_started()
+        key = (str(user_id), today)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[1]:
+            self._counters['hits'] += 1
+            return dict(entry[0])
+
+        self._counters['misses'] += 1
+        generation = self._generation
+        counts = task_summary_counts(user_id, today)
+        expires_at = time.monotonic() + invalidation_bus.ttl(summary_setting('TTL'))
+        with self._lock:
+            if self._generation == generation:
+                self._evict(today)
+                self._entries[key] = (counts, expires_at)
+        return dict(counts)
+
+    def _evict(self, today):
+        """Drops expired entries and those of other days, which nothing reads again."""
+        now = time.monotonic()
+        for key in [key for key, entry in self._entries.items() if key[1] != today or entry[1] <= now]:
+            del self._entries[key]
+
+    def _drop(self, user_id):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == str(user_id)]:
+                    del self._entries[key]
+            self._generation += 1
+            self._counters['invalidations'] += 1
+
+    def invalidate(self, user_id):
+        """Drops `user_id`'s counts in every worker once the current transaction commits."""
+        if user_id is None:
+            return
+        transaction.on_commit(lambda: self._drop(user_id))
+        invalidation_bus.publish(BUS_NAMESPACE, user_id)
+
+    def stats(self):
+        return dict(self._counters, entries=len(self._entries))
+
+
+task_summaries = TaskSummaryCache()
+
+
+def _remember_assignee(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred assigned_to_id is not loaded here.
+    instance._summary_assignee_id = instance.__dict__.get('assigned_to_id')
+
+
+def _invalidate_on_write(sender, instance, **kwargs):
+    task_summaries.invalidate(instance.assigned_to_id)
+    # A reassigned task also leaves the previous assignee's counts.
+    previous_assignee_id = getattr(instance, '_summary_assignee_id', None)
+    if previous_assignee_id != instance.assigned_to_id:
+        task_summaries.invalidate(previous_assignee_id)
+    instance._summary_assignee_id = instance.assigned_to_id
+
+
+invalidation_bus.subscribe(BUS_NAMESPACE, task_summaries._drop)
+post_init.connect(_remember_assignee, sender=Tasks, dispatch_uid='task_summary_init')
+post_save.connect(_invalidate_on_write, sender=Tasks, dispatch_uid='task_summary_save')
+post_delete.connect(_invalidate_on_write, sender=Tasks, dispatch_uid='task_summary_delete')
@@ -1,3 +1,118 @@
+from datetime import date, timedelta
 from django.test import TestCase
+from rest_framework.test import APIClient
+from crm_backend.testing import without_bus
+from leads.models import Lead
+from tasks.models import Tasks
+from tasks.summary import task_summaries, task_summary_counts
+from users.models import User
 
-# Create your tests here.
+
+@without_bus
+class TaskListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'secret', name='Admin', role='Admin')
+        cls.agent = User.objects.create_user('agent@example.com', 'secret', name='Agent', role='Sales')
+        cls.lead = Lead.objects.create(name='Ada Lovelace')
+        cls.open_task = Tasks.objects.create(lead=cls.lead, title='Send quote', assigned_to=cls.agent)
+        cls.done_task = Tasks.objects.create(lead=cls.lead, title='Call back', assigned_to=cls.admin, completed=True)
+
+    def _get(self, user, path, params=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(path, params or {})
+        self.assertEqual(response.status_code, 200)
+        return [task['title'] for task in response.json()['data']['Details']]
+
+    def test_global_list_returns_every_task_and_applies_filters(self):
+        self.assertCountEqual(self._get(self.agent, '/api/tasks/'), ['Send quote', 'Call back'])
+        self.assertEqual(self._get(self.agent, '/api/tasks/', {'status': 'pending'}), ['Send quote'])
+        self.assertEqual(self._get(self.agent, '/api/tasks/', {'search': 'lovelace', 'assigned_to': self.admin.pk}), ['Call back'])
+
+    def test_search_limits_non_admins_to_their_own_tasks(self):
+        self.assertEqual(self._get(self.agent, '/api/tasks/search/'), ['Send quote'])
+        self.assertEqual(self._get(self.agent, '/api/tasks/search/', {'q': 'call'}), [])
+        self.assertEqual(self._get(self.admin, '/api/tasks/search/', {'q': 'call'}), ['Call back'])
+
+    def test_lead_task_list_answers_304_until_a_task_is_deleted(self):
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        path = f'/api/leads/{self.lead.pk}/tasks/'
+        etag = client.get(path)['ETag']
+
+        self.assertEqual(client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.done_task.delete()
+        self.assertEqual(client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@without_bus
+class TaskSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date(2026, 3, 10)
+        cls.agent = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+        cls.other = User.objects.create_user('other@example.com', 'secret', name='Other')
+        cls.lead = Lead.objects.create(name='Ada Lovelace')
+        for days in (-2, -1, 0, 0, 3):
+            Tasks.objects.create(lead=cls.lead, title='Open', assigned_to=cls.agent, due_date=cls.today + timedelta(days=days))
+        Tasks.objects.create(lead=cls.lead, title='Done', assigned_to=cls.agent, due_date=cls.today, completed=True)
+        Tasks.objects.create(lead=cls.lead, title='Unscheduled', assigned_to=cls.agent)
+
+    def setUp(self):
+        task_summaries._drop(None)
+
+    def _task(self, **fields):
+        return Tasks.objects.create(lead=self.lead, title='New', due_date=self.today, **fields)
+
+    def test_counts_come_from_one_aggregate(self):
+        with self.assertNumQueries(1):
+            counts = task_summary_counts(self.agent.pk, self.today)
+        self.assertEqual(counts, {'today': 2, 'overdue': 2, 'upcoming': 1})
+
+    def test_cached_counts_are_reused_until_a_task_is_saved_or_deleted(self):
+        with self.assertNumQueries(1):
+            task_summaries.get(self.agent.pk, self.today)
+            task_summaries.get(self.agent.pk, self.today)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task = self._task(assigned_to=self.agent)
+        self.assertEqual(task_summaries.get(self.agent.pk, self.today)['today'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(task_summaries.get(self.agent.pk, self.today)['today'], 2)
+
+    def test_reassignment_drops_both_assignees_counts(self):
+        task = self._task(assigned_to=self.agent)
+        task_summaries.get(self.agent.pk, self.today)
+        task_summaries.get(self.other.pk, self.today)
+
+        task = Tasks.objects.get(pk=task.pk)
+        task.assigned_to = self.other
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+
+        self.assertEqual(task_summaries.get(self.agent.pk, self.today)['today'], 2)
+        self.assertEqual(task_summaries.get(self.other.pk, self.today)['today'], 1)
+
+    def test_a_rolled_back_write_keeps_the_cached_counts(self):
+        task_summaries.get(self.agent.pk, self.today)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self._task(assigned_to=self.agent)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(task_summaries.stats()['entries'], 1)
+
+    def test_writes_evict_entries_of_other_days(self):
+        task_summaries.get(self.agent.pk, self.today - timedelta(days=1))
+        task_summaries.get(self.other.pk, self.today)
+        self.assertEqual(task_summaries.stats()['entries'], 1)
+
+    def test_dashboard_view_returns_the_requesting_users_counts(self):
+        client = APIClient()
+        client.force_authenticate(self.other)
+        Tasks.objects.create(lead=self.lead, title='New', assigned_to=self.other, due_date=date.today())
+
+        response = client.get('/api/tasks/dashboard-summary/')
+
+        self.assertEqual(response.json()['data'], {'today': 1, 'overdue': 0, 'upcoming': 0})
@@ -1,6 +1,6 @@
 from datetime import date
 from django.shortcuts import render
-from time import localtime, timezone
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -9,7 +9,11 @@ from django.db.models import Q
 from leads.models import Lead
 from .serializers import FollowUpSerializer, LeadTaskSerializer
 from .models import FollowUp, Tasks
-from .utils import CustomUserPagination, paginate_and_format_response,log_task_action
+from .summary import task_summaries
+from users.querysets import eager_load
+from users.models import User
+from crm_backend.conditional import check_conditional, collection_validator, latest_validator
+from .utils import COUNT_CACHED, CustomUserPagination, paginate_and_format_response,log_task_action
 
 class LeadTaskCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -45,15 +49,22 @@ class LeadTaskListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, lead_id):
-            tasks = Tasks.objects.filter(lead__lead_id=lead_id).order_by('-updated_at')
+            tasks = Tasks.objects.filter(lead__lead_id=lead_id)
+            validators, not_modified = check_conditional(
+                request, collection_validator(tasks), latest_validator(User.objects.all())
+            )
+            if not_modified:
+                return not_modified
+
+            tasks = eager_load(tasks, LeadTaskSerializer).order_by('-updated_at')
             paginated_data, _ = paginate_and_format_response(tasks, request, CustomUserPagination)
             serializer = LeadTaskSerializer(paginated_data['Details'], many=True)
             paginated_data['Details'] = serializer.data
-            return Response({
+            return validators.apply(Response({
                 "status": "success",
                 "data": paginated_data,
                 "message": "Lead tasks fetched successfully"
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK))
 
 class LeadTaskUpdateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -110,7 +121,7 @@ class GlobalTaskListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        tasks = Tasks.objects.filter(is_deleted=False)
+        tasks = Tasks.objects.all()
 
         # Filtering
         status_filter = request.GET.get('status')
@@ -145,8 +156,10 @@ class GlobalTaskListView(APIView):
                 Q(lead__name__icontains=search)
             )
 
-        tasks = tasks.order_by('-updated_at')
-        paginated_data, _ = paginate_and_format_response(tasks, request, CustomUserPagination)
+        # No ETag here: tasks are hard-deleted, so only a COUNT over the
+        # whole filtered set would notice a removal.
+        tasks = eager_load(tasks, LeadTaskSerializer).order_by('-updated_at')
+        paginated_data, _ = paginate_and_format_response(tasks, request, CustomUserPagination, COUNT_CACHED)
         serializer = LeadTaskSerializer(paginated_data['Details'], many=True)
         paginated_data['Details'] = serializer.data
 
@@ -161,7 +174,7 @@ class TaskStatusUpdateView(APIView):
 
     def patch(self, request, task_id):
         try:
-            task = Tasks.objects.get(task_id=task_id, is_deleted=False)
+            task = Tasks.objects.get(task_id=task_id)
         except Tasks.DoesNotExist:
             return Response({
                 "status": "failure",
@@ -196,7 +209,7 @@ class TaskSearchView(APIView):
     def get(self, request):
         query = request.GET.get('q', '').strip()
         user = request.user
-        tasks = Tasks.objects.filter(is_deleted=False)
+        tasks = Tasks.objects.all()
 
         # Restrict to current user's tasks unless Admin
         if user.role != "Admin":
@@ -231,8 +244,8 @@ class TaskSearchView(APIView):
         elif due_to:
             tasks = tasks.filter(due_date__lte=due_to)
 
-        tasks = tasks.order_by('-created_at')
-        paginated_data, _ = paginate_and_format_response(tasks, request, CustomUserPagination)
+        tasks = eager_load(tasks, LeadTaskSerializer).order_by('-created_at')
+        paginated_data, _ = paginate_and_format_response(tasks, request, CustomUserPagination, COUNT_CACHED)
         serializer = LeadTaskSerializer(paginated_data['Details'], many=True)
         paginated_data['Details'] = serializer.data
 
@@ -246,16 +259,7 @@ class TaskDashboardSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        today = date.today()
-
-        base_queryset = Tasks.objects.filter(is_deleted=False, assigned_to=user, completed=False)
-
-        data = {
-            "today": base_queryset.filter(due_date=today).count(),
-            "overdue": base_queryset.filter(due_date__lt=today).count(),
-            "upcoming": base_queryset.filter(due_date__gt=today).count()
-        }
+        data = task_summaries.get(request.user.pk, date.today())
 
         return Response({
             "status": "success",
@@ -313,7 +317,7 @@ class FollowUpListView(APIView):
                 Q(lead__name__icontains=search)
             )
 
-        queryset = queryset.order_by('-date_time')
+        queryset = eager_load(queryset, FollowUpSerializer).order_by('-date_time')
         paginated, _ = paginate_and_format_response(queryset, request, CustomUserPagination)
         serializer = FollowUpSerializer(paginated["Details"], many=True)
         paginated["Details"] = serializer.data
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # Broadcasts user changes on the cache invalidation bus.
+        from users import signals  # noqa: F401
+        # Registers the authentication user cache's invalidation handlers.
+        from users import authentication  # noqa: F401
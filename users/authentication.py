@@ -0,0 +1,119 @@
+import copy
+import threading
+import time
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from crm_backend.invalidation import invalidation_bus
+from users.models import User
+from users.signals import USER_BUS_NAMESPACE
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 60,  # seconds a resolved user is reused without a reload
+}
+
+
+def user_cache_setting(name):
+    return getattr(settings, 'AUTH_USER_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class AuthUserCache:
+    """
+    Per-process cache of the User rows JWT authentication resolves, keyed by
+    the token's user id, so authenticating a request costs no query.
+
+    Entries live for TTL seconds (the invalidation bus's FALLBACK_TTL while
+    its listener is disconnected). User saves and deletes drop the entry in
+    this process through the signals below and in other workers through
+    the bus; views that change who may sign in call invalidate() directly.
+    Each request gets its own copy of the cached row.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def resolve(self, user_id, load):
+        """The cached user for `user_id`, else load() (which may raise), cached for next time."""
+        invalidation_bus.ensure_started()
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[1]:
+            self._counters['hits'] += 1
+            return copy.copy(entry[0])
+
+        self._counters['misses'] += 1
+        generation = self._generation
+        user = load()
+        expires_at = time.monotonic() + invalidation_bus.ttl(user_cache_setting('TTL'))
+        with self._lock:
+            # An invalidation during the load may have been for this row; leave it uncached.
+            if self._generation == generation:
+                self._entries[key] = (copy.copy(user), expires_at)
+        return user
+
+    def invalidate(self, user_id=None):
+        """Drops one user, or every user when `user_id` is None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+            self._generation += 1
+            self._counters['invalidations'] += 1
+
+    def stats(self):
+        return dict(self._counters, entries=len(self._entries))
+
+
+user_cache = AuthUserCache()
+
+
+def _invalidate_on_write(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+invalidation_bus.subscribe(USER_BUS_NAMESPACE, user_cache.invalidate)
+post_save.connect(_invalidate_on_write, sender=User, dispatch_uid='auth_user_cache_save')
+post_delete.connect(_invalidate_on_write, sender=User, dispatch_uid='auth_user_cache_delete')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through user_cache
+    instead of querying users_user on every request. The active and
+    password-change checks still run against the cached row.
+    """
+
+    def get_user(self, validated_token):
+        if not user_cache_setting('ENABLED'):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        def load():
+            try:
+                return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        user = user_cache.resolve(user_id, load)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,126 @@
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from users.models import UserSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'buffered',       # 'buffered' or 'sync'
+    'FLUSH_INTERVAL': 30.0,   # seconds between writes; each session is written at most once per flush
+    'BATCH_SIZE': 500,        # sessions per UPDATE statement
+    'MAX_PENDING': 50000,     # distinct sessions held; touches of further sessions are dropped and counted
+}
+
+
+def last_seen_setting(name):
+    return getattr(settings, 'SESSION_LAST_SEEN', {}).get(name, DEFAULTS[name])
+
+
+class LastSeenBuffer:
+    """
+    Coalesces UserSession.last_seen_at writes from token refreshes.
+
+    touch() records "this session was seen now" in memory, keyed by token
+    digest, so any number of refreshes of one session between flushes cost
+    one write. A background thread writes everything pending every
+    FLUSH_INTERVAL seconds with one UPDATE ... FROM (VALUES ...) per
+    BATCH_SIZE sessions, and once more when the worker process exits. The
+    UPDATE never moves last_seen_at backwards. In 'sync' mode each touch is
+    written immediately, which is what tests should use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._pending = {}
+        self._thread = None
+        self._pid = None
+        self._counters = {'touched': 0, 'flushed': 0, 'dropped': 0, 'failed': 0}
+        atexit.register(self.shutdown)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, pending=len(self._pending))
+
+    def touch(self, digest, seen_at=None):
+        seen_at = seen_at or timezone.now()
+        if last_seen_setting('MODE') == 'sync':
+            UserSession.objects.filter(session_token_digest=digest).update(last_seen_at=seen_at)
+            self._count('flushed')
+            return
+
+        self._ensure_worker()
+        with self._lock:
+            if digest not in self._pending and len(self._pending) >= last_seen_setting('MAX_PENDING'):
+                self._counters['dropped'] += 1
+                return
+            self._pending[digest] = seen_at
+            self._counters['touched'] += 1
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            # A forked worker inherits neither the thread nor the parent's pending touches.
+            if self._thread is None or self._pid != os.getpid():
+                self._pending = {}
+                self._pid = os.getpid()
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='session-last-seen', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(last_seen_setting('FLUSH_INTERVAL')):
+            self.flush()
+            close_old_connections()
+
+    def _write(self, rows):
+        table = UserSession._meta.db_table
+        values = ', '.join(['(%s::bytea, %s::timestamptz)'] * len(rows))
+        params = [value for row in rows for value in row]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS session SET last_seen_at = seen.at
+                FROM (VALUES {values}) AS seen(digest, at)
+                WHERE session.session_token_digest = seen.digest AND session.last_seen_at < seen.at
+                """,
+                params
+            )
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            rows = list(pending.items())
+            batch_size = last_seen_setting('BATCH_SIZE')
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                try:
+                    self._write(batch)
+                except Exception:
+                    logger.exception("Failed to flush last_seen_at for %d sessions", len(batch))
+                    self._count('failed', len(batch))
+                    continue
+                self._count('flushed', len(batch))
+            return len(rows)
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._pid == os.getpid():
+            self.flush()
+
+
+last_seen = LastSeenBuffer()
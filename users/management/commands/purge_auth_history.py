@@ -0,0 +1,88 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from users.models import LoginLog, UserSession
+
+DEFAULTS = {
+    'LOGIN_LOG_DAYS': 90,       # LoginLog rows older than this are deleted
+    'SESSION_GRACE_HOURS': 0,   # extra time kept after a session's refresh token expires
+}
+
+
+def retention_setting(name):
+    return getattr(settings, 'AUTH_HISTORY_RETENTION', {}).get(name, DEFAULTS[name])
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes UserSession rows whose refresh token has expired and LoginLog rows past retention, "
+        "in small primary-key batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--login-log-days', type=int, default=None,
+                            help="Keep this many days of LoginLog (default: AUTH_HISTORY_RETENTION['LOGIN_LOG_DAYS']).")
+        parser.add_argument('--session-grace-hours', type=int, default=None,
+                            help="Keep expired sessions this much longer (default: AUTH_HISTORY_RETENTION['SESSION_GRACE_HOURS']).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.2, help="Seconds to pause between batches.")
+        parser.add_argument('--dry-run', action='store_true', help="Count what would be deleted without deleting it.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        login_log_days = options['login_log_days']
+        if login_log_days is None:
+            login_log_days = retention_setting('LOGIN_LOG_DAYS')
+        grace_hours = options['session_grace_hours']
+        if grace_hours is None:
+            grace_hours = retention_setting('SESSION_GRACE_HOURS')
+
+        now = timezone.now()
+        # A session is dead once its refresh token can no longer be refreshed.
+        session_cutoff = now - api_settings.REFRESH_TOKEN_LIFETIME - timedelta(hours=grace_hours)
+        self._purge(UserSession, 'created_at', session_cutoff, options)
+        self._purge(LoginLog, 'timestamp', now - timedelta(days=login_log_days), options)
+
+    def _purge(self, model, time_field, cutoff, options):
+        """
+        Walks `model` in primary-key order, batch_size rows at a time, deleting
+        the rows older than `cutoff` each batch in its own short transaction.
+        Both tables are append-only with creation timestamps that grow with
+        the key, so the walk stops at the first batch that reaches a row
+        inside retention instead of scanning the live tail of the table.
+        """
+        label = model._meta.verbose_name_plural
+        started = time.monotonic()
+        deleted = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', time_field)[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            expired = [pk for pk, stamp in rows if stamp < cutoff]
+            if expired and not options['dry_run']:
+                with transaction.atomic():
+                    model.objects.filter(pk__in=expired).delete()
+            deleted += len(expired)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{label}: {deleted} rows so far, up to id {last_pk}.")
+            if len(expired) < len(rows):
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        rate = deleted / elapsed if elapsed else 0
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} {label} older than {cutoff:%Y-%m-%d %H:%M} in {elapsed:.1f}s ({rate:.0f} rows/s)."
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+# Same digest as users.models.session_token_digest(); session_token was
+# unique, so the backfilled digests are too.
+BACKFILL_DIGEST_SQL = """
+UPDATE users_usersession
+SET session_token_digest = sha256(convert_to(session_token, 'UTF8'))
+WHERE session_token_digest IS NULL;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersession',
+            name='session_token_digest',
+            field=models.BinaryField(editable=False, max_length=32, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_DIGEST_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='usersession',
+            name='session_token_digest',
+            field=models.BinaryField(editable=False, max_length=32, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='usersession',
+            name='session_token',
+            field=models.CharField(max_length=512),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['user', '-id'], name='session_user_recent_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import hashlib
 import uuid
 from django.db import models
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 from django.utils.timezone import now
@@ -54,6 +57,15 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        # Case-insensitive prefix matches for the active-user autocomplete.
+        indexes = [
+            models.Index(OpClass(Lower('name'), name='text_pattern_ops'), name='user_name_prefix_idx', condition=models.Q(is_active=True)),
+            models.Index(OpClass(Lower('email'), name='text_pattern_ops'), name='user_email_prefix_idx', condition=models.Q(is_active=True)),
+            # Newest change to any user (ETags of the user and lead lists).
+            models.Index(fields=['updated_at'], name='user_updated_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -71,14 +83,27 @@ class LoginLog(models.Model):
 
 
 
+def session_token_digest(token):
+    """SHA-256 of a session token; sessions are looked up by this, not the token itself."""
+    return hashlib.sha256(token.encode()).digest()
+
+
 class UserSession(models.Model):
     user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='sessions')
-    session_token = models.CharField(max_length=512, unique=True)  # Store JWT or custom token
+    session_token = models.CharField(max_length=512)  # Store JWT or custom token
+    session_token_digest = models.BinaryField(max_length=32, unique=True, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(default=now)
     last_seen_at = models.DateTimeField(default=now)
     is_active = models.BooleanField(default=True)  # Helpful for manual invalidation
 
+    class Meta:
+        indexes = [models.Index(fields=['user', '-id'], name='session_user_recent_idx')]
+
+    def save(self, *args, **kwargs):
+        self.session_token_digest = session_token_digest(self.session_token)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.email} @ {self.ip_address} ({self.created_at})"
@@ -1,5 +1,19 @@
+import hashlib
+import json
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import QuerySet
 from rest_framework.pagination import PageNumberPagination
 
+# How `total` is produced for a paginated response.
+COUNT_EXACT = 'exact'          # SELECT COUNT(*) over the filtered queryset
+COUNT_ESTIMATED = 'estimated'  # planner row estimate, no scan
+COUNT_CACHED = 'cached'        # exact count, cached briefly per distinct query
+COUNT_NONE = 'none'            # no total; fetch page_size + 1 rows for has_more
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_CACHED, COUNT_NONE)
+
+COUNT_CACHE_TIMEOUT = 30
+
 class CustomUserPagination(PageNumberPagination):
     page_size = None
     page_size_query_param = 'page_size'
@@ -10,26 +24,125 @@ class CustomUserPagination(PageNumberPagination):
     def get_previous_page_number(self, page):
         return page.previous_page_number() if page.has_previous() else None
 
-def paginate_and_format_response(paginated_data, request, pagination_class):
+class UserSessionPagination(CustomUserPagination):
+    # Sessions accumulate without bound, so they are never listed unpaginated.
+    page_size = 50
+    max_page_size = 200
+
+class UserListPagination(CustomUserPagination):
+    # The user list, search and filter endpoints; without ?page_size= they
+    # return the first page rather than every user.
+    page_size = 50
+    max_page_size = 500
+
+def estimate_count(queryset):
+    """
+    Returns the planner's row estimate for the queryset. Unfiltered querysets
+    read pg_class.reltuples directly; anything else is EXPLAINed. Falls back
+    to an exact count off PostgreSQL or before the table has been analyzed.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        row = cursor.fetchone()
+
+    if not queryset.query.where:
+        estimate = row[0] if row else -1
+    else:
+        plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+        estimate = plan[0]['Plan']['Plan Rows']
+    if estimate is None or estimate < 0:
+        return queryset.count()
+    return int(estimate)
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """Exact count, cached for `timeout` seconds per normalized query."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f"{sql}|{params!r}".encode()).hexdigest()
+    key = f"paginate:count:{queryset.model._meta.label_lower}:{digest}"
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, timeout)
+    return total
+
+def count_rows(queryset, count_mode):
+    if count_mode == COUNT_ESTIMATED:
+        return estimate_count(queryset)
+    if count_mode == COUNT_CACHED:
+        return cached_count(queryset)
+    if count_mode == COUNT_NONE:
+        return None
+    return queryset.count()
+
+def _requested_page_number(request, paginator):
+    try:
+        return max(1, int(request.query_params.get(paginator.page_query_param, 1)))
+    except (TypeError, ValueError):
+        return 1
+
+def paginate_without_exact_count(queryset, request, paginator, page_size, count_mode):
+    """
+    Page-number pagination that slices page_size + 1 rows to learn whether a
+    next page exists, instead of letting Django's Paginator run COUNT(*).
+    """
+    page_number = _requested_page_number(request, paginator)
+    offset = (page_number - 1) * page_size
+    rows = list(queryset[offset:offset + page_size + 1])
+    has_more = len(rows) > page_size
+
+    return {
+        'total': count_rows(queryset, count_mode),
+        'total_mode': count_mode,
+        'page': page_number,
+        'page_size': page_size,
+        'next_page': page_number + 1 if has_more else None,
+        'previous_page': page_number - 1 if page_number > 1 else None,
+        'has_more': has_more,
+        'Details': rows[:page_size]
+    }
+
+def paginate_and_format_response(paginated_data, request, pagination_class, count_mode=COUNT_EXACT):
     paginator = pagination_class()
+
+    if count_mode != COUNT_EXACT and isinstance(paginated_data, QuerySet):
+        page_size = paginator.get_page_size(request)
+        if page_size:
+            return paginate_without_exact_count(paginated_data, request, paginator, page_size, count_mode), None
+
     page = paginator.paginate_queryset(paginated_data, request)
 
     if page is not None:
-        page_size = int(request.query_params.get('page_size', paginator.page_size))
+        page_size = paginator.get_page_size(request)
         return {
             'total': paginator.page.paginator.count,
+            'total_mode': COUNT_EXACT,
             'page': paginator.page.number,
             'page_size': page_size,
             'next_page': paginator.get_next_page_number(paginator.page),
             'previous_page': paginator.get_previous_page_number(paginator.page),
+            'has_more': paginator.page.has_next(),
             'Details': page
         }, None
 
     return {
         'total': len(paginated_data),
+        'total_mode': COUNT_EXACT,
         'page': 1,
         'page_size': len(paginated_data),
         'next_page': None,
         'previous_page': None,
+        'has_more': False,
         'Details': paginated_data
     }, None
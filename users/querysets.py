@@ -0,0 +1,158 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+_plans = {}
+
+class _LoadPlan:
+    """
+    What a serializer reads from a model: the columns per select_related
+    path (None meaning every column), the forward relations to join and the
+    many-valued relations to prefetch, each with its own nested plan.
+    """
+
+    def __init__(self):
+        self.columns = {'': set()}
+        self.select = []
+        self.prefetch = []
+
+def _concrete_columns(model):
+    return {f.attname for f in model._meta.concrete_fields}
+
+def _reads_everything(serializer):
+    return type(serializer).to_representation is not serializers.Serializer.to_representation
+
+def _serializer_fields(serializer):
+    try:
+        return serializer.fields
+    except ImproperlyConfigured:
+        return None
+
+def _plan_serializer(plan, serializer, model, path):
+    fields = _serializer_fields(serializer)
+    if fields is None or _reads_everything(serializer):
+        plan.columns[path] = None
+        return
+
+    for field in fields.values():
+        if field.write_only:
+            continue
+        _plan_field(plan, field, model, path)
+
+def _join(path, name):
+    return f'{path}__{name}' if path else name
+
+def _add_column(plan, path, column):
+    if plan.columns.get(path, set()) is not None:
+        plan.columns.setdefault(path, set()).add(column)
+
+def _plan_field(plan, field, model, path):
+    if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+        plan.columns[path] = None
+        return
+
+    attrs = field.source.split('.')
+    for index, attr in enumerate(attrs):
+        last = index == len(attrs) - 1
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # Properties and methods can read anything on the instance.
+            plan.columns[path] = None
+            return
+
+        if model_field.many_to_many or model_field.one_to_many:
+            nested = field.child if isinstance(field, serializers.ListSerializer) else None
+            if isinstance(field, serializers.ManyRelatedField):
+                nested = field.child_relation
+            plan.prefetch.append((_join(path, attr), model_field, nested if last else None))
+            return
+
+        if not model_field.is_relation:
+            _add_column(plan, path, model_field.attname)
+            if not last:
+                plan.columns[path] = None
+            return
+
+        if attr == model_field.attname != model_field.name:
+            # A foreign key read by column (e.g. source='status_id') needs no join.
+            _add_column(plan, path, model_field.attname)
+            return
+
+        if last and isinstance(field, serializers.PrimaryKeyRelatedField):
+            _add_column(plan, path, model_field.attname)
+            return
+
+        _add_column(plan, path, model_field.attname)
+        related_path = _join(path, attr)
+        if related_path not in plan.select:
+            plan.select.append(related_path)
+        model = model_field.related_model
+        path = related_path
+
+        if last:
+            if isinstance(field, serializers.BaseSerializer):
+                _plan_serializer(plan, field, model, path)
+            else:
+                # StringRelatedField and friends call str() or similar on the
+                # related instance, so load it in full.
+                plan.columns[path] = None
+
+def _build_plan(serializer_class, model):
+    key = (serializer_class, model)
+    if key not in _plans:
+        plan = _LoadPlan()
+        _plan_serializer(plan, serializer_class(), model, '')
+        _plans[key] = plan
+    return _plans[key]
+
+def _only_columns(plan, model):
+    columns = []
+    for path, names in plan.columns.items():
+        path_model = model
+        for attr in filter(None, path.split('__')):
+            path_model = path_model._meta.get_field(attr).related_model
+        names = _concrete_columns(path_model) if names is None else names | {path_model._meta.pk.attname}
+        columns.extend(_join(path, _field_name(path_model, name)) for name in sorted(names))
+    return columns
+
+def _field_name(model, attname):
+    for field in model._meta.concrete_fields:
+        if field.attname == attname:
+            return field.name
+    return attname
+
+def _prefetch_queryset(model_field, nested):
+    related_model = model_field.related_model
+    queryset = related_model._default_manager.all()
+    if isinstance(nested, serializers.BaseSerializer):
+        queryset = eager_load(queryset, type(nested))
+        if model_field.one_to_many and queryset.query.deferred_loading[0]:
+            # Reverse FK prefetches match rows on the remote foreign key.
+            queryset = queryset.only(*queryset.query.deferred_loading[0], model_field.field.name)
+    elif nested is None or isinstance(nested, serializers.PrimaryKeyRelatedField):
+        queryset = queryset.only(related_model._meta.pk.name)
+        if model_field.one_to_many:
+            queryset = queryset.only(related_model._meta.pk.name, model_field.field.name)
+    return queryset
+
+def eager_load(queryset, serializer_class):
+    """
+    Applies the select_related / prefetch_related / only() calls implied by
+    the readable fields of `serializer_class`, so serializing a page of
+    `queryset` costs a fixed number of queries however many rows it holds.
+
+    Nested serializers on forward relations become joins, nested or
+    many-valued relations become prefetches, and columns the serializer
+    never reads are deferred. Sources the helper cannot resolve (methods,
+    properties, SerializerMethodField, custom to_representation) keep every
+    column of the model they read from.
+    """
+    model = queryset.model
+    plan = _build_plan(serializer_class, model)
+
+    if plan.select:
+        queryset = queryset.select_related(*plan.select)
+    for lookup, model_field, nested in plan.prefetch:
+        queryset = queryset.prefetch_related(Prefetch(lookup, queryset=_prefetch_queryset(model_field, nested)))
+    return queryset.only(*_only_columns(plan, model))
@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'users.recaptcha.GoogleRecaptchaVerifier',
+    'VERIFY_URL': 'https://www.google.com/recaptcha/api/siteverify',
+    'CONNECT_TIMEOUT': 1.0,     # seconds to open a connection to VERIFY_URL
+    'READ_TIMEOUT': 2.0,        # seconds to wait for its answer
+    'POOL_SIZE': 10,            # keep-alive connections kept per worker process
+    'FAILURE_THRESHOLD': 5,     # consecutive upstream failures that open the circuit
+    'RESET_TIMEOUT': 30.0,      # seconds the circuit stays open before one trial call
+    'FAIL_OPEN': False,         # accept logins while the upstream is unavailable
+    'STUB_LATENCY': 0.0,        # simulated round trip of StubRecaptchaVerifier
+}
+
+UNAVAILABLE_MESSAGE = "reCAPTCHA verification is temporarily unavailable. Try again shortly."
+INVALID_MESSAGE = "Invalid reCAPTCHA. Try again."
+
+
+def recaptcha_setting(name):
+    return getattr(settings, 'RECAPTCHA_VERIFIER', {}).get(name, DEFAULTS[name])
+
+
+class RecaptchaVerifier:
+    """
+    Base class for reCAPTCHA verifiers. verify() returns (passed, error
+    message); subclasses implement _check(), which returns whether the
+    token is valid or raises when the upstream could not answer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            'calls': 0, 'passed': 0, 'rejected': 0, 'errors': 0, 'short_circuited': 0,
+            'latency_total_ms': 0.0, 'latency_max_ms': 0.0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _record_latency(self, started):
+        elapsed = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._counters['latency_total_ms'] += elapsed
+            self._counters['latency_max_ms'] = max(self._counters['latency_max_ms'], elapsed)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        checked = stats['calls'] - stats['short_circuited']
+        stats['latency_avg_ms'] = stats['latency_total_ms'] / checked if checked else None
+        return stats
+
+    def verify(self, token, remote_ip=None):
+        self._count('calls')
+        if not token:
+            self._count('rejected')
+            return False, "reCAPTCHA token is missing."
+
+        started = time.monotonic()
+        try:
+            passed = self._check(token, remote_ip)
+        except Exception as exc:
+            self._count('errors')
+            logger.warning("reCAPTCHA verification failed: %s", exc)
+            return self._unavailable()
+        finally:
+            self._record_latency(started)
+
+        self._count('passed' if passed else 'rejected')
+        return (True, None) if passed else (False, INVALID_MESSAGE)
+
+    def _unavailable(self):
+        if recaptcha_setting('FAIL_OPEN'):
+            return True, None
+        return False, UNAVAILABLE_MESSAGE
+
+    def _check(self, token, remote_ip):
+        raise NotImplementedError
+
+
+class GoogleRecaptchaVerifier(RecaptchaVerifier):
+    """
+    Verifies tokens against Google's siteverify endpoint over a per-process
+    keep-alive session with CONNECT_TIMEOUT/READ_TIMEOUT, so a login costs
+    at most one bounded round trip and no TLS handshake once warm.
+
+    After FAILURE_THRESHOLD consecutive timeouts or upstream errors the
+    circuit opens: logins fail fast with UNAVAILABLE_MESSAGE (or pass, with
+    FAIL_OPEN) for RESET_TIMEOUT seconds instead of each one waiting out
+    the timeout, then a single trial call decides whether it closes again.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._session = None
+        self._pid = None
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._counters.update({'circuit_opened': 0})
+
+    def _get_session(self):
+        if self._session is not None and self._pid == os.getpid():
+            return self._session
+        with self._lock:
+            # A forked worker must not share the parent's pooled sockets.
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=recaptcha_setting('POOL_SIZE'), max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+                self._pid = os.getpid()
+        return self._session
+
+    def _allow_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < recaptcha_setting('RESET_TIMEOUT') or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def _record_result(self, failed):
+        with self._lock:
+            self._trial_running = False
+            if not failed:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= recaptcha_setting('FAILURE_THRESHOLD'):
+                if self._opened_at is None:
+                    self._counters['circuit_opened'] += 1
+                    logger.error("reCAPTCHA circuit opened after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+
+    def verify(self, token, remote_ip=None):
+        if token and not self._allow_call():
+            self._count('calls')
+            self._count('short_circuited')
+            return self._unavailable()
+        return super().verify(token, remote_ip)
+
+    def _check(self, token, remote_ip):
+        data = {"secret": settings.RECAPTCHA_PRIVATE_KEY, "response": token}
+        if remote_ip:
+            data["remoteip"] = remote_ip
+        try:
+            response = self._get_session().post(
+                recaptcha_setting('VERIFY_URL'),
+                data=data,
+                timeout=(recaptcha_setting('CONNECT_TIMEOUT'), recaptcha_setting('READ_TIMEOUT'))
+            )
+            response.raise_for_status()
+            result = response.json()
+        except Exception:
+            self._record_result(failed=True)
+            raise
+        self._record_result(failed=False)
+        return bool(result.get("success"))
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats['circuit_open'] = self._opened_at is not None
+            stats['consecutive_failures'] = self._failures
+        return stats
+
+
+class StubRecaptchaVerifier(RecaptchaVerifier):
+    """
+    Offline verifier for tests and local load runs: accepts every non-empty
+    token without network access, after sleeping STUB_LATENCY seconds to
+    stand in for the upstream round trip.
+    """
+
+    def _check(self, token, remote_ip):
+        latency = recaptcha_setting('STUB_LATENCY')
+        if latency:
+            time.sleep(latency)
+        return True
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier():
+    """The process-wide verifier configured by RECAPTCHA_VERIFIER['BACKEND']."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = import_string(recaptcha_setting('BACKEND'))()
+    return _verifier
@@ -1,8 +1,13 @@
-import requests
 from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
 from .models import User,UserSession
+from .recaptcha import get_verifier
+from .authentication import user_cache
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.hashers import make_password
 
 class UserDetailSerializer(serializers.ModelSerializer):
@@ -11,6 +16,16 @@ class UserDetailSerializer(serializers.ModelSerializer):
         exclude = ['password']
         extra_kwargs = {'password': {'write_only': True}}
 
+class UserListSerializer(serializers.ModelSerializer):
+    """Row shape for user list pages; GetUserByIdView keeps UserDetailSerializer."""
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'name', 'email', 'phone', 'role', 'status', 'department_id',
+            'is_active', 'last_login_at', 'created_at', 'updated_at'
+        ]
+
 class UserLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
@@ -28,20 +43,18 @@ class UserLoginSerializer(serializers.Serializer):
                 raise serializers.ValidationError("reCAPTCHA token is missing.")
 
             # Step 1: Verify reCAPTCHA
-            recaptcha_response = requests.post(
-                "https://www.google.com/recaptcha/api/siteverify",
-                data={
-                    "secret": settings.RECAPTCHA_PRIVATE_KEY,
-                    "response": recaptcha_token
-                }
-            )
-            result = recaptcha_response.json()
-
-            if not result.get("success"):
-                raise serializers.ValidationError("Invalid reCAPTCHA. Try again.")
+            request = self.context.get('request')
+            remote_ip = request.META.get('REMOTE_ADDR') if request is not None else None
+            verified, error = get_verifier().verify(recaptcha_token, remote_ip=remote_ip)
+            if not verified:
+                raise serializers.ValidationError(error)
 
         # Step 2: Authenticate user
-        user = authenticate(request=self.context.get('request'), email=email, password=password)
+        if 'user' in self.context:
+            # The caller already looked the account up by email; don't fetch it again.
+            user = self._check_password(self.context['user'], password)
+        else:
+            user = authenticate(request=self.context.get('request'), email=email, password=password)
         if not user:
             raise serializers.ValidationError("Invalid credentials.")
         if not user.is_active:
@@ -50,6 +63,17 @@ class UserLoginSerializer(serializers.Serializer):
         data["user"] = user
         return data
 
+    @staticmethod
+    def _check_password(user, password):
+        """ModelBackend.authenticate() for a user that is already loaded (or None)."""
+        if user is None:
+            # Run the hasher anyway so unknown emails take as long as wrong passwords.
+            User().set_password(password)
+            return None
+        if user.check_password(password) and ModelBackend().user_can_authenticate(user):
+            return user
+        return None
+
 class UserSessionSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserSession
@@ -115,4 +139,44 @@ class UpdateUserSerializer(serializers.ModelSerializer):
 class SimpleUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'name', 'email']
\ No newline at end of file
+        fields = ['id', 'name', 'email']
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer that checks the token's user through the
+    authentication user cache instead of loading the row on every refresh.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            def load():
+                try:
+                    return User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+                except User.DoesNotExist:
+                    raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+            user = user_cache.resolve(user_id, load)
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # The blacklist app is not installed.
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from crm_backend.invalidation import invalidation_bus
+from users.models import User
+
+# Namespace other workers' per-user caches subscribe to; the key is the user id.
+USER_BUS_NAMESPACE = 'users.user'
+
+
+@receiver(post_save, sender=User, dispatch_uid='users_user_saved')
+@receiver(post_delete, sender=User, dispatch_uid='users_user_deleted')
+def publish_user_change(sender, instance, **kwargs):
+    invalidation_bus.publish(USER_BUS_NAMESPACE, instance.pk)
@@ -1,3 +1,350 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.functions import Lower
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from crm_backend.testing import without_bus
+from users.authentication import user_cache
+from users.last_seen import LastSeenBuffer
+from users.recaptcha import UNAVAILABLE_MESSAGE, GoogleRecaptchaVerifier, StubRecaptchaVerifier
+from users.models import LoginLog, User, UserSession, session_token_digest
+from users.pagination import (
+    COUNT_CACHED, COUNT_ESTIMATED, COUNT_EXACT, COUNT_NONE, UserListPagination, estimate_count, paginate_and_format_response,
+)
+from users.serializers import UserListSerializer
+from users.views import LoginView, autocomplete_users
 
-# Create your tests here.
+
+@without_bus
+class LastSeenBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret')
+
+    def setUp(self):
+        self.started = timezone.now() - timedelta(hours=1)
+        self.session = UserSession.objects.create(user=self.user, session_token='token-1', last_seen_at=self.started)
+        self.buffer = LastSeenBuffer()
+        self.addCleanup(self.buffer.shutdown)
+
+    def _last_seen(self):
+        return UserSession.objects.get(pk=self.session.pk).last_seen_at
+
+    @override_settings(SESSION_LAST_SEEN={'MODE': 'sync'})
+    def test_sync_mode_writes_each_touch_at_once(self):
+        seen_at = timezone.now()
+        self.buffer.touch(self.session.session_token_digest, seen_at)
+        self.assertEqual(self._last_seen(), seen_at)
+
+    @override_settings(SESSION_LAST_SEEN={'MODE': 'buffered', 'FLUSH_INTERVAL': 60})
+    def test_buffered_touches_coalesce_into_one_write_on_flush(self):
+        digest = self.session.session_token_digest
+        first, latest = timezone.now() - timedelta(minutes=5), timezone.now()
+        self.buffer.touch(digest, first)
+        self.buffer.touch(digest, latest)
+        self.assertEqual(self._last_seen(), self.started)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self._last_seen(), latest)
+        self.assertEqual(self.buffer.stats(), {'touched': 2, 'flushed': 1, 'dropped': 0, 'failed': 0, 'pending': 0})
+
+    @override_settings(SESSION_LAST_SEEN={'MODE': 'buffered', 'FLUSH_INTERVAL': 60})
+    def test_flush_never_moves_last_seen_backwards(self):
+        self.buffer.touch(self.session.session_token_digest, self.started - timedelta(days=1))
+        self.buffer.flush()
+        self.assertEqual(self._last_seen(), self.started)
+
+    @override_settings(SESSION_LAST_SEEN={'MODE': 'buffered', 'FLUSH_INTERVAL': 60, 'MAX_PENDING': 1})
+    def test_touches_of_sessions_past_max_pending_are_dropped(self):
+        other = UserSession.objects.create(user=self.user, session_token='token-2')
+        self.buffer.touch(self.session.session_token_digest)
+        self.buffer.touch(other.session_token_digest)
+        self.assertEqual(self.buffer.stats()['dropped'], 1)
+
+
+class StubRecaptchaVerifierTests(SimpleTestCase):
+    def test_accepts_any_token_and_rejects_a_missing_one(self):
+        verifier = StubRecaptchaVerifier()
+        self.assertEqual(verifier.verify('token'), (True, None))
+        self.assertEqual(verifier.verify(''), (False, "reCAPTCHA token is missing."))
+        stats = verifier.stats()
+        self.assertEqual((stats['calls'], stats['passed'], stats['rejected']), (2, 1, 1))
+
+
+# Nothing listens on the discard port, so every call fails fast with a refused connection.
+UNREACHABLE = {'VERIFY_URL': 'http://127.0.0.1:9/', 'FAILURE_THRESHOLD': 2, 'RESET_TIMEOUT': 60}
+
+
+class GoogleRecaptchaVerifierTests(SimpleTestCase):
+    @override_settings(RECAPTCHA_VERIFIER=UNREACHABLE)
+    def test_circuit_opens_after_consecutive_failures(self):
+        verifier = GoogleRecaptchaVerifier()
+        with self.assertLogs('users.recaptcha', 'WARNING'):
+            for _ in range(2):
+                self.assertEqual(verifier.verify('token'), (False, UNAVAILABLE_MESSAGE))
+
+        with self.assertNoLogs('users.recaptcha', 'WARNING'):
+            self.assertEqual(verifier.verify('token'), (False, UNAVAILABLE_MESSAGE))
+        stats = verifier.stats()
+        self.assertTrue(stats['circuit_open'])
+        self.assertEqual((stats['errors'], stats['short_circuited'], stats['circuit_opened']), (2, 1, 1))
+
+    @override_settings(RECAPTCHA_VERIFIER={**UNREACHABLE, 'FAIL_OPEN': True})
+    def test_fail_open_accepts_logins_while_the_upstream_is_down(self):
+        verifier = GoogleRecaptchaVerifier()
+        with self.assertLogs('users.recaptcha', 'WARNING'):
+            self.assertEqual(verifier.verify('token'), (True, None))
+
+    @override_settings(RECAPTCHA_VERIFIER=UNREACHABLE)
+    def test_missing_token_is_rejected_without_a_call(self):
+        verifier = GoogleRecaptchaVerifier()
+        self.assertEqual(verifier.verify(None), (False, "reCAPTCHA token is missing."))
+        self.assertEqual(verifier.stats()['errors'], 0)
+
+
+@without_bus
+class PaginationCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            User.objects.create_user(f'user{number}@example.com', 'secret', name=f'User {number}', role='Sales')
+
+    def setUp(self):
+        cache.clear()
+
+    def _page(self, queryset, count_mode, **params):
+        request = Request(APIRequestFactory().get('/', {'page_size': 2, **params}))
+        data, _ = paginate_and_format_response(queryset.order_by('email'), request, UserListPagination, count_mode)
+        return data
+
+    def test_exact_mode_counts_through_the_paginator(self):
+        data = self._page(User.objects.all(), COUNT_EXACT, page=3)
+        self.assertEqual((data['total'], data['total_mode'], data['page'], data['has_more']), (5, COUNT_EXACT, 3, False))
+        self.assertEqual(len(data['Details']), 1)
+
+    def test_none_mode_skips_the_count_and_reads_one_row_ahead(self):
+        with self.assertNumQueries(1):
+            data = self._page(User.objects.all(), COUNT_NONE)
+        self.assertEqual((data['total'], data['total_mode'], data['next_page'], data['has_more']), (None, COUNT_NONE, 2, True))
+        self.assertEqual(self._page(User.objects.all(), COUNT_NONE, page=3)['has_more'], False)
+
+    def test_cached_mode_reuses_the_count_per_query(self):
+        self.assertEqual(self._page(User.objects.all(), COUNT_CACHED)['total'], 5)
+        User.objects.create_user('late@example.com', 'secret')
+
+        with self.assertNumQueries(1):
+            data = self._page(User.objects.all(), COUNT_CACHED)
+        self.assertEqual((data['total'], data['total_mode']), (5, COUNT_CACHED))
+        self.assertEqual(self._page(User.objects.filter(role='Sales'), COUNT_CACHED)['total'], 5)
+
+    def test_estimated_mode_reads_reltuples_unfiltered_and_explains_filtered(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}")
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self._page(User.objects.all(), COUNT_ESTIMATED)
+        self.assertEqual((data['total'], data['total_mode']), (5, COUNT_ESTIMATED))
+        self.assertIn('reltuples', queries[-1]['sql'])
+
+        with CaptureQueriesContext(connection) as queries:
+            total = estimate_count(User.objects.filter(role='Sales'))
+        self.assertEqual(total, 5)
+        self.assertTrue(queries[-1]['sql'].startswith('EXPLAIN'))
+
+    def test_estimated_mode_counts_a_table_that_was_never_analyzed(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [UserSession._meta.db_table])
+            if cursor.fetchone()[0] >= 0:
+                self.skipTest("user sessions have been analyzed")
+        UserSession.objects.create(user=User.objects.first(), session_token='token-1')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(estimate_count(UserSession.objects.all()), 1)
+        self.assertIn('COUNT(*)', queries[-1]['sql'])
+
+
+@without_bus
+@override_settings(DEBUG=True)  # lets the login serializer accept recaptcha_token "test-token"
+class AuthPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret', name='Agent')
+
+    def setUp(self):
+        user_cache.invalidate()
+        self.client = APIClient(REMOTE_ADDR='10.0.0.1')
+
+    def _login(self, password):
+        return self.client.post('/api/users/login/', {
+            'email': 'agent@example.com', 'password': password, 'recaptcha_token': 'test-token',
+        }, format='json')
+
+    def _authorize(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_cached_user_is_rejected_once_deactivated(self):
+        self._authorize()
+        path = f'/api/users/{self.user.pk}/'
+        self.assertEqual(self.client.get(path).status_code, 200)
+        self.assertEqual(self.client.get(path).status_code, 200)
+        self.assertEqual(user_cache.stats()['hits'], 1)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(path).status_code, 401)
+
+    def test_failed_logins_increment_in_the_database_and_lock_the_account(self):
+        self.assertEqual(self._login('wrong').status_code, 400)
+        self.assertEqual(User.objects.get(pk=self.user.pk).login_attempts, 1)
+
+        # Attempts counted by other requests since this one read the row still count.
+        User.objects.filter(pk=self.user.pk).update(login_attempts=LoginView.MAX_ATTEMPTS - 1)
+        self.assertEqual(self._login('wrong').status_code, 400)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.login_attempts, LoginView.MAX_ATTEMPTS)
+        self.assertIsNotNone(user.account_locked_at)
+
+        self.assertEqual(self._login('secret').status_code, 403)
+        self.assertEqual(LoginLog.objects.filter(user=self.user, success=False).count(), 3)
+
+    def test_login_resets_attempts_and_logout_finds_the_session_by_digest(self):
+        User.objects.filter(pk=self.user.pk).update(login_attempts=2)
+        response = self._login('secret')
+        self.assertEqual(response.status_code, 200)
+        refresh = response.json()['refresh']
+        session = UserSession.objects.get(user=self.user)
+        self.assertEqual(bytes(session.session_token_digest), session_token_digest(refresh))
+        self.assertEqual(User.objects.get(pk=self.user.pk).login_attempts, 0)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.post('/api/logout/', {'session_token': refresh}, format='json').status_code, 200)
+        self.assertTrue(any('session_token_digest' in query['sql'] for query in queries))
+        self.assertFalse(UserSession.objects.exists())
+        self.assertEqual(self.client.post('/api/logout/', {'session_token': refresh}, format='json').status_code, 404)
+
+
+@without_bus
+class PurgeAuthHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('agent@example.com', 'secret')
+
+    def _logs(self, *ages_in_days):
+        for age in ages_in_days:
+            log = LoginLog.objects.create(user=self.user, success=True)
+            LoginLog.objects.filter(pk=log.pk).update(timestamp=timezone.now() - timedelta(days=age))
+
+    def _purge(self, **options):
+        call_command('purge_auth_history', login_log_days=90, sleep=0, stdout=StringIO(), **options)
+        return sorted(LoginLog.objects.values_list('timestamp', flat=True))
+
+    def test_stops_at_the_first_row_inside_retention(self):
+        self._logs(200, 150, 10, 120)
+
+        remaining = self._purge(batch_size=1)
+
+        # The walk ends at the 10-day-old row, so the expired row after it is left for the next run.
+        self.assertEqual(len(remaining), 2)
+        self.assertEqual([(timezone.now() - stamp).days for stamp in remaining], [120, 10])
+
+    def test_dry_run_and_expired_sessions(self):
+        self._logs(200, 10)
+        old = timezone.now() - timedelta(days=30)
+        UserSession.objects.create(user=self.user, session_token='expired', created_at=old)
+        UserSession.objects.create(user=self.user, session_token='current')
+
+        self.assertEqual(len(self._purge(batch_size=10, dry_run=True)), 2)
+        self.assertEqual(len(self._purge(batch_size=10)), 1)
+        self.assertEqual(list(UserSession.objects.values_list('session_token', flat=True)), ['current'])
+
+
+@without_bus
+class UserListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(email=f'user{number:02}@example.com', name=f'User {number:02}', role='Sales',
+                 created_at=timezone.now() - timedelta(minutes=number))
+            for number in range(60)
+        ])
+        cls.viewer = User.objects.get(email='user00@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def test_list_defaults_to_a_page_of_50_lean_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/list/')
+        data = response.json()['data']
+        self.assertEqual((data['total'], data['page_size'], len(data['Details']), data['has_more']), (60, 50, 50, True))
+        self.assertEqual(set(data['Details'][0]), set(UserListSerializer.Meta.fields))
+        self.assertNotIn('password', queries[-1]['sql'])
+
+        data = self.client.get('/api/users/list/', {'page': 2}).json()['data']
+        self.assertEqual([user['email'] for user in data['Details']][-1], 'user59@example.com')
+
+    def test_page_size_is_capped(self):
+        data = self.client.get('/api/users/search/', {'query': 'user', 'page_size': 10000}).json()['data']
+        self.assertEqual((data['page_size'], len(data['Details'])), (UserListPagination.max_page_size, 60))
+
+        data = self.client.get('/api/users/filter/', {'role': 'sales', 'page_size': 5}).json()['data']
+        self.assertEqual((data['total'], len(data['Details'])), (60, 5))
+
+    def test_unchanged_list_answers_304(self):
+        response = self.client.get('/api/users/list/')
+        self.assertEqual(self.client.get('/api/users/list/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        User.objects.filter(email='user30@example.com').update(status='Inactive', updated_at=timezone.now())
+        self.assertEqual(self.client.get('/api/users/list/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+@without_bus
+class UserAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user('viewer@example.com', 'secret', name='Viewer')
+        User.objects.create_user('ada@example.com', 'secret', name='Ada Lovelace')
+        User.objects.create_user('countess@example.com', 'secret', name='ADAM Smith')
+        User.objects.create_user('adrian@example.com', 'secret', name='Adrian Gone', is_active=False)
+        User.objects.create_user('babbage@adams.example', 'secret', name='Charles Babbage')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def _emails(self, **params):
+        response = self.client.get('/api/users/autocomplete/', params)
+        self.assertEqual(response.status_code, 200)
+        return [user['email'] for user in response.json()['data']]
+
+    def test_matches_active_users_by_name_or_email_prefix(self):
+        self.assertCountEqual(self._emails(q=' AD '), ['countess@example.com', 'ada@example.com'])
+        self.assertEqual(self._emails(q='babbage@'), ['babbage@adams.example'])
+        self.assertEqual(len(self._emails(q='ad', limit=1)), 1)
+
+    def test_results_are_cached_per_term_and_limit(self):
+        self._emails(q='ad')
+        User.objects.create_user('adele@example.com', 'secret', name='Adele')
+        with self.assertNumQueries(0):
+            self.assertEqual(len(autocomplete_users('ad', 10)), 2)
+        self.assertEqual(len(self._emails(q='ad', limit=5)), 3)
+
+    def test_empty_query_is_rejected(self):
+        self.assertEqual(self.client.get('/api/users/autocomplete/', {'q': '  '}).status_code, 400)
+
+    def test_prefix_match_uses_the_lower_indexes(self):
+        users = User.objects.filter(is_active=True).annotate(name_key=Lower('name')).filter(name_key__startswith='ad')
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn('user_name_prefix_idx', users.explain())
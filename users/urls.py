@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import GetUserByIdView, LoginView,CustomTokenRefreshView, UserUpdateAPIView, UserSessionListView, LogoutView, UserCreateAPIView, UserListAllAPIView, UserSearchAPIView, UserFilterAPIView
-from .views import ToggleUserStatusView
+from .views import ToggleUserStatusView, UserAutocompleteAPIView
 
 urlpatterns = [
     path("users/login/", LoginView.as_view(), name="login"),
@@ -11,6 +11,7 @@ urlpatterns = [
     path("users/list/", UserListAllAPIView.as_view(), name="user-list-all"),
     path("users/search/", UserSearchAPIView.as_view(), name="user-search"),
     path("users/filter/", UserFilterAPIView.as_view(), name="user-filter"),
+    path("users/autocomplete/", UserAutocompleteAPIView.as_view(), name="user-autocomplete"),
     path("users/<uuid:user_id>/", GetUserByIdView.as_view(), name="get_user_by_id"),
     path("users/<uuid:user_id>/update/", UserUpdateAPIView.as_view(), name="update_user"),
     path("users/<uuid:user_id>/status/", ToggleUserStatusView.as_view(), name="toggle_user_status"),
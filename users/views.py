@@ -5,8 +5,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework import status, permissions, generics
-from .serializers import UserLoginSerializer, UserDetailSerializer, UserSessionSerializer, UserCreateSerializer,UpdateUserSerializer
-from .models import LoginLog, User, UserSession
+from .serializers import CachedTokenRefreshSerializer, SimpleUserSerializer, UserListSerializer, UserLoginSerializer, UserDetailSerializer, UserSessionSerializer, UserCreateSerializer,UpdateUserSerializer
+from .models import LoginLog, User, UserSession, session_token_digest
 from rest_framework.permissions import IsAdminUser
 from rest_framework.generics import ListAPIView
 from rest_framework.views import APIView
@@ -14,8 +14,16 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils.timezone import now
 from datetime import timedelta
 from django.contrib.auth.hashers import make_password
-from .pagination import CustomUserPagination, paginate_and_format_response
-from django.db.models import Q
+from .pagination import COUNT_ESTIMATED, UserListPagination, UserSessionPagination, paginate_and_format_response
+from .querysets import eager_load
+from .authentication import user_cache
+from .last_seen import last_seen
+from crm_backend.conditional import check_conditional, latest_validator, object_validator
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce, Lower
+from django.core.cache import cache
+import hashlib
 from django.utils.dateparse import parse_date
 
 class LoginView(APIView):
@@ -23,11 +31,12 @@ class LoginView(APIView):
     LOCK_DURATION_MINUTES = 10
 
     def post(self, request):
-        email = request.data.get("email")
+        email = str(request.data.get("email") or "").strip()
         ip_address = request.META.get('REMOTE_ADDR')
         user_agent = request.META.get('HTTP_USER_AGENT')
 
-        user_obj = User.objects.filter(email=email).first()
+        # The only user lookup; the serializer checks the password against this row.
+        user_obj = User.objects.filter(email=email).first() if email else None
 
         # Step 1: Check if account is locked
         if user_obj and user_obj.account_locked_at:
@@ -45,29 +54,38 @@ class LoginView(APIView):
                     status=403
                 )
             else:
-                # Auto-unlock after timeout
+                # Auto-unlock after timeout, unless another request already did.
+                User.objects.filter(pk=user_obj.pk, account_locked_at=user_obj.account_locked_at).update(
+                    login_attempts=0, account_locked_at=None
+                )
                 user_obj.login_attempts = 0
                 user_obj.account_locked_at = None
-                user_obj.save()
 
         # Step 2: Validate credentials
-        serializer = UserLoginSerializer(data=request.data, context={"request": request})
+        serializer = UserLoginSerializer(data=request.data, context={"request": request, "user": user_obj})
         if not serializer.is_valid():
             # Log failed attempt if user exists
             if user_obj:
-                user_obj.login_attempts += 1
-                user_obj.last_failed_login_at = now()
-                if user_obj.login_attempts >= self.MAX_ATTEMPTS:
-                    user_obj.account_locked_at = now()
-                user_obj.save()
-
-                LoginLog.objects.create(
-                    user=user_obj,
-                    success=False,
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    reason="Invalid credentials"
-                )
+                failed_at = now()
+                with transaction.atomic():
+                    # Increment in the database so concurrent bad logins all count; the
+                    # CASE sees the pre-increment value, so it locks on the MAX_ATTEMPTS-th.
+                    User.objects.filter(pk=user_obj.pk).update(
+                        login_attempts=Coalesce(F('login_attempts'), 0) + 1,
+                        last_failed_login_at=failed_at,
+                        account_locked_at=Case(
+                            When(login_attempts__gte=self.MAX_ATTEMPTS - 1, then=Value(failed_at)),
+                            default=F('account_locked_at')
+                        ),
+                        updated_at=failed_at
+                    )
+                    LoginLog.objects.create(
+                        user=user_obj,
+                        success=False,
+                        ip_address=ip_address,
+                        user_agent=user_agent,
+                        reason="Invalid credentials"
+                    )
 
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -86,23 +104,24 @@ class LoginView(APIView):
 
         # Step 4: Successful login
         refresh = RefreshToken.for_user(user)
-        UserSession.objects.create(
-            user=user,
-            session_token=str(refresh),
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        user.last_login_at = now()
-        user.login_attempts = 0
-        user.account_locked_at = None
-        user.save()
+        with transaction.atomic():
+            UserSession.objects.create(
+                user=user,
+                session_token=str(refresh),
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+            user.last_login_at = now()
+            user.login_attempts = 0
+            user.account_locked_at = None
+            user.save(update_fields=['last_login_at', 'login_attempts', 'account_locked_at', 'updated_at'])
 
-        LoginLog.objects.create(
-            user=user,
-            success=True,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
+            LoginLog.objects.create(
+                user=user,
+                success=True,
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
 
         return Response({
             "refresh": str(refresh),
@@ -111,35 +130,21 @@ class LoginView(APIView):
         })
 
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CachedTokenRefreshSerializer
+
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
 
         refresh_token = request.data.get("refresh")
         if refresh_token and response.status_code == 200:
-            try:
-                token = RefreshToken(refresh_token)
-                user_id = token.payload.get("user_id")
-                user = User.objects.get(id=user_id)
-
-                # Update session record's last seen
-                UserSession.objects.filter(
-                    user=user,
-                    session_token=refresh_token
-                ).update(last_seen_at=now())
-
-                return Response({
-                    "status": "success",
-                    "data": response.data,
-                    "message": "Token refreshed successfully."
-                }, status=status.HTTP_200_OK)
-
-            except Exception as e:
-                # Optionally log error here
-                return Response({
-                    "status": "failure",
-                    "data": {},
-                    "message": "Failed to refresh token. Invalid refresh token or user not found."
-                }, status=status.HTTP_400_BAD_REQUEST)
+            # Coalesced in memory and written in batches; see users.last_seen.
+            last_seen.touch(session_token_digest(str(refresh_token)))
+
+            return Response({
+                "status": "success",
+                "data": response.data,
+                "message": "Token refreshed successfully."
+            }, status=status.HTTP_200_OK)
 
         return Response({
             "status": "failure",
@@ -161,11 +166,14 @@ class UserSessionListView(APIView):
                 queryset = UserSession.objects.all()
         else:
             queryset = UserSession.objects.filter(user=user)
+        queryset = eager_load(queryset, UserSessionSerializer).order_by('-id')
 
-        serializer = UserSessionSerializer(queryset, many=True)
+        paginated_data, _ = paginate_and_format_response(queryset, request, UserSessionPagination, COUNT_ESTIMATED)
+        serializer = UserSessionSerializer(paginated_data['Details'], many=True)
+        paginated_data['Details'] = serializer.data
         return Response({
             "status": "success",
-            "data": serializer.data,
+            "data": paginated_data,
             "message": "User session list fetched successfully."
         }, status=status.HTTP_200_OK)
     
@@ -181,7 +189,7 @@ class LogoutView(APIView):
                 "message": "Session token is required."
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        session_qs = UserSession.objects.filter(user=request.user, session_token=session_token)
+        session_qs = UserSession.objects.filter(user=request.user, session_token_digest=session_token_digest(str(session_token)))
         if not session_qs.exists():
             return Response({
                 "status": "failure",
@@ -221,15 +229,20 @@ class UserListAllAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        users = User.objects.filter(status='Active').order_by('-created_at')
-        serialized_users = UserDetailSerializer(users, many=True)
-        paginated_data, _ = paginate_and_format_response(serialized_users.data, request, CustomUserPagination)
+        users = User.objects.filter(status='Active')
+        validators, not_modified = check_conditional(request, latest_validator(User.objects.all()))
+        if not_modified:
+            return not_modified
 
-        return Response({
+        users = eager_load(users, UserListSerializer).order_by('-created_at')
+        paginated_data, _ = paginate_and_format_response(users, request, UserListPagination)
+        paginated_data['Details'] = UserListSerializer(paginated_data['Details'], many=True).data
+
+        return validators.apply(Response({
             "status": "success",
             "data": paginated_data,
             "message": "All users fetched successfully"
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK))
 
 class UserSearchAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -247,10 +260,11 @@ class UserSearchAPIView(APIView):
             Q(name__icontains=query) |
             Q(email__icontains=query) |
             Q(role__icontains=query)
-        ).order_by('-created_at')
+        )
+        users = eager_load(users, UserListSerializer).order_by('-created_at')
 
-        serialized_users = UserDetailSerializer(users, many=True)
-        paginated_data, _ = paginate_and_format_response(serialized_users.data, request, CustomUserPagination)
+        paginated_data, _ = paginate_and_format_response(users, request, UserListPagination)
+        paginated_data['Details'] = UserListSerializer(paginated_data['Details'], many=True).data
 
         return Response({
             "status": "success",
@@ -258,6 +272,55 @@ class UserSearchAPIView(APIView):
             "message": "Users matching search query fetched successfully"
         }, status=status.HTTP_200_OK)
 
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 25
+AUTOCOMPLETE_CACHE_TIMEOUT = 30
+
+def autocomplete_users(term, limit):
+    """
+    Active users whose name or email starts with `term` (already lower-cased),
+    as SimpleUserSerializer rows. Both matches are prefix scans of the
+    Lower(...) text_pattern_ops indexes on User; results are cached briefly
+    per (term, limit) since pickers repeat the same prefixes.
+    """
+    digest = hashlib.sha1(f"{term}|{limit}".encode()).hexdigest()
+    key = f"users:autocomplete:{digest}"
+    results = cache.get(key)
+    if results is None:
+        users = (
+            User.objects.filter(is_active=True)
+            .annotate(name_key=Lower('name'), email_key=Lower('email'))
+            .filter(Q(name_key__startswith=term) | Q(email_key__startswith=term))
+        )
+        users = eager_load(users, SimpleUserSerializer).order_by('name', 'email')[:limit]
+        results = [dict(row) for row in SimpleUserSerializer(users, many=True).data]
+        cache.set(key, results, AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
+
+class UserAutocompleteAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        term = ' '.join(request.query_params.get('q', '').split()).lower()
+        if not term:
+            return Response({
+                "status": "failure",
+                "data": {},
+                "message": "Search query cannot be empty."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_DEFAULT_LIMIT
+        limit = min(max(limit, 1), AUTOCOMPLETE_MAX_LIMIT)
+
+        return Response({
+            "status": "success",
+            "data": autocomplete_users(term, limit),
+            "message": "Matching users fetched successfully"
+        }, status=status.HTTP_200_OK)
+
 class UserFilterAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -278,10 +341,10 @@ class UserFilterAPIView(APIView):
         if end_date:
             filters &= Q(created_at__date__lte=parse_date(end_date))
 
-        users = User.objects.filter(filters).order_by('-created_at')
+        users = eager_load(User.objects.filter(filters), UserListSerializer).order_by('-created_at')
 
-        serialized_users = UserDetailSerializer(users, many=True)
-        paginated_data, _ = paginate_and_format_response(serialized_users.data, request, CustomUserPagination)
+        paginated_data, _ = paginate_and_format_response(users, request, UserListPagination)
+        paginated_data['Details'] = UserListSerializer(paginated_data['Details'], many=True).data
 
         return Response({
             "status": "success",
@@ -294,13 +357,20 @@ class GetUserByIdView(APIView):
 
     def get(self, request, user_id):
         try:
+            updated_at = object_validator(User.objects.filter(id=user_id))
+            if updated_at is None:
+                raise User.DoesNotExist
+            validators, not_modified = check_conditional(request, updated_at, last_modified=updated_at)
+            if not_modified:
+                return not_modified
+
             user = User.objects.get(id=user_id)
             serializer = UserDetailSerializer(user)
-            return Response({
+            return validators.apply(Response({
                 "status": "success",
                 "data": serializer.data,
                 "message": "User fetched successfully"
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK))
         except User.DoesNotExist:
             return Response({
                 "status": "failure",
@@ -334,6 +404,7 @@ class UserUpdateAPIView(APIView):
 
         if serializer.is_valid():
             serializer.save()
+            user_cache.invalidate(user.pk)
             return Response({
                 "status": "success",
                 "data": UserDetailSerializer(serializer.instance).data,
@@ -377,6 +448,7 @@ class ToggleUserStatusView(APIView):
         user.is_active = is_active
         user.updated_by = request.user.id  # ✅ FIXED
         user.save()
+        user_cache.invalidate(user.pk)
 
         status_str = "activated" if is_active else "deactivated"
         return Response({